@@ -0,0 +1,137 @@
+"""Skaler bordro motoru ile NumPy çekirdeğini karşılaştırır.
+
+Kullanım:
+    python benchmark_payroll.py                 # sentetik veri (200 çalışan x 52 hafta)
+    python benchmark_payroll.py 50 13           # 50 çalışan x 13 hafta
+    python benchmark_payroll.py --db            # employee.db'deki tüm haftalar
+
+İki yolun sonuçları karşılaştırılır; fark varsa betik hata koduyla çıkar.
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from utils import payroll
+from utils import payroll_numpy
+
+COMPARE_KEYS = (
+    'normal_minutes', 'overtime_minutes', 'total_minutes', 'active_days', 'food_count',
+    'has_work', 'normal_pay', 'overtime_pay', 'earned', 'food_allowance',
+    'transport_allowance', 'total_additions', 'total_deductions', 'total'
+)
+
+
+def random_time(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def synthetic_inputs(employee_count, week_count, seed=42):
+    """get_week_payroll_inputs formatında rastgele çalışan-hafta girdileri üretir"""
+    rng = random.Random(seed)
+    first_monday = date(2025, 1, 6)
+    inputs = []
+    for week in range(week_count):
+        monday = first_monday + timedelta(weeks=week)
+        for emp_id in range(1, employee_count + 1):
+            records = []
+            for day in range(7):
+                if day >= 5 and rng.random() < 0.7:
+                    continue
+                entry = rng.randint(7 * 60, 9 * 60)
+                lunch_start = rng.randint(12 * 60, 13 * 60 + 30)
+                lunch_end = lunch_start + rng.choice((0, 30, 45))
+                exit_time = rng.randint(16 * 60, 21 * 60)
+                record = {
+                    'date': (monday + timedelta(days=day)).strftime('%Y-%m-%d'),
+                    'entry_time': random_time(entry),
+                    'lunch_start': random_time(lunch_start),
+                    'lunch_end': random_time(lunch_end),
+                    'exit_time': random_time(exit_time),
+                    'day_active': 0 if rng.random() < 0.1 else 1
+                }
+                if rng.random() < 0.02:
+                    record['lunch_end'] = None
+                records.append(record)
+            inputs.append({
+                'employee': {
+                    'id': emp_id, 'name': f"CALISAN {emp_id}",
+                    'weekly_salary': rng.choice((150, 180.5, 200, 245.75)),
+                    'daily_food': rng.choice((100, 150)),
+                    'daily_transport': rng.choice((0, 50)),
+                    'is_active': 1
+                },
+                'work_hours': records,
+                'week_additions': rng.choice((0, 0, 500)),
+                'permanent_additions': rng.choice((0, 250)),
+                'worked': bool(records),
+                'deductions': rng.choice((0, 0, 300))
+            })
+    return inputs
+
+
+def database_inputs():
+    """employee.db'deki tüm haftaların girdilerini toplar"""
+    from PyQt5.QtWidgets import QApplication
+    from models.database import EmployeeDB
+    app = QApplication.instance() or QApplication(sys.argv)
+    db = EmployeeDB()
+    inputs = []
+    for week_start in db.get_available_weeks():
+        inputs.extend(db.get_week_payroll_inputs(week_start))
+    return inputs
+
+
+def timed(func, inputs, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(inputs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    if not payroll_numpy.HAS_NUMPY:
+        print("numpy kurulu değil, karşılaştırma yapılamıyor.")
+        return 1
+
+    args = sys.argv[1:]
+    if args and args[0] == '--db':
+        inputs = database_inputs()
+        source = "employee.db"
+    else:
+        employee_count = int(args[0]) if len(args) > 0 else 200
+        week_count = int(args[1]) if len(args) > 1 else 52
+        inputs = synthetic_inputs(employee_count, week_count)
+        source = f"sentetik ({employee_count} çalışan x {week_count} hafta)"
+
+    row_count = sum(len(item['work_hours']) for item in inputs)
+    print(f"Veri: {source}, {len(inputs)} çalışan-hafta, {row_count} günlük kayıt")
+
+    scalar_results, scalar_time = timed(payroll.calculate_employees, inputs)
+    numpy_results, numpy_time = timed(payroll_numpy.calculate_employees, inputs)
+
+    mismatches = 0
+    for scalar, vector in zip(scalar_results, numpy_results):
+        for key in COMPARE_KEYS:
+            if scalar[key] != vector[key]:
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"Fark: {scalar['employee']['name']} {key}: {scalar[key]!r} != {vector[key]!r}")
+
+    print(f"Skaler motor : {scalar_time * 1000:9.1f} ms")
+    print(f"NumPy çekirdek: {numpy_time * 1000:9.1f} ms")
+    if numpy_time > 0:
+        print(f"Hızlanma     : {scalar_time / numpy_time:9.1f}x")
+    if mismatches:
+        print(f"HATA: {mismatches} farklı değer bulundu")
+        return 1
+    print("Sonuçlar birebir aynı.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
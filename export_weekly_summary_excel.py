@@ -1,6 +1,7 @@
 import csv
 from datetime import datetime, timedelta
 from models.database import EmployeeDB
+from utils import payroll
 
 # Excel çıktısı için temel CSV (virgül yerine noktalı virgül kullanılırsa Türkçe Excel'de daha uyumlu olur)
 
@@ -12,16 +13,26 @@ def format_time(minutes):
     m = int(minutes % 60)
     return f"{h:02d}:{m:02d}"
 
+def format_hours(hours):
+    # Özet detaylarında total_hours saat cinsindendir
+    return payroll.format_minutes(round(hours * 60))
+
 def main():
     db = EmployeeDB()
     today = datetime.now().date()
     monday = get_monday(today)
     week_start_date = monday.strftime('%Y-%m-%d')
     summary = db.get_weekly_summary(week_start_date)
-    if not summary or not summary.get('details'):
+    if summary and summary.get('details'):
+        details = summary['details']
+    else:
+        # Kaydedilmiş özet yoksa haftayı bordro motoruyla hesapla
+        results = payroll.calculate_employees(db.get_week_payroll_inputs(week_start_date))
+        details = [payroll.summary_detail(r) for r in results if r['has_work'] and r['total'] != 0]
+        details.sort(key=lambda d: d['total_weekly_salary'], reverse=True)
+    if not details:
         print('Bu haftaya ait özet veri bulunamadı.')
         return
-    details = summary['details']
     outname = f"haftalik_ozet_{week_start_date}.csv"
     with open(outname, 'w', newline='', encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile, delimiter=';')
@@ -31,7 +42,7 @@ def main():
         for emp in details:
             writer.writerow([
                 emp['name'],
-                format_time(emp['total_hours']),
+                format_hours(emp['total_hours']),
                 f"- {format_time(emp['total_deductions'])}",
                 f"{emp.get('total_additions', 0):,.0f} TL",
                 f"{emp['transport_allowance']:,.0f} TL",
@@ -1,6 +1,7 @@
 from fpdf import FPDF
 from datetime import datetime, timedelta
 from models.database import EmployeeDB
+from utils import payroll
 
 # A4 boyutları (mm)
 PAGE_WIDTH = 210
@@ -23,16 +24,26 @@ def format_time(minutes):
     m = int(minutes % 60)
     return f"{h:02d}:{m:02d}"
 
+def format_hours(hours):
+    # Özet detaylarında total_hours saat cinsindendir
+    return payroll.format_minutes(round(hours * 60))
+
 def main():
     db = EmployeeDB()
     today = datetime.now().date()
     monday = get_monday(today)
     week_start_date = monday.strftime('%Y-%m-%d')
     summary = db.get_weekly_summary(week_start_date)
-    if not summary or not summary.get('details'):
+    if summary and summary.get('details'):
+        details = summary['details']
+    else:
+        # Kaydedilmiş özet yoksa haftayı bordro motoruyla hesapla
+        results = payroll.calculate_employees(db.get_week_payroll_inputs(week_start_date))
+        details = [payroll.summary_detail(r) for r in results if r['has_work'] and r['total'] != 0]
+        details.sort(key=lambda d: d['total_weekly_salary'], reverse=True)
+    if not details:
         print('Bu haftaya ait özet veri bulunamadı.')
         return
-    details = summary['details']
     pdf = FPDF(orientation='P', unit='mm', format='A4')
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=MARGIN)
@@ -60,7 +71,7 @@ def main():
         pdf.set_font('DejaVu', '', 10)
         # İçerik
         lines = [
-            ("Çalışma Saati", format_time(emp['total_hours'])),
+            ("Çalışma Saati", format_hours(emp['total_hours'])),
             ("Eksik Çalışma", f"- {format_time(emp['total_deductions'])}"),
             ("Fazla Çalışma", f"{emp.get('total_additions', 0):,.0f} TL"),
             ("Yol", f"{emp['transport_allowance']:,.0f} TL"),
@@ -1,31 +1,41 @@
 import sys
 import warnings
 
+# Açılış süreleri (STARTUP_TIMING=1 ile yazdırılır); ölçüm her şeyden önce başlar
+from utils.startup import StartupTimer
+startup_timer = StartupTimer()
+
 # PyQt5 uyarılarını gizle
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QVBoxLayout, QWidget, QHBoxLayout, QLabel
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QIcon
+with startup_timer.measure("import PyQt5"):
+    from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QVBoxLayout, QWidget, QHBoxLayout, QLabel
+    from PyQt5.QtCore import Qt, QTimer, QThreadPool
+    from PyQt5.QtGui import QIcon
 
-from models.database import EmployeeDB
-from views.employee_form import EmployeeForm
-from views.time_select_form import TimeSelectForm
-from views.calisanlar import Calisanlar
-from views.weekly_report_form import WeeklyReportForm
+with startup_timer.measure("import models.database"):
+    from models.database import EmployeeDB
+# Sekme modülleri (views.*) sekme ilk açıldığında yüklenir
 # from views.rapor import Rapor  # KALDIRILDI
 
 class MainWindow(QMainWindow):
     """Ana pencere sınıfı"""
     
-    def __init__(self):
+    def __init__(self, timer=None):
         super().__init__()
-        self.db = EmployeeDB()
+        self.startup_timer = timer or StartupTimer(enabled=False)
+        with self.startup_timer.measure("EmployeeDB()"):
+            self.db = EmployeeDB()
         
-        # Tüm çalışan isimlerini büyük harfe çevir
-        self.db.update_all_employee_names_to_uppercase()
+        # Sekmeler ilk açıldıklarında kurulur (ensure_tab)
+        self.calisanlar_widget = None
+        self.time_select_form = None
+        self.weekly_report_form = None
         
-        self.initUI()
+        with self.startup_timer.measure("MainWindow.initUI"):
+            self.initUI()
+        # Pencere göründükten sonraki ilk olay döngüsünde açılış işleri tamamlanır
+        QTimer.singleShot(0, self.finish_startup)
     
     def initUI(self):
         """Kullanıcı arayüzünü başlatır"""
@@ -77,40 +87,23 @@ class MainWindow(QMainWindow):
             }
         """)
 
-        # Sekmeleri oluştur
-        self.calisanlar_widget = Calisanlar(db=self.db)
-        self.tabs.addTab(self.calisanlar_widget, "KİŞİLER")
-        self.time_select_form = TimeSelectForm(self.db)
-        self.tabs.addTab(self.time_select_form, "SÜRE")
-        self.weekly_report_form = WeeklyReportForm(self.db)
-        self.tabs.addTab(self.weekly_report_form, "ÖZET")
+        # Sekmeler boş sayfalarla eklenir; içerik sekme ilk açıldığında kurulur
+        self.tab_factories = [
+            ("KİŞİLER", self.create_calisanlar_tab),
+            ("SÜRE", self.create_time_select_tab),
+            ("ÖZET", self.create_weekly_report_tab),
+        ]
+        for title, _ in self.tab_factories:
+            page = QWidget()
+            page_layout = QVBoxLayout(page)
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(page, title)
         # Rapor sekmesi kaldırıldı
         # self.rapor = Rapor(self.db)
         # self.tabs.addTab(self.rapor, "Rapor")
+        self.tabs.currentChanged.connect(self.ensure_tab)
 
         main_layout.addWidget(self.tabs)
-        
-        # --- SIGNAL CONNECTIONS ARTIK SADECE BURADA ---
-        self.db.data_changed.connect(self.time_select_form.load_employees)
-
-        # --- SENKRONİZASYON ---
-        # Süre sekmesindeki TimeTrackingForm değiştiğinde haftalık raporu güncelle
-        def connect_data_changed():
-            try:
-                if self.time_select_form.current_time_form:
-                    self.time_select_form.current_time_form.data_changed.connect(self.time_select_form.load_employees)
-            except Exception:
-                pass
-        # İlk çalışan yüklendiğinde bağlantıyı kur
-        orig_load_employee = getattr(self.time_select_form, 'load_employee', None)
-        def load_employee_and_connect(*args, **kwargs):
-            result = orig_load_employee(*args, **kwargs)
-            connect_data_changed()
-            return result
-        if orig_load_employee:
-            self.time_select_form.load_employee = load_employee_and_connect
-        # Eğer ilk açılışta form varsa bağla
-        connect_data_changed()
 
         # Genel stil
         self.setStyleSheet("""
@@ -179,11 +172,63 @@ class MainWindow(QMainWindow):
             }
         """)
 
+    def finish_startup(self):
+        """Pencere göründükten sonra açık sekmeyi kurar ve açılış raporunu yazar"""
+        self.startup_timer.report("Pencere görünür")
+        self.ensure_tab(self.tabs.currentIndex())
+        self.startup_timer.report("İlk sekme hazır")
+
+    def ensure_tab(self, index):
+        """Sekme ilk kez açıldığında içeriğini kurar"""
+        page = self.tabs.widget(index)
+        if page is None or page.layout().count():
+            return
+        title, factory = self.tab_factories[index]
+        with self.startup_timer.measure(f"{title} sekmesi"):
+            page.layout().addWidget(factory())
+        self.startup_timer.report()
+
+    def create_calisanlar_tab(self):
+        with self.startup_timer.measure("import views.calisanlar"):
+            from views.calisanlar import Calisanlar
+        self.calisanlar_widget = Calisanlar(db=self.db)
+        return self.calisanlar_widget
+
+    def create_time_select_tab(self):
+        with self.startup_timer.measure("import views.time_select_form"):
+            from views.time_select_form import TimeSelectForm
+        self.time_select_form = TimeSelectForm(self.db)
+        # Çalışan listesi sadece çalışan değişikliklerinde yenilenir; değişiklikler
+        # db.changes üzerinden birleştirilmiş olarak (ChangeSet) gelir
+        self.db.changes.changes_ready.connect(self.time_select_form.on_changes)
+        return self.time_select_form
+
+    def create_weekly_report_tab(self):
+        with self.startup_timer.measure("import views.weekly_report_form"):
+            from views.weekly_report_form import WeeklyReportForm
+        self.weekly_report_form = WeeklyReportForm(self.db)
+        return self.weekly_report_form
+
+    def closeEvent(self, event):
+        """Kapanırken kaydedilmemiş saat düzenlemelerini yaz"""
+        if self.time_select_form is not None:
+            self.time_select_form.flush_pending_changes()
+            self.time_select_form.stop_prefetch()
+            self.time_select_form.wait_for_loader()
+        # Veritabanı kapanmadan arka plan işçileri bitsin
+        if self.weekly_report_form is not None:
+            self.weekly_report_form.wait_for_report()
+        QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
+        self.db.close()
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    app.setStyle("Fusion")  # Modern görünüm
+    with startup_timer.measure("QApplication"):
+        app = QApplication(sys.argv)
+        app.setStyle("Fusion")  # Modern görünüm
     
-    window = MainWindow()
-    window.show()
+    window = MainWindow(startup_timer)
+    with startup_timer.measure("MainWindow.show"):
+        window.show()
     
     sys.exit(app.exec_())
@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+class ChangeSet:
+    """Kısa bir zaman aralığında biriken veritabanı değişiklikleri"""
+
+    def __init__(self):
+        self.work_hours = set()  # (employee_id, tarih)
+        self.payments = set()  # (employee_id, hafta başlangıcı; '' = sabit ödeme)
+        self.employees = set()  # employee_id
+        self.full = False  # Genel değişiklik: her şey yeniden yüklenmeli
+
+    def is_empty(self):
+        return not (self.full or self.work_hours or self.payments or self.employees)
+
+    def employee_ids(self):
+        """Değişiklikten etkilenen tüm çalışanlar"""
+        ids = set(self.employees)
+        ids.update(employee_id for employee_id, _ in self.work_hours)
+        ids.update(employee_id for employee_id, _ in self.payments)
+        return ids
+
+    def employee_ids_for_week(self, week_start_date):
+        """
+        Belirli bir haftayı etkileyen çalışanlar.
+        Çalışan bilgisi ve sabit ödeme değişiklikleri her haftayı etkiler.
+        """
+        week_end_date = (datetime.strptime(week_start_date, "%Y-%m-%d") + timedelta(days=6)).strftime("%Y-%m-%d")
+        ids = set(self.employees)
+        ids.update(employee_id for employee_id, date in self.work_hours
+                   if week_start_date <= date <= week_end_date)
+        ids.update(employee_id for employee_id, week in self.payments
+                   if not week or week_start_date <= week <= week_end_date)
+        return ids
+
+    def dates(self):
+        """Çalışma saati değişen tarihler"""
+        return {date for _, date in self.work_hours}
+
+    def __repr__(self):
+        return (f"ChangeSet(full={self.full}, work_hours={len(self.work_hours)}, "
+                f"payments={len(self.payments)}, employees={len(self.employees)})")
+
+
+class ChangeDispatcher(QObject):
+    """
+    EmployeeDB sinyallerini kısa bir süre (veya hold/release kapsamı sonuna
+    kadar) biriktirip dinleyicilere tek bir birleşik ChangeSet olarak iletir.
+    Böylece 7 satırlık otomatik kayıt, 7 ayrı yenileme yerine tek yenileme yapar.
+    """
+    changes_ready = pyqtSignal(object)  # ChangeSet
+
+    def __init__(self, db, interval=150):
+        super().__init__(db)
+        self._pending = ChangeSet()
+        self._hold_depth = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+
+        db.work_hours_changed.connect(self.on_work_hours_changed)
+        db.payments_changed.connect(self.on_payments_changed)
+        db.employee_changed.connect(self.on_employee_changed)
+        db.data_changed.connect(self.on_data_changed)
+
+    def on_work_hours_changed(self, employee_id, date):
+        self._pending.work_hours.add((employee_id, date))
+        self._schedule()
+
+    def on_payments_changed(self, employee_id, week_start_date):
+        self._pending.payments.add((employee_id, week_start_date))
+        self._schedule()
+
+    def on_employee_changed(self, employee_id):
+        self._pending.employees.add(employee_id)
+        self._schedule()
+
+    def on_data_changed(self):
+        self._pending.full = True
+        self._schedule()
+
+    def _schedule(self):
+        # Tutuluyorsa release() sonunda gönderilecek
+        if self._hold_depth == 0 and not self._timer.isActive():
+            self._timer.start()
+
+    def hold(self):
+        """Değişikliklerin gönderilmesini release() çağrılana kadar bekletir (iç içe çağrılabilir)"""
+        self._hold_depth += 1
+        self._timer.stop()
+
+    def release(self):
+        """hold() kapsamını kapatır, en dıştaki kapsamda birikenleri hemen gönderir"""
+        if self._hold_depth == 0:
+            return
+        self._hold_depth -= 1
+        if self._hold_depth == 0:
+            self.flush()
+
+    @contextmanager
+    def held(self):
+        """with db.changes.held(): ... bloğundaki tüm değişiklikleri tek seferde gönderir"""
+        self.hold()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def flush(self):
+        """Biriken değişiklikleri tek bir ChangeSet olarak gönderir"""
+        self._timer.stop()
+        if self._hold_depth > 0 or self._pending.is_empty():
+            return
+        changes = self._pending
+        self._pending = ChangeSet()
+        self.changes_ready.emit(changes)
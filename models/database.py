@@ -1,11 +1,39 @@
 import sqlite3
 import os
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from PyQt5.QtCore import QObject, pyqtSignal
 
+from models import migrations
+from models.changes import ChangeDispatcher
+from utils import payroll
+from utils.cache import LRUCache
+from utils.text import normalize_name, tr_upper
+
+# Şablonu olmayan çalışanlar için varsayılan saatler (giriş, öğle başlangıç, öğle bitiş, çıkış)
+DEFAULT_DAY_TIMES = ("08:15", "13:15", "13:45", "18:45")
+# Varsayılan şablonda aktif günler (Pazartesi=0 ... Cuma=4)
+DEFAULT_WORK_WEEKDAYS = (0, 1, 2, 3, 4)
+
+def week_start_of(date_str):
+    """'YYYY-MM-DD' tarihinin haftasının Pazartesi'si (geçersizse None)"""
+    try:
+        day = datetime.strptime(date_str, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+    return (day - timedelta(days=day.weekday())).strftime("%Y-%m-%d")
+
+
 class EmployeeDB(QObject):
     """Çalışan veritabanı işlemleri için sınıf"""
     data_changed = pyqtSignal()
+    # Ayrıntılı değişiklik sinyalleri: dinleyiciler sadece etkilenen çalışanı/haftayı yeniler
+    work_hours_changed = pyqtSignal(int, str)  # employee_id, tarih (YYYY-MM-DD)
+    payments_changed = pyqtSignal(int, str)  # employee_id, hafta başlangıcı ('' = sabit ödeme, tüm haftalar)
+    employee_changed = pyqtSignal(int)  # employee_id
     
     def __init__(self, db_file="employee.db"):
         super().__init__()
@@ -15,151 +43,332 @@ class EmployeeDB(QObject):
         project_dir = os.path.dirname(current_dir)
         self.db_file = os.path.join(project_dir, db_file)
         
-        self.conn = sqlite3.connect(self.db_file)
-        self.conn.row_factory = sqlite3.Row
+        # İş parçacığı başına bağlantı: ana iş parçacığı ana bağlantıyı kullanır,
+        # arka plan iş parçacıkları connection() ile havuzdan ödünç alır
+        self._local = threading.local()
+        self._pool_lock = threading.Lock()
+        self._idle_connections = []
+        # Açılan tüm bağlantılar (iş parçacıklarında tutulanlar dahil); close() hepsini kapatır
+        self._connections = set()
+        self._main_conn = self._open_connection()
+        self._local.conn = self._main_conn
+        # batch() kapsamı derinliği ve kapsam bitene kadar bekletilen sinyaller
+        # (yazma işlemleri ana iş parçacığında yapılır)
+        self._batch_depth = 0
+        self._pending_signals = []
+        # get_active_weeks sonucu; çalışma saati/çalışan yazılınca sıfırlanır
+        self._active_weeks_cache = None
+        # Çalışan başına sabit ödemeler (get_permanent_payments); ödeme yazılınca çalışanınki silinir
+        self._permanent_payments_cache = LRUCache(self.EMPLOYEE_CACHE_SIZE)
+        # Zaman takibi ekranının okuma önbellekleri (yazınca _notify ile güncellenir/silinir):
+        # (employee_id, hafta Pazartesi'si) -> get_week_work_hours kayıtları
+        self._week_cache = LRUCache(self.WEEK_CACHE_SIZE)
+        # employee_id -> get_employee sonucu
+        self._employee_cache = LRUCache(self.EMPLOYEE_CACHE_SIZE)
+        # (employee_id, hafta başı, hafta sonu) -> (haftalık eklenti toplamı, çalışma var mı)
+        self._week_additions_cache = LRUCache(self.WEEK_CACHE_SIZE)
+        # employee_id -> get_schedule_template sonucu
+        self._template_cache = LRUCache(self.EMPLOYEE_CACHE_SIZE)
+        # Her yazma bildiriminde artar; arka planda okunan veri arada yazma olduysa önbelleğe girmez
+        self._write_serial = 0
+        # Değişiklik sinyallerini birleştirip tek seferde dağıtan katman
+        self.changes = ChangeDispatcher(self)
         self.create_tables()
     
-    def create_tables(self):
-        """Veritabanı tablolarını oluşturur"""
-        cursor = self.conn.cursor()
+    # Havuzda bekletilecek en fazla boşta bağlantı
+    POOL_SIZE = 4
+    # Önbellekte tutulacak en fazla (çalışan, hafta) ve çalışan sayısı
+    WEEK_CACHE_SIZE = 256
+    EMPLOYEE_CACHE_SIZE = 256
+
+    def _open_connection(self):
+        """Ayarları yapılmış yeni bir veritabanı bağlantısı açar"""
+        # Havuzdaki bağlantılar farklı iş parçacıklarına sırayla verilebilir
+        conn = sqlite3.connect(self.db_file, timeout=5.0, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # WAL: okuyucular yazmayı (otomatik kayıt) beklemez, yazıcı okuyucuları beklemez
+        conn.execute("PRAGMA journal_mode = WAL")
+        # WAL ile NORMAL güvenlidir; her commit'te fsync yapılmaz
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = -8000")  # ~8 MB sayfa önbelleği
+        conn.execute("PRAGMA mmap_size = 67108864")  # 64 MB
+        # Kilitli veritabanında hemen hata vermek yerine 5 sn bekle
+        conn.execute("PRAGMA busy_timeout = 5000")
+        # Türkçe büyük harf (i -> İ); SQLite'ın UPPER() fonksiyonu sadece ASCII çevirir
+        conn.create_function("TR_UPPER", 1, tr_upper, deterministic=True)
+        with self._pool_lock:
+            self._connections.add(conn)
+        return conn
+
+    @property
+    def conn(self):
+        """Çağıran iş parçacığının bağlantısı"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # connection() kapsamı dışında kullanan arka plan iş parçacığı:
+            # bağlantı iş parçacığına bağlanır, release_connection() ile geri verilir
+            conn = self._acquire_connection()
+            self._local.conn = conn
+        return conn
+
+    def _acquire_connection(self):
+        with self._pool_lock:
+            if self._idle_connections:
+                return self._idle_connections.pop()
+        return self._open_connection()
+
+    def release_connection(self):
+        """Arka plan iş parçacığının bağlantısını havuza geri verir"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or conn is self._main_conn:
+            return
+        self._local.conn = None
+        # Yarım kalmış işlem havuza taşınmasın
+        if conn.in_transaction:
+            conn.rollback()
+        with self._pool_lock:
+            if len(self._idle_connections) < self.POOL_SIZE:
+                self._idle_connections.append(conn)
+                return
+            self._connections.discard(conn)
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Arka plan iş parçacıkları için havuzdan bağlantı ödünç verir
         
-        # Çalışan tablosu
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS employees (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            weekly_salary REAL NOT NULL,
-            daily_food REAL NOT NULL,
-            daily_transport REAL NOT NULL,
-            active INTEGER DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
+        with db.connection() as conn:
+            conn.execute(...)
         
-        # Çalışma saatleri tablosu
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS work_hours (
-            id INTEGER PRIMARY KEY,
-            employee_id INTEGER,
-            date TEXT NOT NULL,
-            entry_time TEXT,
-            lunch_start TEXT,
-            lunch_end TEXT,
-            exit_time TEXT,
-            day_active INTEGER DEFAULT 1,
-            FOREIGN KEY (employee_id) REFERENCES employees (id)
-        )
-        ''')
+        Kapsam içinde aynı iş parçacığından çağrılan EmployeeDB okuma metotları
+        da bu bağlantıyı kullanır. Ana iş parçacığında ana bağlantı döner.
+        """
+        borrowed = getattr(self._local, 'conn', None) is None
+        conn = self.conn
+        try:
+            yield conn
+        finally:
+            if borrowed:
+                self.release_connection()
+
+    def close(self):
+        """Tüm bağlantıları kapatır (WAL dosyası ana veritabanına aktarılır)
         
-        # Payments tablosunda date sütunu varsa week_start_date olarak yeniden adlandır
+        Arka plan işçileri önceden beklenmelidir; iş parçacıklarında hâlâ
+        tutulan bağlantılar da kapatılır.
+        """
+        # Bekleyen bildirimler bağlantı kapanmadan dinleyicilere ulaşsın
+        self.changes.flush()
+        with self._pool_lock:
+            others = self._connections - {self._main_conn}
+            self._connections = set()
+            self._idle_connections = []
+        for conn in others:
+            conn.close()
+        self._main_conn.commit()
+        self._main_conn.close()
+
+    def create_tables(self):
+        """Veritabanı şemasını oluşturur/günceller (bekleyen göçleri bir kez uygular)"""
+        version = migrations.get_schema_version(self.conn)
+        migrations.migrate(self.conn)
+        if version < migrations.WEEKLY_ROLLUP_VERSION:
+            # weekly_rollup tablosu yeni oluşturuldu: mevcut kayıtlardan doldur
+            self.rebuild_rollups()
+    
+    @contextmanager
+    def batch(self):
+        """Yazma işlemlerini tek bir işlemde (tek commit) toplar
+        
+        with db.batch():
+            db.save_work_hours(...)
+            db.add_payment(...)
+        
+        Kapsam içindeki metotlar commit etmez ve sinyal yayınlamaz; en dıştaki
+        kapsam bitince tek commit yapılır ve sinyaller birleştirilerek gönderilir.
+        Hata olursa kapsamdaki değişiklikler geri alınır ve sinyaller atılır.
+        İç içe kapsamlar SAVEPOINT ile kendi içinde geri alınabilir.
+        """
+        depth = self._batch_depth
+        savepoint = f"batch_{depth}"
+        signal_count = len(self._pending_signals)
+        if depth > 0:
+            # İşlem açılmadan kurulan SAVEPOINT, RELEASE ile commit edilir; dış kapsam geri alabilsin
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            self.conn.execute(f"SAVEPOINT {savepoint}")
+        self._batch_depth += 1
         try:
-            # Önce mevcut payments tablosunun yapısını kontrol et
-            cursor.execute("PRAGMA table_info(payments)")
-            columns = cursor.fetchall()
-            
-            has_date_column = False
-            has_week_start_date_column = False
-            
-            for column in columns:
-                if column[1] == 'date':
-                    has_date_column = True
-                if column[1] == 'week_start_date':
-                    has_week_start_date_column = True
-            
-            # Eğer date sütunu varsa ve week_start_date sütunu yoksa
-            if has_date_column and not has_week_start_date_column:
-                # Geçici tablo oluştur
-                cursor.execute('''
-                CREATE TABLE payments_temp (
-                    id INTEGER PRIMARY KEY,
-                    employee_id INTEGER,
-                    week_start_date TEXT NOT NULL,
-                    payment_type TEXT,
-                    amount REAL NOT NULL,
-                    description TEXT,
-                    is_permanent INTEGER DEFAULT 0,
-                    FOREIGN KEY (employee_id) REFERENCES employees (id)
-                )
-                ''')
-                
-                # Verileri geçici tabloya kopyala
-                cursor.execute('''
-                INSERT INTO payments_temp (id, employee_id, week_start_date, payment_type, amount, description, is_permanent)
-                SELECT id, employee_id, date, payment_type, amount, description, is_permanent FROM payments
-                ''')
-                
-                # Eski tabloyu sil
-                cursor.execute("DROP TABLE payments")
-                
-                # Geçici tabloyu yeniden adlandır
-                cursor.execute("ALTER TABLE payments_temp RENAME TO payments")
-                
-                self.conn.commit()
+            yield self
+        except Exception:
+            self._batch_depth -= 1
+            if depth > 0:
+                self.conn.execute(f"ROLLBACK TO {savepoint}")
+                self.conn.execute(f"RELEASE {savepoint}")
             else:
-                # Ödemeler tablosu
-                cursor.execute('''
-                CREATE TABLE IF NOT EXISTS payments (
-                    id INTEGER PRIMARY KEY,
-                    employee_id INTEGER,
-                    week_start_date TEXT NOT NULL,
-                    payment_type TEXT,
-                    amount REAL NOT NULL,
-                    description TEXT,
-                    is_permanent INTEGER DEFAULT 0,
-                    FOREIGN KEY (employee_id) REFERENCES employees (id)
-                )
-                ''')
-        except Exception as e:
-            # Ödemeler tablosu
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS payments (
-                id INTEGER PRIMARY KEY,
-                employee_id INTEGER,
-                week_start_date TEXT NOT NULL,
-                payment_type TEXT,
-                amount REAL NOT NULL,
-                description TEXT,
-                is_permanent INTEGER DEFAULT 0,
-                FOREIGN KEY (employee_id) REFERENCES employees (id)
-            )
-            ''')
+                self.conn.rollback()
+            # Geri alınan değişikliklerin sinyallerini at
+            del self._pending_signals[signal_count:]
+            self._clear_caches()
+            raise
+        self._batch_depth -= 1
+        if depth > 0:
+            self.conn.execute(f"RELEASE {savepoint}")
+            return
+        # Sinyaller tek ChangeSet olarak dinleyicilere gitsin
+        self._commit_pending(held=True)
+
+    def _commit(self):
+        """batch() kapsamı dışında commit eder, kapsam içindeyse commit en dış kapsama bırakılır"""
+        if self._batch_depth == 0:
+            self._commit_pending()
+
+    def _commit_pending(self, held=False):
+        """Özet tabloyu aynı işlemde günceller, commit eder ve bekleyen sinyalleri yayınlar"""
+        pending, self._pending_signals = self._pending_signals, []
+        try:
+            self._update_rollups(pending)
+        except Exception:
+            self.conn.rollback()
+            self._clear_caches()
+            raise
+        self.conn.commit()
+        # Aynı sinyali bir kez yayınla
+        signals = list(dict.fromkeys(pending))
+        if held:
+            with self.changes.held():
+                for signal, args in signals:
+                    signal.emit(*args)
+        else:
+            for signal, args in signals:
+                signal.emit(*args)
+
+    def _notify(self, signal, *args):
+        """Değişiklik sinyalini kaydeder; commit edilince (_commit veya batch() sonu) yayınlanır"""
+        self._write_serial += 1
+        if not args:
+            # data_changed: kapsamı belirsiz toplu değişiklik, tüm önbellekler yeniden okunur
+            self._clear_caches()
+            self._pending_signals.append((signal, args))
+            return
+        employee_id = args[0]
+        if signal != self.payments_changed:
+            self._active_weeks_cache = None
+        else:
+            # add_payment/update_payment/delete_payment: çalışanın sabit ödemeleri yeniden okunur
+            self._permanent_payments_cache.pop(employee_id)
+        if signal == self.work_hours_changed:
+            date = args[1]
+            self._week_cache.pop((employee_id, week_start_of(date)))
+            self._week_additions_cache.pop_where(
+                lambda key: key[0] == employee_id and key[1] <= date <= key[2])
+        else:
+            # Çalışan ya da ödeme değişti: çalışanın tüm eklenti toplamları yeniden okunur
+            self._week_additions_cache.pop_where(lambda key: key[0] == employee_id)
+        if signal == self.employee_changed:
+            self._employee_cache.pop(employee_id)
+            self._template_cache.pop(employee_id)
+            self._week_cache.pop_where(lambda key: key[0] == employee_id)
+        self._pending_signals.append((signal, args))
+
+    def _clear_caches(self):
+        """Geri alınan işlemden sonra tüm okuma önbelleklerini boşaltır"""
+        self._write_serial += 1
+        self._active_weeks_cache = None
+        self._permanent_payments_cache.clear()
+        self._week_cache.clear()
+        self._employee_cache.clear()
+        self._week_additions_cache.clear()
+        self._template_cache.clear()
+
+    def _can_cache(self):
+        """Önbelleğe sadece ana bağlantının okuduğu yazılır
         
-        # Haftalık özet tablosu
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS weekly_summaries (
-            id INTEGER PRIMARY KEY,
-            week_start_date TEXT NOT NULL UNIQUE,
-            total_amount REAL NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
+        Arka plan bağlantısı ana iş parçacığının henüz commit edilmemiş
+        yazmalarını görmez; okuduğu eski veri önbelleğe girmemeli.
+        """
+        return self.conn is self._main_conn
+
+    def cache_stats(self):
+        """Okuma önbelleklerinin isabet/ıska sayaçları (ayar ve ölçüm için)
         
-        # Haftalık özet detayları tablosu
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS weekly_summary_details (
-            id INTEGER PRIMARY KEY,
-            summary_id INTEGER,
-            employee_id INTEGER,
-            name TEXT NOT NULL,
-            total_hours REAL NOT NULL,
-            weekly_salary REAL NOT NULL,
-            food_allowance REAL NOT NULL,
-            transport_allowance REAL NOT NULL,
-            total_additions REAL NOT NULL,
-            total_deductions REAL NOT NULL,
-            total_weekly_salary REAL NOT NULL,
-            FOREIGN KEY (summary_id) REFERENCES weekly_summaries (id),
-            FOREIGN KEY (employee_id) REFERENCES employees (id)
-        )
-        ''')
+        Returns:
+            dict: önbellek adı -> {'hits', 'misses', 'size', 'maxsize'}
+        """
+        return {
+            'week_work_hours': self._week_cache.stats(),
+            'employees': self._employee_cache.stats(),
+            'week_additions': self._week_additions_cache.stats(),
+            'permanent_payments': self._permanent_payments_cache.stats(),
+            'schedule_templates': self._template_cache.stats()
+        }
+
+    def prefetch_token(self):
+        """Arka planda okunacak veri için durum damgası (ana iş parçacığında alınır)
         
-        self.conn.commit()
-    
+        Açık işlem varken None döner: arka plan bağlantısı commit edilmemiş
+        yazmaları görmeyeceği için okuduğu veri önbelleğe yazılmamalı.
+        """
+        if self._batch_depth or self._main_conn.in_transaction:
+            return None
+        return self._write_serial
+
+    def is_week_cached(self, employee_id, week_start_date):
+        """Zaman takibi ekranının (çalışan, hafta) için okuyacağı her şey önbellekte mi"""
+        week_start = week_start_of(week_start_date)
+        week_end = (datetime.strptime(week_start, "%Y-%m-%d") + timedelta(days=6)).strftime("%Y-%m-%d")
+        return ((employee_id, week_start) in self._week_cache
+                and employee_id in self._employee_cache
+                and employee_id in self._template_cache
+                and employee_id in self._permanent_payments_cache
+                and self._week_additions_cache.peek((employee_id, week_start, week_end), (None, None))[1] is not None)
+
+    def read_week_bundle(self, employee_id, week_start_date):
+        """Zaman takibi ekranının bir (çalışan, hafta) için okuduğu verileri önbelleğe dokunmadan okur
+        
+        Arka plan iş parçacığından db.connection() kapsamında çağrılabilir;
+        sonuç ana iş parçacığında store_week_bundle ile önbelleğe yazılır.
+        """
+        week_start = week_start_of(week_start_date)
+        week_end = (datetime.strptime(week_start, "%Y-%m-%d") + timedelta(days=6)).strftime("%Y-%m-%d")
+        return {
+            'employee_id': employee_id,
+            'week_start': week_start,
+            'week_end': week_end,
+            'employee': self._query_employee(employee_id),
+            'week': self._query_week_work_hours(employee_id, week_start),
+            'template': self._query_schedule_template(employee_id),
+            'permanent_payments': self._query_permanent_payments(employee_id),
+            'additions': (
+                self._query_week_addition_sum(employee_id, week_start, week_end),
+                self._query_week_worked(employee_id, week_start, week_end)
+            )
+        }
+
+    def store_week_bundle(self, token, bundle):
+        """read_week_bundle sonucunu önbelleğe yazar (ana iş parçacığında)
+        
+        token alındıktan sonra yazma olduysa veri eskimiş olabilir, yazılmaz.
+        
+        Returns:
+            bool: Önbelleğe yazıldıysa True
+        """
+        if token is None or token != self.prefetch_token() or bundle['employee'] is None:
+            return False
+        employee_id = bundle['employee_id']
+        self._employee_cache.put(employee_id, bundle['employee'])
+        self._week_cache.put((employee_id, bundle['week_start']), bundle['week'])
+        self._template_cache.put(employee_id, bundle['template'])
+        if employee_id not in self._permanent_payments_cache:
+            self._permanent_payments_cache.put(employee_id, bundle['permanent_payments'])
+        self._week_additions_cache.put((employee_id, bundle['week_start'], bundle['week_end']), bundle['additions'])
+        return True
+
     def add_employee(self, name, weekly_salary, daily_food, daily_transport):
         """Yeni çalışan ekler"""
         cursor = self.conn.cursor()
-        # İsmi büyük harfe çevir
-        name = name.strip().upper()
+        # İsim Türkçe büyük harfle kaydedilir (eski kayıtlar göç 11 ile çevrildi)
+        name = normalize_name(name)
         
         # Aynı isimde çalışan var mı kontrol et (aktif veya pasif)
         cursor.execute('''
@@ -180,18 +389,17 @@ class EmployeeDB(QObject):
         VALUES (?, ?, ?, ?, 1)
         ''', (name, hourly_rate, daily_food, daily_transport))
         
-        self.conn.commit()
         last_id = cursor.lastrowid
-        
-        self.data_changed.emit()
+        self._notify(self.employee_changed, last_id)
+        self._commit()
         return last_id
     
     def update_employee(self, employee_id, name, weekly_salary, daily_food, daily_transport):
         """Çalışan bilgilerini günceller"""
         cursor = self.conn.cursor()
         
-        # İsmi büyük harfe çevir
-        name = name.strip().upper()
+        # İsim Türkçe büyük harfle kaydedilir
+        name = normalize_name(name)
         
         # Haftalık ücreti saatlik ücrete çevir (50 saate böl)
         hourly_rate = weekly_salary / 50
@@ -201,9 +409,9 @@ class EmployeeDB(QObject):
         SET name = ?, weekly_salary = ?, daily_food = ?, daily_transport = ?
         WHERE id = ?
         ''', (name, hourly_rate, daily_food, daily_transport, employee_id))
-        
-        self.conn.commit()
-        self.data_changed.emit()
+
+        self._notify(self.employee_changed, employee_id)
+        self._commit()
         return True
     
     def update_employee_status(self, employee_id, is_active):
@@ -215,8 +423,9 @@ class EmployeeDB(QObject):
         SET is_active = ?
         WHERE id = ?
         ''', (is_active, employee_id))
-        
-        self.conn.commit()
+
+        self._notify(self.employee_changed, employee_id)
+        self._commit()
     
     def get_employees(self):
         """Tüm çalışanları getirir"""
@@ -230,7 +439,16 @@ class EmployeeDB(QObject):
         return employees
     
     def get_employee(self, employee_id):
-        """ID'ye göre çalışan bilgilerini getirir"""
+        """ID'ye göre çalışan bilgilerini getirir (çalışan değişene kadar önbellekten)"""
+        employee = self._employee_cache.get(employee_id)
+        if employee is not None:
+            return employee
+        employee = self._query_employee(employee_id)
+        if employee is not None and self._can_cache():
+            self._employee_cache.put(employee_id, employee)
+        return employee
+
+    def _query_employee(self, employee_id):
         cursor = self.conn.cursor()
         cursor.execute('SELECT id, name, weekly_salary, daily_food, daily_transport, is_active FROM employees WHERE id = ?', (employee_id,))
         employee = cursor.fetchone()
@@ -253,97 +471,128 @@ class EmployeeDB(QObject):
         WHERE employee_id = ?
         ''', (employee_id,))
         
+        cursor.execute('''
+        DELETE FROM schedule_templates
+        WHERE employee_id = ?
+        ''', (employee_id,))
+        
         # Sonra çalışanı sil
         cursor.execute('''
         DELETE FROM employees
         WHERE id = ?
         ''', (employee_id,))
-        
-        self.conn.commit()
-        self.data_changed.emit()
+
+        self._notify(self.employee_changed, employee_id)
+        self._commit()
+    
+    # Çalışma saati UPSERT'ü: day_active None ise yeni kayıtta 1 (aktif), mevcut kayıtta eski değer korunur
+    WORK_HOURS_UPSERT_SQL = '''
+        INSERT INTO work_hours (employee_id, date, entry_time, lunch_start, lunch_end, exit_time, is_active, day_active)
+        VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, 1))
+        ON CONFLICT (employee_id, date) DO UPDATE SET
+            entry_time = excluded.entry_time,
+            lunch_start = excluded.lunch_start,
+            lunch_end = excluded.lunch_end,
+            exit_time = excluded.exit_time,
+            is_active = excluded.is_active,
+            day_active = COALESCE(?, work_hours.day_active)
+        '''
     
     def save_work_hours(self, employee_id, date, entry_time, lunch_start, lunch_end, exit_time, is_active=1, day_active=None):
-        """Çalışma saatlerini kaydeder"""
+        """Çalışma saatlerini kaydeder (varsa günceller, yoksa ekler)"""
         cursor = self.conn.cursor()
         
-        # Önce bu tarih için kayıt var mı kontrol et
-        cursor.execute('''
-        SELECT id, day_active FROM work_hours 
-        WHERE employee_id = ? AND date = ?
-        ''', (employee_id, date))
-        
-        record = cursor.fetchone()
+        cursor.execute(self.WORK_HOURS_UPSERT_SQL,
+                       (employee_id, date, entry_time, lunch_start, lunch_end, exit_time, is_active, day_active, day_active))
         
-        # Eğer day_active parametresi None ise ve kayıt varsa, mevcut değeri koru
-        if day_active is None and record:
-            day_active = record[1]
-        # Eğer day_active parametresi None ise ve kayıt yoksa, varsayılan olarak 1 (aktif) yap
-        elif day_active is None:
-            day_active = 1
+        self._notify(self.work_hours_changed, employee_id, date)
+        self._commit()
+    
+    def save_work_hours_bulk(self, employee_id, records):
+        """Bir çalışanın birden fazla gününü tek işlemde (tek commit) kaydeder
         
-        if record:
-            # Kayıt varsa güncelle
-            cursor.execute('''
-            UPDATE work_hours
-            SET entry_time = ?, lunch_start = ?, lunch_end = ?, exit_time = ?, is_active = ?, day_active = ?
-            WHERE employee_id = ? AND date = ?
-            ''', (entry_time, lunch_start, lunch_end, exit_time, is_active, day_active, employee_id, date))
-        else:
-            # Kayıt yoksa yeni ekle
-            cursor.execute('''
-            INSERT INTO work_hours (employee_id, date, entry_time, lunch_start, lunch_end, exit_time, is_active, day_active)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (employee_id, date, entry_time, lunch_start, lunch_end, exit_time, is_active, day_active))
+        Args:
+            employee_id (int): Çalışan ID
+            records (list): dict listesi (date, entry_time, lunch_start, lunch_end,
+                            exit_time, is_active, day_active)
+        """
+        if not records:
+            return
+        cursor = self.conn.cursor()
+        params = []
+        for record in records:
+            day_active = record.get('day_active')
+            params.append((
+                employee_id, record['date'], record['entry_time'], record['lunch_start'],
+                record['lunch_end'], record['exit_time'], record.get('is_active', 1),
+                day_active, day_active
+            ))
+        # Önbellekteki haftalar yazılanlarla güncellenip geri konur (yeniden sorgu gerekmez)
+        weeks = {}
+        for record in records:
+            key = (employee_id, week_start_of(record['date']))
+            if key not in weeks:
+                weeks[key] = self._week_cache.peek(key)
+        with self.batch():
+            cursor.executemany(self.WORK_HOURS_UPSERT_SQL, params)
+            for record in records:
+                self._notify(self.work_hours_changed, employee_id, record['date'])
+            for key, cached in weeks.items():
+                if cached is not None and self._can_cache():
+                    self._write_through_week(key, cached, records)
+    
+    def _write_through_week(self, key, cached, records):
+        """save_work_hours_bulk ile yazılan günleri önbellekteki haftaya işler
         
-        self.conn.commit()
+        Yeni eklenen gün varsa (id'si bilinmiyor) hafta önbelleğe geri konmaz,
+        sonraki okumada tek sorguyla yeniden yüklenir.
+        """
+        by_date = {record['date']: dict(record) for record in cached}
+        for record in records:
+            if week_start_of(record['date']) != key[1]:
+                continue
+            day = by_date.get(record['date'])
+            if day is None:
+                return
+            for field in ('entry_time', 'lunch_start', 'lunch_end', 'exit_time'):
+                day[field] = record[field]
+            day['is_active'] = record.get('is_active', 1)
+            if record.get('day_active') is not None:
+                day['day_active'] = record['day_active']
+        self._week_cache.put(key, [by_date[date] for date in sorted(by_date)])
+    
+    # update_work_hours için izin verilen zaman türleri -> veritabanı sütunu
+    TIME_COLUMNS = {
+        "entry": "entry_time",
+        "entry_time": "entry_time",
+        "lunch_start": "lunch_start",
+        "lunch_end": "lunch_end",
+        "exit": "exit_time",
+        "exit_time": "exit_time",
+    }
     
     def update_work_hours(self, employee_id, date, time_type, time_value):
         """Belirli bir zaman türünü günceller (giriş, çıkış, öğle başlangıç/bitiş)"""
         cursor = self.conn.cursor()
         
         # time_type değerini veritabanı sütun adına dönüştür
-        db_column = time_type
-        if time_type == "entry":
-            db_column = "entry_time"
-        elif time_type == "exit":
-            db_column = "exit_time"
-        
-        # Önce bu tarih için kayıt var mı kontrol et
-        cursor.execute('''
-        SELECT id FROM work_hours 
-        WHERE employee_id = ? AND date = ?
-        ''', (employee_id, date))
-        
-        record = cursor.fetchone()
-        
-        if record:
-            # Kayıt varsa güncelle
-            cursor.execute(f'''
-            UPDATE work_hours
-            SET {db_column} = ?
-            WHERE employee_id = ? AND date = ?
-            ''', (time_value, employee_id, date))
-        else:
-            # Kayıt yoksa yeni ekle
-            # Diğer varsayılan değerleri belirleyelim
-            entry_time = lunch_start = lunch_end = exit_time = "00:00"
-            
-            # Güncellenen alanı ayarla
-            if time_type == "entry":
-                entry_time = time_value
-            elif time_type == "lunch_start":
-                lunch_start = time_value
-            elif time_type == "lunch_end":
-                lunch_end = time_value
-            elif time_type == "exit":
-                exit_time = time_value
-                
-            cursor.execute('''
-            INSERT INTO work_hours (employee_id, date, entry_time, lunch_start, lunch_end, exit_time, is_active)
-            VALUES (?, ?, ?, ?, ?, ?, 1)
-            ''', (employee_id, date, entry_time, lunch_start, lunch_end, exit_time))
-        
-        self.conn.commit()
+        db_column = self.TIME_COLUMNS.get(time_type)
+        if db_column is None:
+            raise ValueError(f"Geçersiz zaman türü: {time_type}")
+        
+        # Kayıt yoksa diğer alanlar 00:00 ile eklenir, varsa sadece ilgili sütun güncellenir
+        values = {"entry_time": "00:00", "lunch_start": "00:00", "lunch_end": "00:00", "exit_time": "00:00"}
+        values[db_column] = time_value
+        
+        cursor.execute(f'''
+        INSERT INTO work_hours (employee_id, date, entry_time, lunch_start, lunch_end, exit_time, is_active)
+        VALUES (?, ?, ?, ?, ?, ?, 1)
+        ON CONFLICT (employee_id, date) DO UPDATE SET
+            {db_column} = excluded.{db_column}
+        ''', (employee_id, date, values["entry_time"], values["lunch_start"], values["lunch_end"], values["exit_time"]))
+        
+        self._notify(self.work_hours_changed, employee_id, date)
+        self._commit()
     
     def get_work_hours(self, employee_id, date):
         """Belirli bir tarih için çalışma saatlerini getirir"""
@@ -368,33 +617,28 @@ class EmployeeDB(QObject):
         Returns:
             list: Haftalık çalışma saatleri listesi
         """
-        cursor = self.conn.cursor()
-        
-        # String formatındaki tarihi datetime nesnesine çevir
+        # Hafta başlangıcı Pazartesi'ye yuvarlanır (indeksli week_start ile eşitlik sorgusu)
         week_start = datetime.strptime(week_start_date, "%Y-%m-%d")
+        week_start_str = (week_start - timedelta(days=week_start.weekday())).strftime("%Y-%m-%d")
         
-        # Haftanın son günü (6 gün sonrası - Pazartesiden Pazara)
-        week_end = week_start + timedelta(days=6)
-        
-        # Tarih formatlarını string olarak al
-        week_start_str = week_start.strftime("%Y-%m-%d")
-        week_end_str = week_end.strftime("%Y-%m-%d")
-        
-        # Önce day_active sütununu kontrol et
-        try:
-            cursor.execute('SELECT day_active FROM work_hours LIMIT 1')
-        except sqlite3.OperationalError:
-            # Sütun yoksa ekle
-            cursor.execute('ALTER TABLE work_hours ADD COLUMN day_active INTEGER DEFAULT 1')
-            cursor.execute('UPDATE work_hours SET day_active = 1')
-            self.conn.commit()
+        # Aynı hafta tekrar açılınca sorgu yapılmaz; çağıran kayıtları değiştirebilsin diye kopya döner
+        cached = self._week_cache.get((employee_id, week_start_str))
+        if cached is not None:
+            return [dict(record) for record in cached]
         
+        records = self._query_week_work_hours(employee_id, week_start_str)
+        if self._can_cache():
+            self._week_cache.put((employee_id, week_start_str), [dict(record) for record in records])
+        return records
+
+    def _query_week_work_hours(self, employee_id, week_start_str):
+        cursor = self.conn.cursor()
         cursor.execute('''
         SELECT id, date, entry_time, lunch_start, lunch_end, exit_time, is_active, day_active
         FROM work_hours
-        WHERE employee_id = ? AND date BETWEEN ? AND ?
+        WHERE week_start = ? AND employee_id = ?
         ORDER BY date
-        ''', (employee_id, week_start_str, week_end_str))
+        ''', (week_start_str, employee_id))
         
         rows = cursor.fetchall()
         records = []
@@ -415,6 +659,97 @@ class EmployeeDB(QObject):
         
         return records
 
+    def get_schedule_template(self, employee_id):
+        """Çalışanın haftalık çalışma şablonunu getirir (kaydı olmayan günler varsayılandır)
+        
+        Returns:
+            list: Pazartesi'den Pazar'a 7 dict (weekday, entry_time, lunch_start,
+                  lunch_end, exit_time, day_active)
+        """
+        template = self._template_cache.get(employee_id)
+        if template is None:
+            template = self._query_schedule_template(employee_id)
+            if self._can_cache():
+                self._template_cache.put(employee_id, template)
+        return [dict(day) for day in template]
+
+    def _query_schedule_template(self, employee_id):
+        entry_time, lunch_start, lunch_end, exit_time = DEFAULT_DAY_TIMES
+        template = [{
+            'weekday': weekday,
+            'entry_time': entry_time,
+            'lunch_start': lunch_start,
+            'lunch_end': lunch_end,
+            'exit_time': exit_time,
+            'day_active': 1 if weekday in DEFAULT_WORK_WEEKDAYS else 0
+        } for weekday in range(7)]
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT weekday, entry_time, lunch_start, lunch_end, exit_time, day_active
+        FROM schedule_templates
+        WHERE employee_id = ?
+        ''', (employee_id,))
+        for row in cursor.fetchall():
+            if 0 <= row[0] < 7:
+                template[row[0]] = dict(row)
+        return template
+
+    def save_schedule_template(self, employee_id, days):
+        """Çalışanın haftalık şablonunu kaydeder
+        
+        Args:
+            days (list): get_schedule_template formatında gün dict'leri (sadece verilen günler yazılır)
+        """
+        self.conn.executemany('''
+        INSERT INTO schedule_templates (employee_id, weekday, entry_time, lunch_start, lunch_end, exit_time, day_active)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (employee_id, weekday) DO UPDATE SET
+            entry_time = excluded.entry_time,
+            lunch_start = excluded.lunch_start,
+            lunch_end = excluded.lunch_end,
+            exit_time = excluded.exit_time,
+            day_active = excluded.day_active
+        ''', [
+            (employee_id, day['weekday'], day['entry_time'], day['lunch_start'],
+             day['lunch_end'], day['exit_time'], day['day_active'])
+            for day in days
+        ])
+        self._notify(self.employee_changed, employee_id)
+        self._commit()
+
+    def get_week_days(self, employee_id, week_start_date):
+        """
+        Çalışanın haftasını 7 gün olarak getirir: kaydı olan günler work_hours'tan
+        (tek aralık sorgusu), olmayanlar çalışanın şablonundan sanal olarak gelir.
+        Sanal günler veritabanına yazılmaz; bordroda sayılmaları için kaydedilmeleri gerekir.
+        Returns:
+            list: Pazartesi'den Pazar'a 7 dict (get_week_work_hours alanları + 'virtual')
+        """
+        week_start = datetime.strptime(week_start_of(week_start_date), "%Y-%m-%d")
+        records = {record['date']: record for record in self.get_week_work_hours(employee_id, week_start_date)}
+        template = self.get_schedule_template(employee_id)
+        days = []
+        for weekday in range(7):
+            date = (week_start + timedelta(days=weekday)).strftime("%Y-%m-%d")
+            record = records.get(date)
+            if record is not None:
+                record['virtual'] = False
+                days.append(record)
+                continue
+            day = template[weekday]
+            days.append({
+                'id': None,
+                'date': date,
+                'entry_time': day['entry_time'],
+                'lunch_start': day['lunch_start'],
+                'lunch_end': day['lunch_end'],
+                'exit_time': day['exit_time'],
+                'is_active': day['day_active'],
+                'day_active': day['day_active'],
+                'virtual': True
+            })
+        return days
+
     def update_day_active_status(self, work_hour_id, active_status):
         """Çalışma günü aktif/pasif durumunu günceller"""
         cursor = self.conn.cursor()
@@ -424,9 +759,15 @@ class EmployeeDB(QObject):
         SET day_active = ?
         WHERE id = ?
         ''', (1 if active_status else 0, work_hour_id))
-        
-        self.conn.commit()
-        return cursor.rowcount > 0
+        updated = cursor.rowcount > 0
+
+        if updated:
+            cursor.execute('SELECT employee_id, date FROM work_hours WHERE id = ?', (work_hour_id,))
+            row = cursor.fetchone()
+            if row:
+                self._notify(self.work_hours_changed, row[0], row[1])
+        self._commit()
+        return updated
 
     def toggle_employee_active(self, employee_id, active_status):
         """Çalışanın aktif/pasif durumunu değiştirir"""
@@ -436,8 +777,8 @@ class EmployeeDB(QObject):
                 'UPDATE employees SET is_active = ? WHERE id = ?',
                 (1 if active_status else 0, employee_id)
             )
-            self.conn.commit()
-            self.data_changed.emit()
+            self._notify(self.employee_changed, employee_id)
+            self._commit()
             return True
         except Exception as e:
             return False
@@ -455,42 +796,40 @@ class EmployeeDB(QObject):
         """Yeni çalışma saati kaydı oluşturur"""
         cursor = self.conn.cursor()
         
-        # Önce day_active sütununu kontrol et
-        try:
-            cursor.execute('SELECT day_active FROM work_hours LIMIT 1')
-        except sqlite3.OperationalError:
-            # Sütun yoksa ekle
-            cursor.execute('ALTER TABLE work_hours ADD COLUMN day_active INTEGER DEFAULT 1')
-            self.conn.commit()
-            
+        # Aynı gün için kayıt zaten varsa dokunma
         cursor.execute('''
         INSERT INTO work_hours (
             employee_id, date, entry_time, lunch_start, lunch_end, exit_time, day_active
         ) VALUES (?, ?, ?, ?, ?, ?, 1)
+        ON CONFLICT (employee_id, date) DO NOTHING
         ''', (employee_id, date, entry_time, lunch_start, lunch_end, exit_time))
-        
-        self.conn.commit()
+        inserted = cursor.rowcount > 0
+
+        if inserted:
+            self._notify(self.work_hours_changed, employee_id, date)
+        self._commit()
         return cursor.lastrowid
 
     def update_all_employee_names_to_uppercase(self):
-        """Tüm çalışanların isimlerini büyük harfe çevirir"""
-        cursor = self.conn.cursor()
+        """Normalize edilmemiş çalışan isimlerini Türkçe büyük harfe çevirir (bakım komutu)
         
-        # Önce tüm çalışanları al
-        cursor.execute('SELECT id, name FROM employees')
-        employees = cursor.fetchall()
+        İsimler yazılırken normalize edildiği için normalde hiçbir satır değişmez;
+        o durumda yazma yapılmaz ve sinyal yayınlanmaz.
         
-        # Her çalışanın ismini büyük harfe çevir
-        for employee_id, name in employees:
-            uppercase_name = name.strip().upper()
-            # Eğer isim zaten büyük harfse güncelleme yapma
-            if name != uppercase_name:
-                cursor.execute('UPDATE employees SET name = ? WHERE id = ?', 
-                              (uppercase_name, employee_id))
-        
-        self.conn.commit()
-        self.data_changed.emit()
-        return len(employees)
+        Returns:
+            int: Güncellenen çalışan sayısı
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        UPDATE employees
+        SET name = TR_UPPER(TRIM(name))
+        WHERE name IS NOT TR_UPPER(TRIM(name))
+        ''')
+        updated = cursor.rowcount
+        if updated:
+            self._notify(self.data_changed)
+        self._commit()
+        return updated
 
     def get_active_employees(self):
         """Sadece aktif çalışanları getirir"""
@@ -512,12 +851,15 @@ class EmployeeDB(QObject):
         """
         cursor = self.conn.cursor()
         
+        # kind: eklenti/kesinti sınıfı, bordro sorguları LOWER(payment_type) yerine bunu kullanır
         cursor.execute('''
-        INSERT INTO payments (employee_id, week_start_date, payment_type, amount, description, is_permanent)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ''', (employee_id, week_start_date, payment_type, amount, description, is_permanent))
-        
-        self.conn.commit()
+        INSERT INTO payments (employee_id, week_start_date, payment_type, amount, description, is_permanent, kind)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (employee_id, week_start_date, payment_type, amount, description, is_permanent,
+              payroll.payment_kind(payment_type)))
+
+        self._notify(self.payments_changed, employee_id, "" if is_permanent else (week_start_date or ""))
+        self._commit()
         return cursor.lastrowid
 
     def get_weekly_payments(self, employee_id, week_start_date):
@@ -541,26 +883,50 @@ class EmployeeDB(QObject):
         
         week_payments = cursor.fetchall()
         
-        # Sabit ek ödemeleri getir (tüm haftalara uygulanır)
-        cursor.execute('''
-        SELECT id, payment_type, amount, description, is_permanent
-        FROM payments
-        WHERE employee_id = ? AND is_permanent = 1
-        ''', (employee_id,))
-        
-        permanent_payments = cursor.fetchall()
-        
         # Tüm ödemeleri birleştir
         all_payments = list(week_payments)
         
-        # Sabit ödemeleri ekle (bu hafta için zaten eklenmemişse)
+        # Sabit ek ödemeleri ekle (tüm haftalara uygulanır, bu hafta için zaten eklenmemişse)
         payment_ids = [p[0] for p in week_payments]
-        for payment in permanent_payments:
-            if payment[0] not in payment_ids:
-                all_payments.append(payment)
+        for payment in self.get_permanent_payments(employee_id):
+            if payment['id'] not in payment_ids:
+                all_payments.append((
+                    payment['id'],
+                    payment['payment_type'],
+                    payment['amount'],
+                    payment['description'],
+                    payment['is_permanent']
+                ))
         
         return all_payments
 
+    def get_permanent_payments(self, employee_id):
+        """Çalışanın sabit ödemelerini getirir (ödeme yazılana kadar önbellekten)
+        
+        Sabit ödemesi olmayan çalışan için boş liste döner; bordroda 0 tutarlı
+        sabit ödeme ile aynı sonucu verir.
+        
+        Returns:
+            list: Her ödeme için dict (id, week_start_date, payment_type, amount,
+                  description, is_permanent, kind)
+        """
+        payments = self._permanent_payments_cache.get(employee_id)
+        if payments is None:
+            payments = self._query_permanent_payments(employee_id)
+            if self._can_cache():
+                self._permanent_payments_cache.put(employee_id, payments)
+        return [dict(payment) for payment in payments]
+
+    def _query_permanent_payments(self, employee_id):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT id, week_start_date, payment_type, amount, description, is_permanent, kind
+        FROM payments
+        WHERE employee_id = ? AND is_permanent = 1
+        ORDER BY id
+        ''', (employee_id,))
+        return [dict(row) for row in cursor.fetchall()]
+
     def update_payment(self, payment_id, amount, description=None):
         """Ek ödeme, kesinti veya sabit ödeme günceller"""
         cursor = self.conn.cursor()
@@ -578,21 +944,37 @@ class EmployeeDB(QObject):
             SET amount = ?, description = ?
             WHERE id = ?
             ''', (amount, description, payment_id))
-        
-        self.conn.commit()
-        return cursor.rowcount > 0
+        updated = cursor.rowcount > 0
+
+        if updated:
+            self._emit_payment_changed(self.get_payment(payment_id))
+        self._commit()
+        return updated
 
     def delete_payment(self, payment_id):
         """Ek ödeme, kesinti veya sabit ödemeyi siler"""
         cursor = self.conn.cursor()
-        
+        # Silmeden önce hangi çalışanı/haftayı etkilediğini al
+        payment = self.get_payment(payment_id)
+
         cursor.execute('''
         DELETE FROM payments
         WHERE id = ?
         ''', (payment_id,))
-        
-        self.conn.commit()
-        return cursor.rowcount > 0
+        deleted = cursor.rowcount > 0
+
+        if deleted:
+            self._emit_payment_changed(payment)
+        self._commit()
+        return deleted
+
+    def _emit_payment_changed(self, payment):
+        """get_payment satırı için payments_changed sinyalini yayınlar"""
+        if not payment:
+            return
+        # Sabit ödemeler tüm haftaları etkiler
+        week_start_date = "" if payment[6] else (payment[2] or "")
+        self._notify(self.payments_changed, payment[1], week_start_date)
 
     def get_payment(self, payment_id):
         """Belirli bir ödeme kaydını getirir"""
@@ -606,71 +988,74 @@ class EmployeeDB(QObject):
         
         return cursor.fetchone()
     
+    # weekly_summary_details sütunları (employee_id hariç); dict anahtarları aynı, employee_id 'id'
+    SUMMARY_DETAIL_COLUMNS = (
+        'name', 'total_hours', 'weekly_salary', 'food_allowance', 'transport_allowance',
+        'total_additions', 'total_deductions', 'total_weekly_salary',
+        # Kapatılmış hafta anlık görüntüsü için (sadece payroll.summary_detail satırlarında)
+        'hourly_rate', 'is_active', 'normal_minutes', 'overtime_minutes',
+        'active_days', 'food_count', 'has_work', 'normal_pay', 'overtime_pay'
+    )
+
     def save_weekly_summary(self, week_start_date, total_amount, employee_data):
         """Haftalık özeti veritabanına kaydeder
         
+        Özet satırı ve detaylar UPSERT ile yazılır: mevcut detay satırları yerinde
+        güncellenir (değişmeyenlere dokunulmaz), listede olmayan çalışanlar silinir.
+        
         Args:
             week_start_date (str): Hafta başlangıç tarihi (YYYY-MM-DD formatında)
             total_amount (float): Toplam ödenecek tutar
             employee_data (list): Çalışan verileri listesi
             
         Returns:
-            int: Eklenen kaydın ID'si, hata durumunda None
+            int: Eklenen kaydın ID'si, hata durumunda veya hafta kapatılmışsa None
         """
         try:
-            cursor = self.conn.cursor()
+            # Özet ve detaylar tek işlemde yazılır, hata olursa geri alınır
+            with self.batch():
+                cursor = self.conn.cursor()
             
-            # Önce bu hafta için kayıt var mı kontrol et
-            cursor.execute(
-                "SELECT id FROM weekly_summaries WHERE week_start_date = ?", 
-                (week_start_date,)
-            )
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Varsa güncelle
-                summary_id = existing[0]
-                cursor.execute(
-                    "UPDATE weekly_summaries SET total_amount = ?, created_at = CURRENT_TIMESTAMP WHERE id = ?",
-                    (total_amount, summary_id)
-                )
-                
-                # Detayları sil
-                cursor.execute("DELETE FROM weekly_summary_details WHERE summary_id = ?", (summary_id,))
-            else:
-                # Yoksa yeni kayıt ekle
+                # Kapatılmış haftanın anlık görüntüsü değiştirilmez (önce reopen_week)
+                cursor.execute('''
+                    INSERT INTO weekly_summaries (week_start_date, total_amount) VALUES (?, ?)
+                    ON CONFLICT (week_start_date) DO UPDATE SET
+                        total_amount = excluded.total_amount, created_at = CURRENT_TIMESTAMP
+                    WHERE COALESCE(weekly_summaries.is_closed, 0) = 0
+                ''', (week_start_date, total_amount))
+                if cursor.rowcount == 0:
+                    return None
                 cursor.execute(
-                    "INSERT INTO weekly_summaries (week_start_date, total_amount) VALUES (?, ?)",
-                    (week_start_date, total_amount)
+                    "SELECT id FROM weekly_summaries WHERE week_start_date = ?",
+                    (week_start_date,)
                 )
-                summary_id = cursor.lastrowid
+                summary_id = cursor.fetchone()[0]
             
-            # Çalışan detaylarını ekle
-            for employee in employee_data:
-                cursor.execute('''
-                INSERT INTO weekly_summary_details (
-                    summary_id, employee_id, name, total_hours, weekly_salary,
-                    food_allowance, transport_allowance, total_additions,
-                    total_deductions, total_weekly_salary
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    summary_id,
-                    employee['id'],
-                    employee['name'],
-                    employee['total_hours'],
-                    employee['weekly_salary'],
-                    employee['food_allowance'],
-                    employee['transport_allowance'],
-                    employee['total_additions'],
-                    employee['total_deductions'],
-                    employee['total_weekly_salary']
-                ))
+                # Artık özette olmayan çalışanların detaylarını sil
+                employee_ids = [employee['id'] for employee in employee_data]
+                cursor.execute(f'''
+                    DELETE FROM weekly_summary_details
+                    WHERE summary_id = ? AND employee_id NOT IN ({','.join('?' * len(employee_ids))})
+                ''', [summary_id] + employee_ids)
+            
+                # Çalışan detaylarını tek executemany ile ekle/güncelle
+                columns = self.SUMMARY_DETAIL_COLUMNS
+                column_list = ', '.join(columns)
+                excluded_list = ', '.join(f"excluded.{column}" for column in columns)
+                cursor.executemany(f'''
+                    INSERT INTO weekly_summary_details (summary_id, employee_id, {column_list})
+                    VALUES (?, ?, {', '.join('?' * len(columns))})
+                    ON CONFLICT (summary_id, employee_id) DO UPDATE SET
+                        ({column_list}) = ({excluded_list})
+                    WHERE ({column_list}) IS NOT ({excluded_list})
+                ''', [
+                    (summary_id, employee['id']) + tuple(employee.get(column) for column in columns)
+                    for employee in employee_data
+                ])
             
-            self.conn.commit()
             return summary_id
         
         except Exception as e:
-            self.conn.rollback()
             return None
     
     def get_weekly_summary(self, week_start_date):
@@ -759,6 +1144,125 @@ class EmployeeDB(QObject):
         except Exception as e:
             return []
 
+    def week_input_hash(self, week_start_date):
+        """
+        Haftanın bordro girdilerinin (çalışma kayıtları ve haftaya özel ödemeler) özetini döndürür.
+        Kapatılmış haftanın kayıtlarının sonradan değişip değişmediğini anlamak için kullanılır.
+        """
+        week_start_str = week_start_of(week_start_date)
+        week_end = (datetime.strptime(week_start_str, "%Y-%m-%d") + timedelta(days=6)).strftime("%Y-%m-%d")
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT employee_id, date, entry_time, lunch_start, lunch_end, exit_time, is_active, day_active
+            FROM work_hours
+            WHERE week_start = ?
+            ORDER BY employee_id, date
+        ''', (week_start_str,))
+        work_hours = [list(row) for row in cursor.fetchall()]
+        # Ödeme satırları kimlikten bağımsız sıralanır (sil/yeniden ekle aynı özeti verir)
+        cursor.execute('''
+            SELECT employee_id, week_start_date, payment_type, amount
+            FROM payments
+            WHERE COALESCE(is_permanent, 0) = 0 AND week_start_date >= ? AND week_start_date <= ?
+            ORDER BY employee_id, week_start_date, payment_type, amount
+        ''', (week_start_str, week_end))
+        payments = [list(row) for row in cursor.fetchall()]
+        data = json.dumps({'work_hours': work_hours, 'payments': payments}, separators=(',', ':'))
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def close_week(self, week_start_date):
+        """
+        Haftayı kapatır: o anki bordro hesaplarını weekly_summaries içine değişmez bir
+        anlık görüntü olarak yazar. Kapatılmış hafta raporlarda yeniden hesaplanmadan
+        bu görüntüden gösterilir; kayıtlar sonradan değişirse hafta işaretlenir.
+        Returns:
+            int: Özet kaydının ID'si
+        """
+        week_start_str = week_start_of(week_start_date)
+        closed = self.get_closed_week(week_start_str)
+        if closed:
+            return closed['id']
+        results = payroll.calculate_rollups(self.get_week_rollups(week_start_str))
+        # Toplam, haftalık raporla aynı kuralla: ödenecek satırların yuvarlanmış toplamı
+        total_amount = sum(
+            round(result['total'] / 10) * 10
+            for result in results if result['has_work'] and result['total'] != 0
+        )
+        with self.batch():
+            summary_id = self.save_weekly_summary(
+                week_start_str, total_amount, [payroll.summary_detail(result) for result in results]
+            )
+            if summary_id is None:
+                raise RuntimeError(f"{week_start_str} haftasının özeti kaydedilemedi")
+            self.conn.execute('''
+                UPDATE weekly_summaries
+                SET is_closed = 1, closed_at = CURRENT_TIMESTAMP, input_hash = ?, drifted_at = NULL
+                WHERE id = ?
+            ''', (self.week_input_hash(week_start_str), summary_id))
+            self._notify(self.data_changed)
+        return summary_id
+
+    def reopen_week(self, week_start_date):
+        """Kapatılmış haftayı yeniden açar (hafta tekrar canlı hesaplanır)"""
+        self.conn.execute(
+            "UPDATE weekly_summaries SET is_closed = 0, drifted_at = NULL WHERE week_start_date = ? AND is_closed = 1",
+            (week_start_of(week_start_date),)
+        )
+        self._notify(self.data_changed)
+        self._commit()
+
+    def is_week_closed(self, week_start_date):
+        """Hafta kapatılmış mı"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT 1 FROM weekly_summaries WHERE week_start_date = ? AND is_closed = 1",
+            (week_start_of(week_start_date),)
+        )
+        return cursor.fetchone() is not None
+
+    def get_closed_week(self, week_start_date, verify=False):
+        """
+        Kapatılmış haftanın anlık görüntüsünü getirir.
+        Args:
+            week_start_date (str): Hafta başlangıç tarihi (YYYY-MM-DD formatında)
+            verify (bool): True ise girdiler ayrıca özetle karşılaştırılır
+                           (uygulama dışından yapılan değişiklikler için)
+        Returns:
+            dict: id, week_start_date, total_amount, closed_at, input_hash, drifted ve
+                  results (payroll hesap sonucu formatında); hafta kapalı değilse None
+        """
+        week_start_str = week_start_of(week_start_date)
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT id, total_amount, closed_at, input_hash, drifted_at
+            FROM weekly_summaries
+            WHERE week_start_date = ? AND is_closed = 1
+        ''', (week_start_str,))
+        summary = cursor.fetchone()
+        if not summary:
+            return None
+        summary_id, total_amount, closed_at, input_hash, drifted_at = summary
+        cursor.execute(f'''
+            SELECT employee_id, {', '.join(self.SUMMARY_DETAIL_COLUMNS)}
+            FROM weekly_summary_details
+            WHERE summary_id = ?
+            ORDER BY is_active DESC, name
+        ''', (summary_id,))
+        keys = ('id',) + self.SUMMARY_DETAIL_COLUMNS
+        results = [payroll.result_from_summary_detail(dict(zip(keys, row))) for row in cursor.fetchall()]
+        drifted = drifted_at is not None
+        if verify and not drifted:
+            drifted = self.week_input_hash(week_start_str) != input_hash
+        return {
+            'id': summary_id,
+            'week_start_date': week_start_str,
+            'total_amount': total_amount,
+            'closed_at': closed_at,
+            'input_hash': input_hash,
+            'drifted': drifted,
+            'results': results
+        }
+
     def get_employee_additions(self, employee_id, week_start_date, include_permanent_if_no_work=True):
         """
         Belirtilen çalışanın, verilen haftadaki toplam eklenti (bonus, prim, ek ödeme, sabit ek ödeme) tutarını getirir.
@@ -774,55 +1278,267 @@ class EmployeeDB(QObject):
         # Haftanın son günü (pazar)
         week_end = (datetime.datetime.strptime(week_start_str, '%Y-%m-%d') + datetime.timedelta(days=6)).strftime('%Y-%m-%d')
 
-        cursor = self.conn.cursor()
-        # Haftaya özel ödemeleri al
-        cursor.execute('''
-            SELECT id, amount FROM payments
-            WHERE employee_id = ?
-            AND LOWER(payment_type) IN ("eklenti", "bonus", "prim", "ek ödeme", "ek odeme", "ikramiye", "permanent", "sabit ek ödeme", "sabit ek odeme")
-            AND week_start_date >= ? AND week_start_date <= ?
-        ''', (employee_id, week_start_str, week_end))
-        week_rows = cursor.fetchall()
-        week_ids = {row[0] for row in week_rows}
-        week_sum = sum(row[1] for row in week_rows)
-
-        # Sabit ek ödemeleri (is_permanent=1) al, sadece bu haftada olmayanları ekle
-        cursor.execute('''
-            SELECT id, amount FROM payments
-            WHERE employee_id = ? AND is_permanent = 1
-        ''', (employee_id,))
-        perm_rows = cursor.fetchall()
+        # Haftanın toplamı ve çalışma durumu ödeme/çalışma saati yazılana kadar önbellekte
+        key = (employee_id, week_start_str, week_end)
+        cached = self._week_additions_cache.get(key)
+        week_entry = list(cached) if cached is not None else [None, None]
+        addition = payroll.PAYMENT_KIND_ADDITION
+        if week_entry[0] is None:
+            week_entry[0] = self._query_week_addition_sum(employee_id, week_start_str, week_end)
+        week_sum = week_entry[0]
+        # Sabit ödemeler önbellekten; bu haftanın eklentisi olanlar iki kez sayılmaz
+        perm_sum = sum(
+            payment['amount'] for payment in self.get_permanent_payments(employee_id)
+            if not (payment['kind'] == addition
+                    and payment['week_start_date'] and week_start_str <= payment['week_start_date'] <= week_end)
+        )
         # Çalışma kontrolü
         if not include_permanent_if_no_work:
             # O haftada çalışma var mı kontrol et
-            cursor.execute('''
-                SELECT COUNT(*) FROM work_hours
-                WHERE employee_id = ? AND date >= ? AND date <= ? AND (is_active = 1 OR day_active = 1)
-            ''', (employee_id, week_start_str, week_end))
-            work_count = cursor.fetchone()[0]
-            if work_count == 0:
+            if week_entry[1] is None:
+                week_entry[1] = self._query_week_worked(employee_id, week_start_str, week_end)
+            if not week_entry[1]:
                 perm_sum = 0
-            else:
-                perm_sum = sum(row[1] for row in perm_rows if row[0] not in week_ids)
-        else:
-            perm_sum = sum(row[1] for row in perm_rows if row[0] not in week_ids)
+        if tuple(week_entry) != cached and self._can_cache():
+            self._week_additions_cache.put(key, tuple(week_entry))
         return week_sum + perm_sum
 
+    def _query_week_addition_sum(self, employee_id, week_start_str, week_end):
+        # Haftaya özel eklentiler (çalışan/hafta/sınıf indeksiyle tek toplama sorgusu)
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT TOTAL(amount) FROM payments
+            WHERE employee_id = ? AND week_start_date BETWEEN ? AND ? AND kind = ?
+        ''', (employee_id, week_start_str, week_end, payroll.PAYMENT_KIND_ADDITION))
+        return cursor.fetchone()[0]
+
+    def _query_week_worked(self, employee_id, week_start_str, week_end):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT COUNT(*) FROM work_hours
+            WHERE employee_id = ? AND date >= ? AND date <= ? AND (is_active = 1 OR day_active = 1)
+        ''', (employee_id, week_start_str, week_end))
+        return cursor.fetchone()[0] > 0
+
     def get_available_weeks(self):
         """Tüm kaydedilmiş haftaların başlangıç tarihlerini (Pazartesi) döndürür"""
         cursor = self.conn.cursor()
-        # Çalışma saatleri tablosundan benzersiz hafta başı tarihlerini çek
+        # Hafta başlangıçları week_start indeksinden doğrudan okunur
+        cursor.execute('''
+            SELECT DISTINCT week_start FROM work_hours
+            WHERE week_start IS NOT NULL
+            ORDER BY week_start DESC
+        ''')
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_active_weeks(self):
+        """
+        Aktif bir çalışanın en az bir aktif günü olan haftaların başlangıç
+        tarihlerini (Pazartesi, yeniden eskiye) tek sorguyla döndürür.
+        Sonuç, çalışma saati veya çalışan kaydı değişene kadar önbellekte tutulur.
+        """
+        if self._active_weeks_cache is not None:
+            return list(self._active_weeks_cache)
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT w.week_start
+            FROM work_hours w
+            JOIN employees e ON e.id = w.employee_id
+            WHERE e.is_active = 1 AND COALESCE(w.day_active, 1) != 0 AND w.week_start IS NOT NULL
+            GROUP BY w.week_start
+            ORDER BY w.week_start DESC
+        ''')
+        weeks = [row[0] for row in cursor.fetchall()]
+        self._active_weeks_cache = weeks
+        return list(weeks)
+
+    # weekly_rollup: çalışan/hafta başına ücretten bağımsız toplamlar (ücretler okurken uygulanır)
+    ROLLUP_COLUMNS = (
+        'record_count', 'normal_minutes', 'overtime_minutes', 'active_days', 'food_count',
+        'has_work', 'worked', 'week_additions', 'permanent_additions', 'deductions'
+    )
+
+    def _update_rollups(self, pending):
+        """Bekleyen değişiklik sinyallerinden etkilenen weekly_rollup satırlarını günceller"""
+        keys = set()
+        all_weeks = set()  # Tüm haftaları etkilenen çalışanlar (sabit ödeme)
+        for signal, args in pending:
+            if signal == self.work_hours_changed:
+                keys.add((args[0], week_start_of(args[1])))
+            elif signal == self.payments_changed:
+                if args[1]:
+                    keys.add((args[0], week_start_of(args[1])))
+                else:
+                    all_weeks.add(args[0])
+            elif signal == self.employee_changed:
+                # Silinen çalışanın satırları da silinir (ücret değişikliği satırları etkilemez)
+                cursor = self.conn.cursor()
+                cursor.execute('SELECT 1 FROM employees WHERE id = ?', (args[0],))
+                if cursor.fetchone() is None:
+                    cursor.execute('DELETE FROM weekly_rollup WHERE employee_id = ?', (args[0],))
+        cursor = self.conn.cursor()
+        # Kapatılmış haftanın kayıtları yazıldı: girdiler kapanıştaki özetten farklıysa
+        # anlık görüntü işaretlenir, aynı değerlere dönüldüyse işaret kaldırılır
+        # (sabit ödemeler anlık görüntüde zaten dondurulmuştur)
+        weeks = sorted({key[1] for key in keys if key[1]})
+        if weeks:
+            cursor.execute(f'''
+                SELECT id, week_start_date, input_hash, drifted_at FROM weekly_summaries
+                WHERE is_closed = 1 AND week_start_date IN ({','.join('?' * len(weeks))})
+            ''', weeks)
+            for summary_id, week_start, input_hash, drifted_at in cursor.fetchall():
+                drifted = self.week_input_hash(week_start) != input_hash
+                if drifted and drifted_at is None:
+                    self.conn.execute(
+                        "UPDATE weekly_summaries SET drifted_at = CURRENT_TIMESTAMP WHERE id = ?", (summary_id,))
+                elif not drifted and drifted_at is not None:
+                    self.conn.execute(
+                        "UPDATE weekly_summaries SET drifted_at = NULL WHERE id = ?", (summary_id,))
+        for employee_id in all_weeks:
+            cursor.execute('''
+                SELECT DISTINCT week_start FROM work_hours WHERE employee_id = ? AND week_start IS NOT NULL
+                UNION
+                SELECT week_start FROM weekly_rollup WHERE employee_id = ?
+            ''', (employee_id, employee_id))
+            keys.update((employee_id, row[0]) for row in cursor.fetchall())
+        self.refresh_rollups(key for key in keys if key[1])
+
+    def _compute_rollups(self, keys):
+        """
+        Verilen (employee_id, week_start) anahtarları için rollup değerlerini
+        kaynak tablolardan hesaplar. Çalışma kaydı olmayan anahtarlar için None döner.
+        """
+        weeks = {}
+        for employee_id, week_start in keys:
+            weeks.setdefault(week_start, set()).add(employee_id)
+        rollups = {}
+        for week_start, employee_ids in weeks.items():
+            found = {}
+            for inputs in self.get_week_payroll_inputs(week_start, employee_ids=employee_ids):
+                if not inputs['work_hours']:
+                    continue
+                # Ücretler 0 verilir: sadece dakika ve gün sayıları kullanılır
+                result = payroll.calculate_week(inputs['work_hours'], 0, 0, 0)
+                found[inputs['employee']['id']] = {
+                    'record_count': len(inputs['work_hours']),
+                    'normal_minutes': result['normal_minutes'],
+                    'overtime_minutes': result['overtime_minutes'],
+                    'active_days': result['active_days'],
+                    'food_count': result['food_count'],
+                    'has_work': 1 if result['has_work'] else 0,
+                    'worked': 1 if inputs['worked'] else 0,
+                    'week_additions': inputs['week_additions'],
+                    'permanent_additions': inputs['permanent_additions'],
+                    'deductions': inputs['deductions']
+                }
+            for employee_id in employee_ids:
+                rollups[(employee_id, week_start)] = found.get(employee_id)
+        return rollups
+
+    def refresh_rollups(self, keys):
+        """Verilen (employee_id, week_start) anahtarlarının weekly_rollup satırlarını yeniden hesaplar"""
+        rollups = self._compute_rollups(keys)
+        if not rollups:
+            return
+        cursor = self.conn.cursor()
+        deleted = [key for key, values in rollups.items() if values is None]
+        cursor.executemany('DELETE FROM weekly_rollup WHERE employee_id = ? AND week_start = ?', deleted)
+        columns = ', '.join(self.ROLLUP_COLUMNS)
+        placeholders = ', '.join('?' * len(self.ROLLUP_COLUMNS))
+        updates = ', '.join(f"{column} = excluded.{column}" for column in self.ROLLUP_COLUMNS)
+        cursor.executemany(f'''
+            INSERT INTO weekly_rollup (employee_id, week_start, {columns})
+            VALUES (?, ?, {placeholders})
+            ON CONFLICT (week_start, employee_id) DO UPDATE SET {updates}
+        ''', [
+            key + tuple(values[column] for column in self.ROLLUP_COLUMNS)
+            for key, values in rollups.items() if values is not None
+        ])
+
+    def _rollup_source_keys(self):
+        """Çalışma kaydı olan tüm (employee_id, week_start) çiftleri"""
+        cursor = self.conn.cursor()
         cursor.execute('''
-            SELECT DISTINCT date FROM work_hours
+            SELECT DISTINCT employee_id, week_start FROM work_hours
+            WHERE week_start IS NOT NULL
         ''')
-        dates = [row[0] for row in cursor.fetchall()]
-        # Her tarihi haftanın Pazartesi'sine yuvarla
-        mondays = set()
-        for d in dates:
-            dt = datetime.strptime(d, '%Y-%m-%d')
-            monday = dt - timedelta(days=dt.weekday())
-            mondays.add(monday.strftime('%Y-%m-%d'))
-        return sorted(mondays, reverse=True)
+        return [(row[0], row[1]) for row in cursor.fetchall()]
+
+    def rebuild_rollups(self):
+        """weekly_rollup tablosunu tüm çalışma kayıtlarından baştan oluşturur (bakım)
+        
+        Returns:
+            int: Oluşturulan satır sayısı
+        """
+        with self.batch():
+            self.conn.execute('DELETE FROM weekly_rollup')
+            self.refresh_rollups(self._rollup_source_keys())
+        return self.conn.execute('SELECT COUNT(*) FROM weekly_rollup').fetchone()[0]
+
+    def check_rollups(self):
+        """weekly_rollup tablosunu kaynak tablolardan hesaplananla karşılaştırır
+        
+        Returns:
+            list: Uyuşmazlıklar (employee_id, week_start, sütun, kayıtlı değer, beklenen değer);
+                  fazla satırlarda sütun None'dır
+        """
+        expected = self._compute_rollups(self._rollup_source_keys())
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT employee_id, week_start, {', '.join(self.ROLLUP_COLUMNS)} FROM weekly_rollup")
+        stored = {(row[0], row[1]): dict(zip(self.ROLLUP_COLUMNS, row[2:])) for row in cursor.fetchall()}
+        mismatches = []
+        for key in sorted(set(expected) | set(stored)):
+            values = expected.get(key)
+            row = stored.get(key)
+            if values is None or row is None:
+                mismatches.append(key + (None, row, values))
+                continue
+            for column in self.ROLLUP_COLUMNS:
+                if row[column] != values[column]:
+                    mismatches.append(key + (column, row[column], values[column]))
+        return mismatches
+
+    def get_week_rollups(self, week_start_date, employee_ids=None):
+        """
+        Bir haftanın weekly_rollup satırlarını çalışan bilgileriyle tek sorguda getirir
+        (payroll.calculate_rollups ile ücretlere çevrilir).
+        Args:
+            week_start_date (str): Hafta başlangıç tarihi (YYYY-MM-DD formatında)
+            employee_ids (list, optional): Sadece bu çalışanları getir
+        Returns:
+            list: Her çalışan için dict (employee + ROLLUP_COLUMNS)
+        """
+        week_start_str = week_start_of(week_start_date)
+        id_filter = ""
+        id_params = ()
+        if employee_ids is not None:
+            employee_ids = list(employee_ids)
+            if not employee_ids:
+                return []
+            id_filter = f" AND r.employee_id IN ({','.join('?' * len(employee_ids))})"
+            id_params = tuple(employee_ids)
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT e.id, e.name, e.weekly_salary, e.daily_food, e.daily_transport, e.is_active,
+                   {', '.join('r.' + column for column in self.ROLLUP_COLUMNS)}
+            FROM weekly_rollup r
+            JOIN employees e ON e.id = r.employee_id
+            WHERE r.week_start = ?{id_filter}
+            ORDER BY e.is_active DESC, e.name
+        ''', (week_start_str,) + id_params)
+        rollups = []
+        for row in cursor.fetchall():
+            rollup = dict(zip(self.ROLLUP_COLUMNS, row[6:]))
+            rollup['employee'] = {
+                'id': row[0],
+                'name': row[1],
+                'weekly_salary': row[2],
+                'daily_food': row[3],
+                'daily_transport': row[4],
+                'is_active': row[5]
+            }
+            rollups.append(rollup)
+        return rollups
 
     def get_employees_with_entries_for_week(self, week_start_date):
         """
@@ -833,14 +1549,129 @@ class EmployeeDB(QObject):
             list: Çalışan dict'leri
         """
         cursor = self.conn.cursor()
-        from datetime import datetime, timedelta
         week_start = datetime.strptime(week_start_date, "%Y-%m-%d")
-        week_end = week_start + timedelta(days=6)
+        week_start_str = (week_start - timedelta(days=week_start.weekday())).strftime("%Y-%m-%d")
         cursor.execute('''
             SELECT DISTINCT e.id, e.name, e.weekly_salary, e.daily_food, e.daily_transport, e.is_active
             FROM employees e
             INNER JOIN work_hours w ON e.id = w.employee_id
-            WHERE w.date BETWEEN ? AND ?
-        ''', (week_start_date, week_end.strftime("%Y-%m-%d")))
+            WHERE w.week_start = ?
+        ''', (week_start_str,))
         results = cursor.fetchall()
         return [{'id': row[0], 'name': row[1], 'weekly_salary': row[2], 'daily_food': row[3], 'daily_transport': row[4], 'is_active': row[5]} for row in results]
+
+    def get_week_payroll_inputs(self, week_start_date, employee_ids=None):
+        """
+        Bir haftanın bordro hesabı için gereken tüm verileri sabit sayıda sorguyla getirir.
+        Aktif çalışanlar ve o hafta giriş kaydı olan pasif çalışanlar dahil edilir.
+        Args:
+            week_start_date (str): Hafta başlangıç tarihi (YYYY-MM-DD formatında)
+            employee_ids (list, optional): Sadece bu çalışanları getir (tek satır yenileme için)
+        Returns:
+            list: Her çalışan için dict (employee, work_hours, week_additions,
+                  permanent_additions, worked, deductions)
+        """
+        cursor = self.conn.cursor()
+        week_start = datetime.strptime(week_start_date, "%Y-%m-%d")
+        week_start = week_start - timedelta(days=week_start.weekday())
+        week_start_str = week_start.strftime("%Y-%m-%d")
+        week_end_str = (week_start + timedelta(days=6)).strftime("%Y-%m-%d")
+        
+        # İstenirse sorgular belirli çalışanlarla sınırlandırılır
+        employee_filter = ""
+        id_filter = ""
+        id_params = ()
+        if employee_ids is not None:
+            employee_ids = list(employee_ids)
+            if not employee_ids:
+                return []
+            placeholders = ','.join('?' * len(employee_ids))
+            employee_filter = f" AND e.id IN ({placeholders})"
+            id_filter = f" AND employee_id IN ({placeholders})"
+            id_params = tuple(employee_ids)
+        
+        # 1) Aktif çalışanlar + o hafta giriş kaydı olan pasif çalışanlar
+        cursor.execute(f'''
+            SELECT e.id, e.name, e.weekly_salary, e.daily_food, e.daily_transport, e.is_active
+            FROM employees e
+            WHERE (e.is_active = 1
+               OR EXISTS (
+                   SELECT 1 FROM work_hours w
+                   WHERE w.week_start = ? AND w.employee_id = e.id
+               )){employee_filter}
+            ORDER BY e.is_active DESC, e.name
+        ''', (week_start_str,) + id_params)
+        inputs = {}
+        for row in cursor.fetchall():
+            inputs[row[0]] = {
+                'employee': {
+                    'id': row[0],
+                    'name': row[1],
+                    'weekly_salary': row[2],
+                    'daily_food': row[3],
+                    'daily_transport': row[4],
+                    'is_active': row[5]
+                },
+                'work_hours': [],
+                'week_additions': 0,
+                'permanent_additions': 0,
+                'worked': False,
+                'deductions': 0
+            }
+        
+        # 2) Haftanın tüm çalışma kayıtları (tek aralık sorgusu)
+        cursor.execute(f'''
+            SELECT employee_id, id, date, entry_time, lunch_start, lunch_end, exit_time, is_active, day_active
+            FROM work_hours
+            WHERE week_start = ?{id_filter}
+            ORDER BY employee_id, date
+        ''', (week_start_str,) + id_params)
+        for row in cursor.fetchall():
+            item = inputs.get(row[0])
+            if item is None:
+                continue
+            item['work_hours'].append({
+                'id': row[1],
+                'date': row[2],
+                'entry_time': row[3],
+                'lunch_start': row[4],
+                'lunch_end': row[5],
+                'exit_time': row[6],
+                'is_active': row[7],
+                'day_active': row[8] if row[8] is not None else 1
+            })
+            # get_employee_additions'taki çalışma kontrolü ile aynı koşul
+            if row[7] == 1 or row[8] == 1:
+                item['worked'] = True
+        
+        # 3) Eklenti ve kesinti toplamları: haftanın ödemeleri ve sabit ödemeler
+        #    üzerinde çalışan başına tek toplama sorgusu (kind sınıfına göre)
+        #    - Eklentiler: get_employee_additions ile aynı kurallar (bu haftanın
+        #      eklentisi olan sabit ödeme iki kez sayılmaz)
+        #    - Kesintiler: get_weekly_payments ile aynı kurallar (hafta + sabit ödemeler)
+        addition = payroll.PAYMENT_KIND_ADDITION
+        deduction = payroll.PAYMENT_KIND_DEDUCTION
+        cursor.execute(f'''
+            SELECT employee_id,
+                   TOTAL(CASE WHEN kind = ? AND week_start_date BETWEEN ? AND ? THEN amount END),
+                   TOTAL(CASE WHEN is_permanent = 1
+                              AND NOT (kind = ? AND week_start_date BETWEEN ? AND ?) THEN amount END),
+                   TOTAL(CASE WHEN kind = ? AND (week_start_date = ? OR is_permanent = 1) THEN amount END)
+            FROM payments
+            WHERE (week_start_date BETWEEN ? AND ? OR is_permanent = 1){id_filter}
+            GROUP BY employee_id
+        ''', (
+            addition, week_start_str, week_end_str,
+            addition, week_start_str, week_end_str,
+            deduction, week_start_str,
+            week_start_str, week_end_str
+        ) + id_params)
+        for employee_id, week_additions, permanent_additions, deductions in cursor.fetchall():
+            item = inputs.get(employee_id)
+            if item is None:
+                continue
+            item['week_additions'] = week_additions
+            item['permanent_additions'] = permanent_additions
+            item['deductions'] = deductions
+        
+        return list(inputs.values())
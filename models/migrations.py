@@ -0,0 +1,345 @@
+"""Veritabanı şema göçleri.
+
+Şema sürümü PRAGMA user_version içinde tutulur. Her göç bir kez, sırayla ve
+kendi işlemi içinde uygulanır; uygulama açılırken EmployeeDB tarafından
+çalıştırılır. Yeni şema değişiklikleri MIGRATIONS listesinin sonuna eklenir,
+mevcut göçler değiştirilmez.
+"""
+
+from utils import payroll
+from utils import text
+
+
+# Tarihin ait olduğu haftanın Pazartesi'si (strftime('%w'): Pazar=0)
+WEEK_START_SQL = "date({0}, '-' || ((CAST(strftime('%w', {0}) AS INTEGER) + 6) % 7) || ' days')"
+
+
+def _columns(cursor, table):
+    """Tablonun sütun adlarını döndürür (tablo yoksa boş küme)"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _add_column(cursor, table, column, definition):
+    """Sütun yoksa ekler, eklendiyse True döndürür"""
+    if column in _columns(cursor, table):
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+
+def migration_001_base_tables(cursor):
+    """Temel tablolar ve eski veritabanlarında eksik olan durum sütunları"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS employees (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        weekly_salary REAL NOT NULL,
+        daily_food REAL NOT NULL,
+        daily_transport REAL NOT NULL,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS work_hours (
+        id INTEGER PRIMARY KEY,
+        employee_id INTEGER,
+        date TEXT NOT NULL,
+        entry_time TEXT,
+        lunch_start TEXT,
+        lunch_end TEXT,
+        exit_time TEXT,
+        is_active INTEGER DEFAULT 1,
+        day_active INTEGER DEFAULT 1,
+        FOREIGN KEY (employee_id) REFERENCES employees (id)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS payments (
+        id INTEGER PRIMARY KEY,
+        employee_id INTEGER,
+        week_start_date TEXT NOT NULL,
+        payment_type TEXT,
+        amount REAL NOT NULL,
+        description TEXT,
+        is_permanent INTEGER DEFAULT 0,
+        FOREIGN KEY (employee_id) REFERENCES employees (id)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS weekly_summaries (
+        id INTEGER PRIMARY KEY,
+        week_start_date TEXT NOT NULL UNIQUE,
+        total_amount REAL NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS weekly_summary_details (
+        id INTEGER PRIMARY KEY,
+        summary_id INTEGER,
+        employee_id INTEGER,
+        name TEXT NOT NULL,
+        total_hours REAL NOT NULL,
+        weekly_salary REAL NOT NULL,
+        food_allowance REAL NOT NULL,
+        transport_allowance REAL NOT NULL,
+        total_additions REAL NOT NULL,
+        total_deductions REAL NOT NULL,
+        total_weekly_salary REAL NOT NULL,
+        FOREIGN KEY (summary_id) REFERENCES weekly_summaries (id),
+        FOREIGN KEY (employee_id) REFERENCES employees (id)
+    )
+    ''')
+
+    # Eski sürümler çalışan durumunu 'active' sütununda tutuyordu
+    if _add_column(cursor, "employees", "is_active", "INTEGER DEFAULT 1"):
+        if "active" in _columns(cursor, "employees"):
+            cursor.execute("UPDATE employees SET is_active = COALESCE(active, 1)")
+    _add_column(cursor, "work_hours", "is_active", "INTEGER DEFAULT 1")
+    if _add_column(cursor, "work_hours", "day_active", "INTEGER DEFAULT 1"):
+        cursor.execute("UPDATE work_hours SET day_active = 1")
+
+
+def migration_002_payments_week_start_date(cursor):
+    """Eski payments tablosundaki date sütununu week_start_date olarak yeniden adlandırır"""
+    columns = _columns(cursor, "payments")
+    if "date" not in columns or "week_start_date" in columns:
+        return
+
+    cursor.execute('''
+    CREATE TABLE payments_temp (
+        id INTEGER PRIMARY KEY,
+        employee_id INTEGER,
+        week_start_date TEXT NOT NULL,
+        payment_type TEXT,
+        amount REAL NOT NULL,
+        description TEXT,
+        is_permanent INTEGER DEFAULT 0,
+        FOREIGN KEY (employee_id) REFERENCES employees (id)
+    )
+    ''')
+    cursor.execute('''
+    INSERT INTO payments_temp (id, employee_id, week_start_date, payment_type, amount, description, is_permanent)
+    SELECT id, employee_id, date, payment_type, amount, description, is_permanent FROM payments
+    ''')
+    cursor.execute("DROP TABLE payments")
+    cursor.execute("ALTER TABLE payments_temp RENAME TO payments")
+
+
+def migration_003_work_hours_unique_day(cursor):
+    """Çalışan/gün başına tek kayıt (UPSERT hedefi) ve tarih indeksi"""
+    # Aynı çalışan/gün için birden fazla kayıt varsa en son ekleneni tut
+    cursor.execute('''
+    DELETE FROM work_hours
+    WHERE id NOT IN (
+        SELECT MAX(id) FROM work_hours GROUP BY employee_id, date
+    )
+    ''')
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_work_hours_employee_date
+    ON work_hours (employee_id, date)
+    ''')
+    # Tarih bazlı sorgular için (haftada giriş yapan çalışanlar, hafta listesi)
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_work_hours_date_employee
+    ON work_hours (date, employee_id)
+    ''')
+
+
+def migration_004_work_hours_week_start(cursor):
+    """Çalışma kayıtlarına tetikleyicilerle güncel tutulan, indeksli hafta başlangıcı sütunu"""
+    _add_column(cursor, "work_hours", "week_start", "TEXT")
+    cursor.execute(f"UPDATE work_hours SET week_start = {WEEK_START_SQL.format('date')}")
+    # Tarih yazıldığında hafta başlangıcını veritabanı hesaplar (uygulama dışı yazmalar dahil)
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_work_hours_week_start_insert
+    AFTER INSERT ON work_hours
+    BEGIN
+        UPDATE work_hours SET week_start = {WEEK_START_SQL.format('NEW.date')} WHERE id = NEW.id;
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_work_hours_week_start_update
+    AFTER UPDATE OF date ON work_hours
+    BEGIN
+        UPDATE work_hours SET week_start = {WEEK_START_SQL.format('NEW.date')} WHERE id = NEW.id;
+    END
+    ''')
+    # Hafta listesi (sadece indeks taraması) ve hafta + çalışan eşitlik sorguları için
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_work_hours_week_employee
+    ON work_hours (week_start, employee_id)
+    ''')
+
+
+def migration_005_weekly_rollup(cursor):
+    """Çalışan/hafta başına bordro toplamları (EmployeeDB yazarken aynı işlemde günceller)"""
+    # Ücretler tutulmaz: saatlik ücret/yemek/yol değişince satırlar geçerli kalır
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS weekly_rollup (
+        employee_id INTEGER NOT NULL,
+        week_start TEXT NOT NULL,
+        record_count INTEGER NOT NULL DEFAULT 0,
+        normal_minutes INTEGER NOT NULL DEFAULT 0,
+        overtime_minutes INTEGER NOT NULL DEFAULT 0,
+        active_days INTEGER NOT NULL DEFAULT 0,
+        food_count INTEGER NOT NULL DEFAULT 0,
+        has_work INTEGER NOT NULL DEFAULT 0,
+        worked INTEGER NOT NULL DEFAULT 0,
+        week_additions REAL NOT NULL DEFAULT 0,
+        permanent_additions REAL NOT NULL DEFAULT 0,
+        deductions REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (week_start, employee_id),
+        FOREIGN KEY (employee_id) REFERENCES employees (id)
+    )
+    ''')
+
+
+def migration_006_closed_week_snapshots(cursor):
+    """Kapatılmış hafta anlık görüntüleri: kapanış bilgisi ve rapor için tam satır verisi"""
+    _add_column(cursor, "weekly_summaries", "is_closed", "INTEGER DEFAULT 0")
+    _add_column(cursor, "weekly_summaries", "closed_at", "TIMESTAMP")
+    # Kapanıştaki girdilerin (çalışma kayıtları ve haftalık ödemeler) özeti
+    _add_column(cursor, "weekly_summaries", "input_hash", "TEXT")
+    # Kapanıştan sonra haftanın kayıtları değiştiyse işaretlenir
+    _add_column(cursor, "weekly_summaries", "drifted_at", "TIMESTAMP")
+    for column, definition in (
+        ("hourly_rate", "REAL"),
+        ("is_active", "INTEGER"),
+        ("normal_minutes", "INTEGER"),
+        ("overtime_minutes", "INTEGER"),
+        ("active_days", "INTEGER"),
+        ("food_count", "INTEGER"),
+        ("has_work", "INTEGER"),
+        ("normal_pay", "REAL"),
+        ("overtime_pay", "REAL"),
+    ):
+        _add_column(cursor, "weekly_summary_details", column, definition)
+
+
+def migration_007_summary_details_unique_employee(cursor):
+    """Özet başına çalışan başına tek detay satırı (save_weekly_summary UPSERT hedefi)"""
+    # Aynı özet/çalışan için birden fazla satır varsa en son ekleneni tut
+    cursor.execute('''
+    DELETE FROM weekly_summary_details
+    WHERE id NOT IN (
+        SELECT MAX(id) FROM weekly_summary_details GROUP BY summary_id, employee_id
+    )
+    ''')
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_weekly_summary_details_employee
+    ON weekly_summary_details (summary_id, employee_id)
+    ''')
+
+
+def migration_008_payments_kind(cursor):
+    """Ödemelere tür sınıfı (eklenti/kesinti) sütunu ve çalışan/hafta/sınıf indeksi"""
+    _add_column(cursor, "payments", "kind", f"INTEGER NOT NULL DEFAULT {payroll.PAYMENT_KIND_OTHER}")
+    # Sınıflandırma bordro motorundaki kurallarla (Python lower()) yapılır
+    cursor.execute("SELECT DISTINCT payment_type FROM payments")
+    cursor.executemany(
+        "UPDATE payments SET kind = ? WHERE payment_type IS ?",
+        [(payroll.payment_kind(row[0]), row[0]) for row in cursor.fetchall()]
+    )
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_payments_employee_week_kind
+    ON payments (employee_id, week_start_date, kind)
+    ''')
+
+
+def migration_009_drop_auto_permanent_payments(cursor):
+    """Zaman girişinde otomatik eklenen tutarsız (0) sabit ödeme satırlarını siler"""
+    # Sabit ödemesi olmayan çalışan/hafta 0 tutarla aynı sonucu verir (sanal varsayılan)
+    cursor.execute('''
+    DELETE FROM payments
+    WHERE is_permanent = 1 AND amount = 0 AND description = 'Otomatik Sabit Ek Ödeme'
+    ''')
+
+
+def migration_010_schedule_templates(cursor):
+    """Çalışan başına varsayılan haftalık çalışma şablonu (satırı olmayan gün varsayılanı kullanır)"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS schedule_templates (
+        employee_id INTEGER NOT NULL,
+        weekday INTEGER NOT NULL,
+        entry_time TEXT,
+        lunch_start TEXT,
+        lunch_end TEXT,
+        exit_time TEXT,
+        day_active INTEGER NOT NULL DEFAULT 1,
+        PRIMARY KEY (employee_id, weekday),
+        FOREIGN KEY (employee_id) REFERENCES employees (id)
+    )
+    ''')
+
+
+def migration_011_normalize_employee_names(cursor):
+    """Çalışan isimleri bir kez Türkçe büyük harfe çevrilir (yeni kayıtlar yazılırken normalize edilir)"""
+    cursor.connection.create_function("TR_UPPER", 1, text.tr_upper, deterministic=True)
+    cursor.execute('''
+    UPDATE employees
+    SET name = TR_UPPER(TRIM(name))
+    WHERE name IS NOT TR_UPPER(TRIM(name))
+    ''')
+
+
+# (sürüm, göç) - sıralı, sadece sona ekleme yapılır
+MIGRATIONS = [
+    (1, migration_001_base_tables),
+    (2, migration_002_payments_week_start_date),
+    (3, migration_003_work_hours_unique_day),
+    (4, migration_004_work_hours_week_start),
+    (5, migration_005_weekly_rollup),
+    (6, migration_006_closed_week_snapshots),
+    (7, migration_007_summary_details_unique_employee),
+    (8, migration_008_payments_kind),
+    (9, migration_009_drop_auto_permanent_payments),
+    (10, migration_010_schedule_templates),
+    (11, migration_011_normalize_employee_names),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# weekly_rollup tablosunu oluşturan sürüm: bu sürüme geçen veritabanında tablo doldurulur
+WEEKLY_ROLLUP_VERSION = 5
+
+
+def get_schema_version(conn):
+    """Veritabanının mevcut şema sürümünü döndürür"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Bekleyen göçleri sırayla uygular
+
+    Returns:
+        int: Uygulanan göç sayısı
+    """
+    version = get_schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Veritabanı şema sürümü ({version}) programın desteklediğinden ({SCHEMA_VERSION}) yeni"
+        )
+
+    applied = 0
+    for target, migration in MIGRATIONS:
+        if target <= version:
+            continue
+        cursor = conn.cursor()
+        # Her göç ve sürüm güncellemesi tek işlemde: yarım kalan göç geri alınır
+        cursor.execute("BEGIN")
+        try:
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied += 1
+    return applied
@@ -1,30 +1,13 @@
-import os
-import sqlite3
+from models.database import EmployeeDB
 
 def main():
-    # Veritabanı dosyasının tam yolunu belirle
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'employee.db')
-    
-    # Veritabanına bağlan
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Tüm çalışanları al
-    cursor.execute('SELECT id, name FROM employees')
-    employees = cursor.fetchall()
-    
-    # Her çalışanın ismini büyük harfe çevir
-    for emp_id, name in employees:
-        upper_name = name.upper()
-        
-        # İsmi güncelle
-        cursor.execute('UPDATE employees SET name = ? WHERE id = ?', (upper_name, emp_id))
-    
-    # Değişiklikleri kaydet
-    conn.commit()
-    
-    # Veritabanı bağlantısını kapat
-    conn.close()
+    # İsimler yazılırken normalize edilir, eski kayıtlar şema göçü (11) ile bir kez çevrildi:
+    # komut normalde hiçbir satırı değiştirmez (dışarıdan yazılmış isimler için durur)
+    db = EmployeeDB()
+    try:
+        db.update_all_employee_names_to_uppercase()
+    finally:
+        db.close()
     
     return True
 
@@ -0,0 +1,80 @@
+"""Bellek içi önbellek yardımcıları.
+
+Qt'den bağımsızdır. EmployeeDB'nin okuma önbellekleri bu sınıfı kullanır;
+tutarlılık (yazınca güncelleme/silme) önbelleği kullanan tarafın işidir.
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """En uzun süre kullanılmayanı atan, iş parçacığı güvenli sınırlı önbellek
+
+    Değerler olduğu gibi saklanır ve döndürülür: değiştirilebilir değerleri
+    paylaşmamak için kopyalamak çağıranın sorumluluğundadır.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Ayar için isabet/ıska sayaçları (stats)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Değeri döndürür ve en son kullanılan yapar; yoksa default (ıska sayılır)"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key, default=None):
+        """Sayaçları ve sırayı değiştirmeden değeri döndürür"""
+        with self._lock:
+            return self._data.get(key, default)
+
+    def put(self, key, value):
+        """Değeri ekler/günceller; kapasite aşılırsa en eski girdi atılır"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def pop_where(self, predicate):
+        """Anahtarı koşula uyan girdileri siler, silinen sayısını döndürür"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """{'hits', 'misses', 'size', 'maxsize'}"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize
+            }
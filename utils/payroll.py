@@ -0,0 +1,299 @@
+"""Bordro hesaplama motoru.
+
+Qt'den bağımsızdır: saatler gece yarısından itibaren dakika (int), günler
+datetime.date / 'YYYY-MM-DD' string olarak işlenir. Görünümler, dışa aktarma
+betikleri ve toplu hesaplamalar aynı kuralları buradan kullanır.
+"""
+from datetime import date, datetime
+
+# Hafta içi bu saatten sonrası fazla mesai sayılır (18:45)
+OVERTIME_START_MINUTES = 18 * 60 + 45
+# Bu süreden (dakika) fazla çalışılan gün için bir yemek hakkı
+FOOD_MIN_WORK_MINUTES = 5 * 60
+# Bu saatten sonra çıkılırsa bir yemek hakkı daha (20:00)
+DINNER_AFTER_MINUTES = 20 * 60
+# Fazla mesai ücret çarpanı
+OVERTIME_MULTIPLIER = 1.5
+# Cumartesi/Pazar (Pazartesi=0): tüm saatler fazla mesai
+WEEKEND_DAYS = (5, 6)
+
+# Ek ödeme (eklenti) olarak sayılan ödeme türleri
+ADDITION_PAYMENT_TYPES = ("eklenti", "bonus", "prim", "ek ödeme", "ek odeme", "ikramiye", "permanent", "sabit ek ödeme", "sabit ek odeme")
+# Kesinti olarak sayılan ödeme türleri
+DEDUCTION_PAYMENT_TYPES = ("kesinti", "ceza", "borç", "borc", "avans", "deduction")
+
+# payments.kind değerleri (ödeme türünün sınıfı; sabit olup olmadığı is_permanent'tadır)
+PAYMENT_KIND_OTHER = 0
+PAYMENT_KIND_ADDITION = 1
+PAYMENT_KIND_DEDUCTION = 2
+
+
+def parse_time(value):
+    """'HH:mm' stringini dakikaya çevirir, boş/geçersiz ise None döndürür"""
+    if isinstance(value, int):
+        return value
+    if not value:
+        return None
+    try:
+        hour, minute = value.split(":")[:2]
+        return int(hour) * 60 + int(minute)
+    except (ValueError, AttributeError):
+        return None
+
+
+def payment_kind(payment_type):
+    """Ödeme türünü (büyük/küçük harf duyarsız) PAYMENT_KIND_* sınıfına çevirir"""
+    payment_type = (payment_type or "").lower()
+    if payment_type in ADDITION_PAYMENT_TYPES:
+        return PAYMENT_KIND_ADDITION
+    if payment_type in DEDUCTION_PAYMENT_TYPES:
+        return PAYMENT_KIND_DEDUCTION
+    return PAYMENT_KIND_OTHER
+
+
+def format_minutes(minutes):
+    """Dakikayı 'HH:MM' formatına çevirir"""
+    minutes = int(minutes)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def weekday_of(day):
+    """Tarihin haftanın kaçıncı günü olduğunu döndürür (Pazartesi=0, Pazar=6)"""
+    if isinstance(day, str):
+        return datetime.strptime(day, "%Y-%m-%d").weekday()
+    if isinstance(day, date):
+        return day.weekday()
+    return None
+
+
+def calculate_day(entry_time, lunch_start, lunch_end, exit_time, weekday=None):
+    """
+    Bir gün için normal ve fazla mesai dakikalarını hesaplar.
+    - Hafta içi: 18:45'e kadar olan süre normal, sonrası fazla mesai.
+    - Cumartesi/Pazar: tüm süre fazla mesai.
+    entry_time, lunch_start, lunch_end, exit_time: dakika (int)
+    weekday: Pazartesi=0 ... Pazar=6 (None ise hafta içi kabul edilir)
+    Returns:
+        tuple: (normal_minutes, overtime_minutes)
+    """
+    if entry_time is None or lunch_start is None or lunch_end is None or exit_time is None:
+        return 0, 0
+
+    if weekday in WEEKEND_DAYS:
+        day_minutes = (lunch_start - entry_time) + (exit_time - lunch_end)
+        return 0, max(day_minutes, 0)
+
+    morning = max(lunch_start - entry_time, 0)
+    afternoon = max(min(exit_time, OVERTIME_START_MINUTES) - lunch_end, 0)
+    overtime = max(exit_time - OVERTIME_START_MINUTES, 0)
+    return morning + afternoon, overtime
+
+
+def food_count(worked_minutes, exit_time):
+    """Bir günün yemek hakkı sayısını döndürür (5 saatten fazla çalışma, 20:00 sonrası çıkış)"""
+    count = 0
+    if worked_minutes > FOOD_MIN_WORK_MINUTES:
+        count += 1
+    if exit_time is not None and exit_time > DINNER_AFTER_MINUTES:
+        count += 1
+    return count
+
+
+def calculate_record(record):
+    """
+    work_hours kaydı (dict) için günlük sonucu hesaplar.
+    Pasif günler ve saatleri eksik günler sayılmaz (counted=False).
+    """
+    entry_time = parse_time(record.get('entry_time'))
+    lunch_start = parse_time(record.get('lunch_start'))
+    lunch_end = parse_time(record.get('lunch_end'))
+    exit_time = parse_time(record.get('exit_time'))
+    day_active = record.get('day_active', 1)
+    counted = bool(day_active) and None not in (entry_time, lunch_start, lunch_end, exit_time)
+    if not counted:
+        return {'date': record.get('date'), 'counted': False,
+                'normal_minutes': 0, 'overtime_minutes': 0, 'food_count': 0}
+    normal, overtime = calculate_day(entry_time, lunch_start, lunch_end, exit_time, weekday_of(record.get('date')))
+    return {
+        'date': record.get('date'),
+        'counted': True,
+        'normal_minutes': normal,
+        'overtime_minutes': overtime,
+        'food_count': food_count(normal + overtime, exit_time)
+    }
+
+
+def calculate_week(records, hourly_rate, daily_food, daily_transport,
+                   week_additions=0, permanent_additions=0, worked=False, deductions=0):
+    """
+    Bir çalışanın haftalık bordrosunu hesaplar.
+    Args:
+        records (list): work_hours kayıtları (get_week_work_hours formatında dict'ler,
+                        saatler 'HH:mm' string ya da dakika olabilir)
+        hourly_rate (float): Saatlik ücret (veritabanındaki weekly_salary sütunu)
+        daily_food (float): Yemek hakkı başına ücret
+        daily_transport (float): Aktif gün başına yol ücreti
+        week_additions (float): Haftaya ait ek ödemeler
+        permanent_additions (float): Sabit ek ödemeler (sadece çalışılan haftalara eklenir)
+        worked (bool): Haftada aktif kaydı var mı (get_week_payroll_inputs'tan)
+        deductions (float): Kesintiler
+    Returns:
+        dict: Dakikalar, gün sayıları ve tutarlar
+    """
+    days = [calculate_record(rec) for rec in records]
+    normal_minutes = sum(d['normal_minutes'] for d in days)
+    overtime_minutes = sum(d['overtime_minutes'] for d in days)
+    active_days = sum(1 for d in days if d['counted'])
+    food_total = sum(d['food_count'] for d in days)
+    # Giriş ve çıkışı olan en az bir aktif gün var mı
+    has_work = any(
+        rec.get('day_active', 1)
+        and parse_time(rec.get('entry_time')) is not None
+        and parse_time(rec.get('exit_time')) is not None
+        for rec in records
+    )
+
+    result = calculate_totals(normal_minutes, overtime_minutes, active_days, food_total, has_work,
+                              hourly_rate, daily_food, daily_transport,
+                              week_additions, permanent_additions, worked, deductions)
+    result['days'] = days
+    return result
+
+
+def calculate_totals(normal_minutes, overtime_minutes, active_days, food_total, has_work,
+                     hourly_rate, daily_food, daily_transport,
+                     week_additions=0, permanent_additions=0, worked=False, deductions=0):
+    """
+    Haftalık toplam dakika/gün sayılarından ücretleri hesaplar.
+    calculate_week ve weekly_rollup satırları (calculate_rollup) aynı hesabı kullanır.
+    Returns:
+        dict: calculate_week anahtarları ('days' hariç)
+    """
+    normal_pay = (normal_minutes / 60) * hourly_rate
+    overtime_pay = (overtime_minutes / 60) * hourly_rate * OVERTIME_MULTIPLIER
+    food_allowance = food_total * daily_food
+    transport_allowance = active_days * daily_transport
+    # Haftada hiç çalışma yoksa sabit ek ödeme eklenmez
+    total_additions = week_additions + (permanent_additions if has_work or worked else 0)
+    total = normal_pay + overtime_pay + food_allowance + transport_allowance + total_additions - deductions
+
+    return {
+        'normal_minutes': normal_minutes,
+        'overtime_minutes': overtime_minutes,
+        'total_minutes': normal_minutes + overtime_minutes,
+        'active_days': active_days,
+        'food_count': food_total,
+        'has_work': has_work,
+        'hourly_rate': hourly_rate,
+        'normal_pay': normal_pay,
+        'overtime_pay': overtime_pay,
+        'earned': normal_pay + overtime_pay,
+        'food_allowance': food_allowance,
+        'transport_allowance': transport_allowance,
+        'total_additions': total_additions,
+        'total_deductions': deductions,
+        'total': total
+    }
+
+
+def calculate_employee_week(inputs):
+    """get_week_payroll_inputs'tan gelen tek bir çalışan girdisini hesaplar"""
+    emp = inputs['employee']
+    result = calculate_week(
+        inputs['work_hours'],
+        emp['weekly_salary'],
+        emp['daily_food'],
+        emp['daily_transport'],
+        week_additions=inputs.get('week_additions', 0),
+        permanent_additions=inputs.get('permanent_additions', 0),
+        worked=inputs.get('worked', False),
+        deductions=inputs.get('deductions', 0)
+    )
+    result['employee'] = emp
+    return result
+
+
+def calculate_employees(payroll_inputs):
+    """Birden fazla çalışanın haftalık bordrosunu hesaplar (get_week_payroll_inputs çıktısı)"""
+    return [calculate_employee_week(inputs) for inputs in payroll_inputs]
+
+
+def calculate_rollup(rollup):
+    """get_week_rollups'tan gelen tek bir weekly_rollup satırının bordrosunu hesaplar"""
+    emp = rollup['employee']
+    result = calculate_totals(
+        rollup['normal_minutes'],
+        rollup['overtime_minutes'],
+        rollup['active_days'],
+        rollup['food_count'],
+        bool(rollup['has_work']),
+        emp['weekly_salary'],
+        emp['daily_food'],
+        emp['daily_transport'],
+        week_additions=rollup['week_additions'],
+        permanent_additions=rollup['permanent_additions'],
+        worked=bool(rollup['worked']),
+        deductions=rollup['deductions']
+    )
+    result['employee'] = emp
+    return result
+
+
+def calculate_rollups(rollups):
+    """Birden fazla weekly_rollup satırının bordrosunu hesaplar (get_week_rollups çıktısı)"""
+    return [calculate_rollup(rollup) for rollup in rollups]
+
+
+def summary_detail(result):
+    """Hesap sonucunu weekly_summary_details satırı formatına çevirir (saatler saat cinsinden)"""
+    emp = result['employee']
+    return {
+        'id': emp['id'],
+        'name': emp['name'],
+        'total_hours': result['total_minutes'] / 60,
+        'weekly_salary': result['earned'],
+        'food_allowance': result['food_allowance'],
+        'transport_allowance': result['transport_allowance'],
+        'total_additions': result['total_additions'],
+        'total_deductions': result['total_deductions'],
+        'total_weekly_salary': result['total'],
+        # Kapatılmış hafta anlık görüntüsü için (result_from_summary_detail)
+        'hourly_rate': emp['weekly_salary'],
+        'is_active': emp.get('is_active'),
+        'normal_minutes': result['normal_minutes'],
+        'overtime_minutes': result['overtime_minutes'],
+        'active_days': result['active_days'],
+        'food_count': result['food_count'],
+        'has_work': 1 if result['has_work'] else 0,
+        'normal_pay': result['normal_pay'],
+        'overtime_pay': result['overtime_pay']
+    }
+
+
+def result_from_summary_detail(detail):
+    """summary_detail'in tersi: kapatılmış haftanın satırını hesap sonucu formatına çevirir"""
+    normal_minutes = detail['normal_minutes'] or 0
+    overtime_minutes = detail['overtime_minutes'] or 0
+    return {
+        'employee': {
+            'id': detail['id'],
+            'name': detail['name'],
+            'weekly_salary': detail['hourly_rate'],
+            'is_active': detail['is_active']
+        },
+        'normal_minutes': normal_minutes,
+        'overtime_minutes': overtime_minutes,
+        'total_minutes': normal_minutes + overtime_minutes,
+        'active_days': detail['active_days'] or 0,
+        'food_count': detail['food_count'] or 0,
+        'has_work': bool(detail['has_work']),
+        'hourly_rate': detail['hourly_rate'],
+        'normal_pay': detail['normal_pay'],
+        'overtime_pay': detail['overtime_pay'],
+        'earned': detail['weekly_salary'],
+        'food_allowance': detail['food_allowance'],
+        'transport_allowance': detail['transport_allowance'],
+        'total_additions': detail['total_additions'],
+        'total_deductions': detail['total_deductions'],
+        'total': detail['total_weekly_salary']
+    }
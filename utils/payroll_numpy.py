@@ -0,0 +1,210 @@
+"""Bordro motorunun NumPy ile vektörize edilmiş toplu hesaplama çekirdeği.
+
+Çeyrek/yıl gibi çok haftalı yeniden hesaplamalar (denetim, saatlik ücret
+düzeltmeleri) için kullanılır. Kurallar utils.payroll ile aynıdır ve sonuçlar
+skaler yol ile birebir aynı olmalıdır (bkz. benchmark_payroll.py).
+NumPy kurulu değilse HAS_NUMPY False olur ve skaler motor kullanılmalıdır.
+"""
+from utils import payroll
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+# Eksik saatler için kullanılan değer (geçerli bir dakika değeri olamaz)
+MISSING = -1
+
+
+def _require_numpy():
+    if not HAS_NUMPY:
+        raise ImportError("Vektörize bordro hesaplaması için numpy gereklidir")
+
+
+def weekdays_from_dates(dates):
+    """'YYYY-MM-DD' tarih dizisinden haftanın gününü döndürür (Pazartesi=0)"""
+    _require_numpy()
+    days = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+    # 1970-01-01 Perşembe günüdür
+    return (days + 3) % 7
+
+
+def calculate_days(entry_time, lunch_start, lunch_end, exit_time, weekday, day_active=None):
+    """
+    Günlük normal/fazla mesai dakikalarını ve yemek haklarını vektörel hesaplar.
+    Saat dizileri dakika cinsindendir, eksik değerler MISSING (-1) ile gösterilir.
+    Returns:
+        dict: counted, normal_minutes, overtime_minutes, food_count dizileri
+    """
+    _require_numpy()
+    entry_time = np.asarray(entry_time, dtype=np.int64)
+    lunch_start = np.asarray(lunch_start, dtype=np.int64)
+    lunch_end = np.asarray(lunch_end, dtype=np.int64)
+    exit_time = np.asarray(exit_time, dtype=np.int64)
+    weekday = np.asarray(weekday, dtype=np.int64)
+    if day_active is None:
+        day_active = np.ones(entry_time.shape, dtype=bool)
+    else:
+        day_active = np.asarray(day_active).astype(bool)
+
+    counted = (day_active & (entry_time != MISSING) & (lunch_start != MISSING)
+               & (lunch_end != MISSING) & (exit_time != MISSING))
+    weekend = np.isin(weekday, payroll.WEEKEND_DAYS)
+
+    # Hafta içi: 18:45'e kadar normal, sonrası fazla mesai
+    morning = np.maximum(lunch_start - entry_time, 0)
+    afternoon = np.maximum(np.minimum(exit_time, payroll.OVERTIME_START_MINUTES) - lunch_end, 0)
+    weekday_overtime = np.maximum(exit_time - payroll.OVERTIME_START_MINUTES, 0)
+    # Hafta sonu: tüm süre fazla mesai
+    weekend_overtime = np.maximum((lunch_start - entry_time) + (exit_time - lunch_end), 0)
+
+    normal = np.where(counted & ~weekend, morning + afternoon, 0)
+    overtime = np.where(counted, np.where(weekend, weekend_overtime, weekday_overtime), 0)
+    food = np.where(
+        counted,
+        (normal + overtime > payroll.FOOD_MIN_WORK_MINUTES).astype(np.int64)
+        + (exit_time > payroll.DINNER_AFTER_MINUTES).astype(np.int64),
+        0
+    )
+    return {
+        'counted': counted,
+        'normal_minutes': normal,
+        'overtime_minutes': overtime,
+        'food_count': food
+    }
+
+
+def calculate_weeks(group, entry_time, lunch_start, lunch_end, exit_time, weekday, day_active,
+                    hourly_rate, daily_food, daily_transport,
+                    week_additions=None, permanent_additions=None, worked=None, deductions=None):
+    """
+    Çalışan-hafta grupları için haftalık bordroyu vektörel hesaplar.
+    Args:
+        group: Her günlük kaydın ait olduğu çalışan-hafta indeksi (0..n-1)
+        entry_time, lunch_start, lunch_end, exit_time, weekday, day_active: Günlük sütunlar
+        hourly_rate, daily_food, daily_transport: Grup başına ücretler (uzunluk n)
+        week_additions, permanent_additions, worked, deductions: Grup başına ödemeler
+    Returns:
+        dict: utils.payroll.calculate_week anahtarlarıyla grup başına diziler ('days' hariç)
+    """
+    _require_numpy()
+    hourly_rate = np.asarray(hourly_rate, dtype=np.float64)
+    n = len(hourly_rate)
+    group = np.asarray(group, dtype=np.int64)
+    zeros = np.zeros(n, dtype=np.float64)
+    week_additions = zeros if week_additions is None else np.asarray(week_additions, dtype=np.float64)
+    permanent_additions = zeros if permanent_additions is None else np.asarray(permanent_additions, dtype=np.float64)
+    deductions = zeros if deductions is None else np.asarray(deductions, dtype=np.float64)
+    worked = np.zeros(n, dtype=bool) if worked is None else np.asarray(worked).astype(bool)
+
+    days = calculate_days(entry_time, lunch_start, lunch_end, exit_time, weekday, day_active)
+    active = np.ones(group.shape, dtype=bool) if day_active is None else np.asarray(day_active).astype(bool)
+    work_rows = active & (np.asarray(entry_time) != MISSING) & (np.asarray(exit_time) != MISSING)
+
+    normal_minutes = np.bincount(group, weights=days['normal_minutes'], minlength=n).astype(np.int64)
+    overtime_minutes = np.bincount(group, weights=days['overtime_minutes'], minlength=n).astype(np.int64)
+    active_days = np.bincount(group, weights=days['counted'], minlength=n).astype(np.int64)
+    food_total = np.bincount(group, weights=days['food_count'], minlength=n).astype(np.int64)
+    has_work = np.bincount(group, weights=work_rows, minlength=n) > 0
+
+    # İşlem sırası skaler motorla aynı tutulur (kayan nokta sonuçları birebir aynı olsun)
+    normal_pay = (normal_minutes / 60) * hourly_rate
+    overtime_pay = (overtime_minutes / 60) * hourly_rate * payroll.OVERTIME_MULTIPLIER
+    food_allowance = food_total * np.asarray(daily_food, dtype=np.float64)
+    transport_allowance = active_days * np.asarray(daily_transport, dtype=np.float64)
+    # Haftada hiç çalışma yoksa sabit ek ödeme eklenmez
+    total_additions = week_additions + np.where(has_work | worked, permanent_additions, 0)
+    total = normal_pay + overtime_pay + food_allowance + transport_allowance + total_additions - deductions
+
+    return {
+        'normal_minutes': normal_minutes,
+        'overtime_minutes': overtime_minutes,
+        'total_minutes': normal_minutes + overtime_minutes,
+        'active_days': active_days,
+        'food_count': food_total,
+        'has_work': has_work,
+        'hourly_rate': hourly_rate,
+        'normal_pay': normal_pay,
+        'overtime_pay': overtime_pay,
+        'earned': normal_pay + overtime_pay,
+        'food_allowance': food_allowance,
+        'transport_allowance': transport_allowance,
+        'total_additions': total_additions,
+        'total_deductions': deductions,
+        'total': total
+    }
+
+
+def parse_times(values):
+    """
+    'HH:mm' string listesini dakika dizisine çevirir (eksik/geçersiz: MISSING).
+    Standart 5 karakterlik değerler bayt düzeyinde toplu çözülür, diğerleri
+    payroll.parse_time ile tek tek.
+    """
+    _require_numpy()
+    fixed = [value if isinstance(value, str) and len(value) == 5 else "--:--" for value in values]
+    if not fixed:
+        return np.array([], dtype=np.int64)
+    digits = np.frombuffer("".join(fixed).encode('ascii', 'replace'), dtype=np.uint8)
+    digits = digits.reshape(-1, 5).astype(np.int64) - ord('0')
+    valid = (digits[:, 2] == ord(':') - ord('0')) & np.all(
+        (digits[:, [0, 1, 3, 4]] >= 0) & (digits[:, [0, 1, 3, 4]] <= 9), axis=1)
+    minutes = (digits[:, 0] * 10 + digits[:, 1]) * 60 + digits[:, 3] * 10 + digits[:, 4]
+    minutes = np.where(valid, minutes, MISSING)
+    for index in np.flatnonzero(~valid):
+        parsed = payroll.parse_time(values[index])
+        if parsed is not None:
+            minutes[index] = parsed
+    return minutes
+
+
+def columns_from_inputs(payroll_inputs):
+    """
+    get_week_payroll_inputs çıktılarını (bir veya birden fazla hafta, art arda
+    eklenmiş liste) calculate_weeks için sütunlara çevirir.
+    """
+    _require_numpy()
+    records = [rec for inputs in payroll_inputs for rec in inputs['work_hours']]
+    group = np.repeat(np.arange(len(payroll_inputs)),
+                      [len(inputs['work_hours']) for inputs in payroll_inputs])
+    dates = [rec['date'] for rec in records]
+    times = {key: parse_times([rec.get(key) for rec in records])
+             for key in ('entry_time', 'lunch_start', 'lunch_end', 'exit_time')}
+
+    employees = [inputs['employee'] for inputs in payroll_inputs]
+    return {
+        'group': group.astype(np.int64),
+        'entry_time': times['entry_time'],
+        'lunch_start': times['lunch_start'],
+        'lunch_end': times['lunch_end'],
+        'exit_time': times['exit_time'],
+        'weekday': weekdays_from_dates(dates) if dates else np.array([], dtype=np.int64),
+        'day_active': np.array([bool(rec.get('day_active', 1)) for rec in records], dtype=bool),
+        'hourly_rate': [emp['weekly_salary'] for emp in employees],
+        'daily_food': [emp['daily_food'] for emp in employees],
+        'daily_transport': [emp['daily_transport'] for emp in employees],
+        'week_additions': [inputs.get('week_additions', 0) for inputs in payroll_inputs],
+        'permanent_additions': [inputs.get('permanent_additions', 0) for inputs in payroll_inputs],
+        'worked': [inputs.get('worked', False) for inputs in payroll_inputs],
+        'deductions': [inputs.get('deductions', 0) for inputs in payroll_inputs]
+    }
+
+
+def calculate_employees(payroll_inputs):
+    """
+    utils.payroll.calculate_employees'ın toplu karşılığı. Aynı anahtarlarla
+    dict listesi döndürür; günlük ayrıntılar ('days') hesaplanmaz.
+    """
+    if not payroll_inputs:
+        return []
+    columns = columns_from_inputs(payroll_inputs)
+    arrays = calculate_weeks(**columns)
+    columns = {key: values.tolist() for key, values in arrays.items()}
+    results = []
+    for index, inputs in enumerate(payroll_inputs):
+        result = {key: values[index] for key, values in columns.items()}
+        result['employee'] = inputs['employee']
+        results.append(result)
+    return results
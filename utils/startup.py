@@ -0,0 +1,59 @@
+"""Açılış süresi ölçümü.
+
+STARTUP_TIMING=1 ortam değişkeniyle çalıştırılınca her import ve kurucu
+adımının süresi stderr'e yazdırılır; pencerenin görünür olduğu an hedef
+süreyle (STARTUP_BUDGET_MS) karşılaştırılır.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Bu modülün yüklendiği an (main.py ilk olarak yükler): süreler buna göre ölçülür
+PROCESS_START = time.perf_counter()
+
+ENV_VAR = "STARTUP_TIMING"
+# Pencerenin görünür olması için hedef süre (ms); aşılırsa raporda işaretlenir
+STARTUP_BUDGET_MS = 1500
+
+
+class StartupTimer:
+    """Açılış adımlarının sürelerini toplar; ortam değişkeni yoksa sadece ölçer, yazdırmaz"""
+
+    def __init__(self, enabled=None, stream=None):
+        if enabled is None:
+            enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+        self.enabled = enabled
+        self.stream = stream or sys.stderr
+        self.steps = []  # Henüz raporlanmamış (etiket, ms) çiftleri
+
+    @contextmanager
+    def measure(self, label):
+        """with timer.measure("import views.calisanlar"): ..."""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((label, (time.perf_counter() - begin) * 1000))
+
+    def elapsed_ms(self):
+        """Süreç başından (PROCESS_START) bu yana geçen süre"""
+        return (time.perf_counter() - PROCESS_START) * 1000
+
+    def report(self, title=None):
+        """Biriken adımları yazdırır ve sıfırlar
+
+        title verilirse (ör. "Pencere görünür") süreç başından geçen süre
+        hedefle birlikte yazılır.
+        """
+        steps, self.steps = self.steps, []
+        if not self.enabled:
+            return
+        for label, ms in steps:
+            print(f"[açılış] {label:<40} {ms:8.1f} ms", file=self.stream)
+        if title:
+            total = self.elapsed_ms()
+            status = "OK" if total <= STARTUP_BUDGET_MS else "HEDEF AŞILDI"
+            print(f"[açılış] {title:<40} {total:8.1f} ms "
+                  f"(hedef {STARTUP_BUDGET_MS} ms, {status})", file=self.stream)
+        self.stream.flush()
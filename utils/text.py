@@ -0,0 +1,16 @@
+"""Metin yardımcıları (Qt'den bağımsız; veritabanı göçleri de kullanır)."""
+
+# Python'un str.upper() metodu 'i' harfini 'I' yapar; Türkçede 'İ' olmalı
+_TR_UPPER_MAP = str.maketrans({'i': 'İ', 'ı': 'I'})
+
+
+def tr_upper(text):
+    """Türkçe kurallarıyla büyük harfe çevirir (i -> İ, ı -> I); None olduğu gibi döner"""
+    if text is None:
+        return None
+    return str(text).translate(_TR_UPPER_MAP).upper()
+
+
+def normalize_name(name):
+    """Çalışan ismini kaydedilecek biçime getirir: baştaki/sondaki boşluklar atılır, Türkçe büyük harf"""
+    return tr_upper(name.strip())
@@ -32,13 +32,8 @@ class Calisanlar(QWidget):
         self.current_employee_id = None
         self._active_dialogs = []  # Açık dialog referanslarını tutmak için
         self.initUI()
-        # --- Otomatik güncelleme: DB değişince tabloyu güncelle ---
-        if hasattr(self.db, 'data_changed'):
-            try:
-                self.db.data_changed.disconnect(self.load_employees)
-            except Exception:
-                pass
-            self.db.data_changed.connect(self.load_employees)
+        # --- Otomatik güncelleme: çalışan değişince tabloyu güncelle ---
+        self.db.changes.changes_ready.connect(self.on_changes)
     
     def initUI(self):
         """Kullanıcı arayüzünü başlatır"""
@@ -71,6 +66,11 @@ class Calisanlar(QWidget):
         self.employee_list.customContextMenuRequested.connect(self.show_context_menu)
         self.load_employees()
 
+    def on_changes(self, changes):
+        """Sadece çalışan değişikliklerinde (veya genel değişiklikte) tabloyu yeniler"""
+        if changes.full or changes.employees:
+            self.load_employees()
+
     def load_employees(self):
         if getattr(self, '_is_updating', False):
             return
@@ -6,9 +6,9 @@ from PyQt5.QtWidgets import (
     QMessageBox, QDoubleSpinBox, QTextEdit, QTableWidget,
     QTableWidgetItem, QHeaderView, QAbstractItemView
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QThread
+from PyQt5.QtCore import Qt, pyqtSignal, QThread, QObject, QRunnable, QThreadPool
 from PyQt5.QtGui import QFont
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from views.time_tracking_form import TimeTrackingForm
 from utils.helpers import format_currency
@@ -192,24 +192,55 @@ class PaymentListDialog(QDialog):
 class EmployeeLoaderWorker(QThread):
     employees_loaded = pyqtSignal(list)
 
-    def __init__(self, db_file):
+    def __init__(self, db):
         super().__init__()
-        self.db_file = db_file
+        self.db = db
 
     def run(self):
-        import sqlite3
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, name, weekly_salary, daily_food, daily_transport, is_active
-            FROM employees
-            WHERE is_active = 1
-            ORDER BY name
-        ''')
-        employees = cursor.fetchall()
-        conn.close()
+        # Her yenilemede yeni bağlantı açmak yerine havuzdan ödünç al
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, name, weekly_salary, daily_food, daily_transport, is_active
+                FROM employees
+                WHERE is_active = 1
+                ORDER BY name
+            ''')
+            employees = [tuple(row) for row in cursor.fetchall()]
         self.employees_loaded.emit(employees)
 
+class PrefetchSignals(QObject):
+    """Ön yükleme işçisinden ana iş parçacığına okunan verileri taşır"""
+    loaded = pyqtSignal(object, object)  # durum damgası, read_week_bundle sonucu
+
+class PrefetchWorker(QRunnable):
+    """
+    Seçili çalışanın komşularının ve önceki/sonraki haftasının zaman takibi
+    verilerini arka planda okur. Sonuçlar ana iş parçacığında veritabanı
+    önbelleğine yazılır; daha yeni bir seçim yapıldıysa kalan hedefler atlanır.
+    """
+
+    def __init__(self, db, signals, generation, current_generation, token, targets):
+        super().__init__()
+        self.db = db
+        self.signals = signals
+        self.generation = generation
+        self.current_generation = current_generation
+        self.token = token
+        self.targets = targets
+
+    def run(self):
+        with self.db.connection():
+            for employee_id, week_str in self.targets:
+                if self.generation != self.current_generation():
+                    return
+                try:
+                    bundle = self.db.read_week_bundle(employee_id, week_str)
+                except Exception:
+                    # Ön yükleme isteğe bağlıdır: okunamayan hedef seçilince normal yoldan yüklenir
+                    continue
+                self.signals.loaded.emit(self.token, bundle)
+
 class TimeSelectForm(QWidget):
     """Süre seçim formu"""
     
@@ -221,6 +252,12 @@ class TimeSelectForm(QWidget):
         self._active_dialogs = []  # Açık dialog referanslarını tutmak için
         self.time_tracking_form = None  # Zaman takibi formuna erişim için özellik
         self.selected_week = None  # Seçili hafta (global)
+        # Komşu çalışan/hafta ön yüklemesi: tek arka plan iş parçacığı, her seçim nesli artırır
+        self.prefetch_pool = QThreadPool(self)
+        self.prefetch_pool.setMaxThreadCount(1)
+        self.prefetch_signals = PrefetchSignals(self)
+        self.prefetch_signals.loaded.connect(self.on_prefetch_loaded)
+        self._prefetch_generation = 0
         self.initUI()
         # --- Otomatik güncelleme: DB değişince çalışan listesini güncelle ---
         self.load_employees()
@@ -310,7 +347,10 @@ class TimeSelectForm(QWidget):
         self.week_combo.blockSignals(True)
         self.week_combo.clear()
         weeks = self.db.get_available_weeks() if hasattr(self.db, 'get_available_weeks') else []
-        weeks = sorted(set(weeks), reverse=True)
+        # İçinde bulunulan hafta henüz kaydı olmasa da seçilebilsin (göz atmak satır yazmaz)
+        today = QDate.currentDate()
+        current_week = today.addDays(1 - today.dayOfWeek()).toString("yyyy-MM-dd")
+        weeks = sorted(set(weeks) | {current_week}, reverse=True)
         for w in weeks:
             # Görsel olarak "21-27 Nisan 2025" gibi göster
             try:
@@ -353,17 +393,15 @@ class TimeSelectForm(QWidget):
             # Aktif çalışan formuna haftayı bildir
             if self.current_time_form:
                 self.current_time_form.set_week(week_str)
+                self.schedule_prefetch()
+
+    def on_changes(self, changes):
+        """Sadece çalışan değişikliklerinde (veya genel değişiklikte) listeyi yeniler"""
+        if changes.full or changes.employees:
+            self.load_employees()
 
     def load_employees(self):
-        try:
-            self.db.data_changed.disconnect(self.load_employees)
-        except Exception:
-            pass
         if getattr(self, '_is_updating', False):
-            try:
-                self.db.data_changed.connect(self.load_employees)
-            except Exception:
-                pass
             return
         # --- SEÇİLİ ÇALIŞANI KAYDET ---
         selected_employee_id = None
@@ -375,13 +413,24 @@ class TimeSelectForm(QWidget):
         try:
             self.employee_list.clear()
             # Worker başlat
-            self.worker = EmployeeLoaderWorker(self.db.db_file)
+            self.worker = EmployeeLoaderWorker(self.db)
             self.worker.employees_loaded.connect(self.on_employees_loaded)
             self.worker.finished.connect(self.worker.deleteLater)
             self.worker.start()
         except Exception as e:
             pass
-        # _is_updating ve reconnect işlemleri artık on_employees_loaded içinde yapılacak
+        # _is_updating işlemi artık on_employees_loaded içinde yapılacak
+
+    def wait_for_loader(self):
+        """Çalışan listesi yükleyicisinin bitmesini bekler (veritabanı kapanmadan önce)"""
+        worker = getattr(self, 'worker', None)
+        if worker is None:
+            return
+        try:
+            worker.wait()
+        except RuntimeError:
+            # İş parçacığı bitmiş ve silinmiş (deleteLater)
+            pass
 
     def on_employees_loaded(self, employees):
         try:
@@ -402,10 +451,6 @@ class TimeSelectForm(QWidget):
                 self.employee_list.setCurrentRow(selected_row)  # Bu otomatik olarak on_employee_selected'ı tetikleyecek
         finally:
             self._is_updating = False
-            try:
-                self.db.data_changed.connect(self.load_employees)
-            except Exception:
-                pass
     
     def on_employee_selected(self, current, previous):
         """Listeden bir çalışan seçildiğinde"""
@@ -415,23 +460,68 @@ class TimeSelectForm(QWidget):
         name = current.text()
         self.load_employee(employee_id, name)
     
+    def flush_pending_changes(self):
+        """Açık zaman formundaki kaydedilmemiş düzenlemeleri veritabanına yazar"""
+        if self.current_time_form:
+            self.current_time_form.flush_dirty_rows()
+
     def load_employee(self, employee_id, employee_name):
         """Belirli bir çalışanı yükler"""
         # Eğer mevcut bir form varsa, onu silmek yerine güncelle
         if self.current_time_form:
-            self.current_time_form.set_employee(employee_id, employee_name)
-            # Seçili haftayı bildir
-            if self.selected_week:
-                self.current_time_form.set_week(self.selected_week)
+            # Seçili hafta ile birlikte bildir (hafta tek sorguyla bir kez yüklenir)
+            self.current_time_form.set_employee(employee_id, employee_name, self.selected_week)
+            self.schedule_prefetch()
             return  # Yeni form yaratmaya gerek yok
 
         # Eğer hiç form yoksa (ilk açılış), yeni oluştur
         self.current_time_form = TimeTrackingForm(self.db, employee_id)
         self.time_tracking_form = self.current_time_form
-        self.current_time_form.set_employee(employee_id, employee_name)
-        if self.selected_week:
-            self.current_time_form.set_week(self.selected_week)
+        self.current_time_form.set_employee(employee_id, employee_name, self.selected_week)
         self.time_form_container.addWidget(self.current_time_form)
+        self.schedule_prefetch()
+
+    def prefetch_targets(self):
+        """Ön yüklenecek (çalışan, hafta) çiftleri: listedeki komşu çalışanlar ve önceki/sonraki hafta"""
+        week_str = self.current_time_form.current_week_start
+        if not week_str:
+            return []
+        targets = []
+        row = self.employee_list.currentRow()
+        for neighbor in (row + 1, row - 1):
+            item = self.employee_list.item(neighbor) if neighbor >= 0 else None
+            if item is not None:
+                targets.append((item.data(Qt.UserRole), week_str))
+        week_start = datetime.strptime(week_str, "%Y-%m-%d")
+        for days in (7, -7):
+            targets.append((self.current_time_form.current_employee_id,
+                            (week_start + timedelta(days=days)).strftime("%Y-%m-%d")))
+        return [target for target in targets if not self.db.is_week_cached(*target)]
+
+    def schedule_prefetch(self):
+        """Seçimin komşularını arka planda önbelleğe alır; süren ön yükleme geçersiz olur"""
+        self._prefetch_generation += 1
+        if not self.current_time_form or not self.current_time_form.current_employee_id:
+            return
+        # Açık işlem varken okunan veri önbelleğe yazılamaz (None)
+        token = self.db.prefetch_token()
+        if token is None:
+            return
+        targets = self.prefetch_targets()
+        if not targets:
+            return
+        worker = PrefetchWorker(self.db, self.prefetch_signals, self._prefetch_generation,
+                                lambda: self._prefetch_generation, token, targets)
+        self.prefetch_pool.start(worker)
+
+    def on_prefetch_loaded(self, token, bundle):
+        """Arka planda okunan hafta verisini önbelleğe yazar (arada yazma olduysa atılır)"""
+        self.db.store_week_bundle(token, bundle)
+
+    def stop_prefetch(self):
+        """Süren ön yüklemeyi iptal edip bitmesini bekler (veritabanı kapanmadan önce)"""
+        self._prefetch_generation += 1
+        self.prefetch_pool.waitForDone()
     
     def show_employee_context_menu(self, position):
         """Çalışan listesinde sağ tık menüsünü gösterir"""
@@ -13,8 +13,9 @@ try:
     from datetime import datetime, timedelta
     import os
     import sys
-    from models.database import EmployeeDB
+    from models.database import EmployeeDB, DEFAULT_DAY_TIMES
     from utils.helpers import format_currency, calculate_working_hours
+    from utils import payroll
 except ModuleNotFoundError:
     # Dosya doğrudan çalıştırıldığında
     import sys
@@ -34,8 +35,9 @@ except ModuleNotFoundError:
     from PyQt5.QtCore import Qt, QDate, QTime, QTimer, pyqtSignal, QPoint, QEvent
     from PyQt5.QtGui import QColor, QBrush, QPainter, QPen, QFont
     from datetime import datetime, timedelta
-    from models.database import EmployeeDB
+    from models.database import EmployeeDB, DEFAULT_DAY_TIMES
     from utils.helpers import format_currency, calculate_working_hours
+    from utils import payroll
 
 # Özel TimeEdit sınıfı
 class CustomTimeEdit(QTimeEdit):
@@ -143,21 +145,48 @@ class CustomTimeEdit(QTimeEdit):
 class TimeTrackingForm(QWidget):
     """Zaman takibi formu"""
     
-    # Zaman değiştiğinde yayınlanacak sinyal
-    time_changed_signal = pyqtSignal()
     data_changed = pyqtSignal()
     
+    # Son düzenlemeden sonra kaydetmek için beklenen süre (ms)
+    AUTO_SAVE_DELAY_MS = 2000
+    
+    # Saat editörlerinin görünümü; pasif günlerde saatler gizlenir
+    TIME_EDIT_STYLE = """
+                    QTimeEdit {
+                        border: none;
+                        padding: 6px;
+                        font-size: 14px;
+                        background-color: transparent;
+                    }
+                    QTimeEdit::up-button, QTimeEdit::down-button {
+                        border: none;
+                        width: 0px;
+                        height: 0px;
+                    }
+                """
+    TIME_EDIT_HIDDEN_STYLE = TIME_EDIT_STYLE + """
+                        QTimeEdit {
+                            color: transparent;
+                        }
+                    """
+    DAY_NAMES = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+    
     def __init__(self, db, employee_id=None):
         super().__init__()
         self.db = db
         self.current_employee_id = employee_id
         self.current_date = QDate.currentDate()
         self.day_active_status = []
+        # Düzenlenmiş ama henüz kaydedilmemiş satırlar
+        self.dirty_rows = set()
+        # Şablondan gelen (veritabanında olmayan) aktif günler; ilk düzenlemede haftayla birlikte yazılır
+        self.template_rows = set()
 
-        # Otomatik kaydetme için zamanlayıcı
+        # Otomatik kaydetme: sadece düzenleme olduğunda, son düzenlemeden kısa süre sonra
         self.auto_save_timer = QTimer(self)
-        self.auto_save_timer.timeout.connect(self.auto_save_all)
-        self.auto_save_timer.start(10000)  # 10 saniyede bir otomatik kaydet
+        self.auto_save_timer.setSingleShot(True)
+        self.auto_save_timer.setInterval(self.AUTO_SAVE_DELAY_MS)
+        self.auto_save_timer.timeout.connect(self.flush_dirty_rows)
 
         # Pencere aktif/pasif kontrolü için event filter ekle
         self.installEventFilter(self)
@@ -174,14 +203,34 @@ class TimeTrackingForm(QWidget):
         """Para birimini formatlar"""
         return format_currency(value)
     
+    def create_day_rows(self):
+        """7 günlük satırları ve 28 saat editörünü bir kez oluşturur (load_week_days sadece değerleri bağlar)"""
+        self.days_table.setRowCount(7)
+        for i, day_name in enumerate(self.DAY_NAMES):
+            # Sadece gün ismi
+            day_item = QTableWidgetItem(day_name)
+            day_item.setTextAlignment(Qt.AlignCenter)
+            self.days_table.setItem(i, 0, day_item)
+            for col in range(1, 5):
+                time_edit = CustomTimeEdit()
+                time_edit.setDisplayFormat("HH:mm")
+                time_edit.timeChanged.connect(lambda time, row=i: self.on_time_changed(row))
+                # QTimeEdit'in görünümünü özelleştir
+                time_edit.setStyleSheet(self.TIME_EDIT_STYLE)
+                # Metni ortala
+                time_edit.setAlignment(Qt.AlignCenter)
+                self.days_table.setCellWidget(i, col, time_edit)
+    
     def load_week_days(self):
-        """Haftanın günlerini yükle"""
+        """Haftanın günlerini yükle (mevcut editörlere değerleri bağlar, widget oluşturmaz)"""
         if not self.current_employee_id:
             return
         
-        # Önce tabloyu temizle
-        self.days_table.setRowCount(0)
-        self.days_table.setRowCount(7)
+        # Satırlar veritabanından yeniden yükleneceği için kirli işaretler sıfırlanır
+        self.dirty_rows.clear()
+        # Tablo temizlendiyse (clear_form) editörleri yeniden oluştur
+        if self.days_table.rowCount() != 7:
+            self.create_day_rows()
         
         # Günlerin aktif durumunu takip etmek için liste oluştur
         self.day_active_status = [False] * 7
@@ -195,106 +244,63 @@ class TimeTrackingForm(QWidget):
         # current_week_start değerini ayarla (DB sorgularında kullanılacak)
         self.current_week_start = week_start.toString("yyyy-MM-dd")
         
-        # Eğer haftada hiç kayıt yoksa, aktif çalışanlar için varsayılan saatlerle otomatik kayıt oluştur
-        week_start_str = self.current_date.toString("yyyy-MM-dd") if hasattr(self.current_date, 'toString') else str(self.current_date)
-        records = []
-        for i in range(7):
-            current_date = week_start.addDays(i)
-            # Sadece Pazartesi(0)~Cuma(4) günleri için kayıt oluştur
-            if i < 5 and self.current_employee_id:
-                record = self.db.get_work_hours(self.current_employee_id, current_date.toString("yyyy-MM-dd"))
-                if not record:
-                    # Varsayılan saatlerle otomatik kayıt oluştur
-                    self.db.add_work_hours(
-                        self.current_employee_id,
-                        current_date.toString("yyyy-MM-dd"),
-                        "08:15", "13:15", "13:45", "18:45"
-                    )
-        # Sonrasında tabloyu güncelle
+        # Haftanın kayıtları tek sorguyla; kaydı olmayan günler çalışanın şablonundan
+        # sanal olarak gelir (sadece göz atmak veritabanına satır eklemez)
+        week_days = self.db.get_week_days(self.current_employee_id, self.current_week_start)
+        self.template_rows = {i for i, day in enumerate(week_days) if day['virtual'] and day['day_active']}
         
         # Haftanın her günü için
         for i in range(7):
             current_date = week_start.addDays(i)
-            day_name = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"][i]
-            
-            # Sadece gün ismi
-            day_item = QTableWidgetItem(f"{day_name}")
-            day_item.setTextAlignment(Qt.AlignCenter)
+            day_item = self.days_table.item(i, 0)
             # Tarih nesnesini UserRole olarak ata (arama için gerekli)
             day_item.setData(Qt.UserRole, current_date)
-            self.days_table.setItem(i, 0, day_item)
             
-            # Veritabanından bu gün için kaydedilmiş veriyi al
-            record = self.db.get_work_hours(self.current_employee_id, current_date.toString("yyyy-MM-dd"))
+            # Günün kaydı (veya şablondan sanal gün)
+            record = week_days[i]
             
-            # Eğer kayıt varsa ve aktifse
-            is_active = record and record['day_active'] == 1 if record else False
+            # Gün aktif mi
+            is_active = record['day_active'] == 1
             self.day_active_status[i] = is_active
             
-            # Gün aktif değilse satırı siyah göster
+            font = day_item.font()
             if not is_active:
                 # Pasif gün: sadece italik ve flu, bold olmasın
-                font = day_item.font()
                 font.setBold(False)
                 font.setItalic(True)
-                day_item.setFont(font)
                 day_item.setForeground(QBrush(QColor("#666666")))  # Gri yazı
             else:
                 # Aktif gün: sadece bold, italik olmasın
-                font_day = day_item.font()
-                font_day.setBold(True)
-                font_day.setItalic(False)
-                day_item.setFont(font_day)
+                font.setBold(True)
+                font.setItalic(False)
+                day_item.setForeground(QBrush())
+            day_item.setFont(font)
             
-            # Saat alanlarını ayarla
-            entry_time_val = record['entry_time'] if record and record['entry_time'] else "08:15"
-            lunch_start_val = record['lunch_start'] if record and record['lunch_start'] else "13:15"
-            lunch_end_val = record['lunch_end'] if record and record['lunch_end'] else "13:45"
-            exit_time_val = record['exit_time'] if record and record['exit_time'] else "18:45"
+            # Önceki haftanın hesaplanan hücrelerini temizle (calculate_total_hours yeniden yazar)
+            for col in range(5, 8):
+                self.days_table.setItem(i, col, QTableWidgetItem(""))
             
-            for col in range(1, 5):
-                time_edit = CustomTimeEdit()
-                time_edit.setDisplayFormat("HH:mm")
-                # Veritabanından gelen saatleri kullan
-                if col == 1:
-                    h, m = map(int, entry_time_val.split(":"))
-                    time_edit.setTime(QTime(h, m))
-                elif col == 2:
-                    h, m = map(int, lunch_start_val.split(":"))
-                    time_edit.setTime(QTime(h, m))
-                elif col == 3:
-                    h, m = map(int, lunch_end_val.split(":"))
-                    time_edit.setTime(QTime(h, m))
-                elif col == 4:
-                    h, m = map(int, exit_time_val.split(":"))
-                    time_edit.setTime(QTime(h, m))
+            # Saat alanlarını ayarla (boş saatler varsayılanla gösterilir)
+            times = (
+                record['entry_time'] or DEFAULT_DAY_TIMES[0],
+                record['lunch_start'] or DEFAULT_DAY_TIMES[1],
+                record['lunch_end'] or DEFAULT_DAY_TIMES[2],
+                record['exit_time'] or DEFAULT_DAY_TIMES[3]
+            )
+            style = self.TIME_EDIT_STYLE if is_active else self.TIME_EDIT_HIDDEN_STYLE
+            for col, value in enumerate(times, start=1):
+                time_edit = self.days_table.cellWidget(i, col)
+                # Değer bağlanırken timeChanged yayınlanmasın (satır kirli sayılmaz)
+                time_edit.blockSignals(True)
+                h, m = map(int, value.split(":"))
+                time_edit.setTime(QTime(h, m))
+                time_edit.first_digit = -1
+                time_edit.blockSignals(False)
                 time_edit.setReadOnly(not is_active)
                 time_edit.setEnabled(is_active)
-                time_edit.timeChanged.connect(lambda time, row=i: self.on_time_changed(row))
-                # QTimeEdit'in görünümünü özelleştir
-                time_edit.setStyleSheet("""
-                    QTimeEdit {
-                        border: none;
-                        padding: 6px;
-                        font-size: 14px;
-                        background-color: transparent;
-                    }
-                    QTimeEdit::up-button, QTimeEdit::down-button {
-                        border: none;
-                        width: 0px;
-                        height: 0px;
-                    }
-                """)
-                # Metni ortala
-                time_edit.setAlignment(Qt.AlignCenter)
-                # Eğer pasifse, sayıyı gizle
-                if not is_active:
-                    time_edit.setStyleSheet(time_edit.styleSheet() + """
-                        QTimeEdit {
-                            color: transparent;
-                        }
-                    """)
-                self.days_table.setCellWidget(i, col, time_edit)
+                # Stil sadece değiştiyse uygulanır (stil yenilemesi pahalıdır)
+                if time_edit.styleSheet() != style:
+                    time_edit.setStyleSheet(style)
         
         # Toplam saatleri hesapla
         self.calculate_total_hours()
@@ -348,6 +354,8 @@ class TimeTrackingForm(QWidget):
         self.days_table.setAlternatingRowColors(True)
         self.days_table.setSelectionBehavior(QTableWidget.SelectRows)
         self.days_table.setSelectionMode(QTableWidget.SingleSelection)
+        # Gün satırları ve saat editörleri bir kez oluşturulur
+        self.create_day_rows()
 
         # --- ORTA: Tabloyu ortalamak için ---
         week_select_layout = QHBoxLayout()
@@ -492,9 +500,33 @@ class TimeTrackingForm(QWidget):
                 action = menu.addAction("Aktif Yap")
                 action.triggered.connect(lambda: self.toggle_day_status(row, True))
             
+            # Haftanın saatlerini çalışanın şablonu yap (kaydı olmayan haftalar bu saatlerle gelir)
+            menu.addSeparator()
+            template_action = menu.addAction("Bu haftayı şablon olarak kaydet")
+            template_action.triggered.connect(self.save_week_as_template)
+            
             # Menüyü göster
             menu.exec_(self.days_table.viewport().mapToGlobal(pos))
             
+    def save_week_as_template(self):
+        """Tablodaki haftanın saatlerini ve aktif/pasif günlerini çalışanın şablonu olarak kaydeder"""
+        if not self.current_employee_id:
+            return
+        days = []
+        for row in range(self.days_table.rowCount()):
+            record = self.row_record(row)
+            if record is None:
+                continue
+            days.append({
+                'weekday': self.days_table.item(row, 0).data(Qt.UserRole).dayOfWeek() - 1,  # Pazartesi=0
+                'entry_time': record['entry_time'],
+                'lunch_start': record['lunch_start'],
+                'lunch_end': record['lunch_end'],
+                'exit_time': record['exit_time'],
+                'day_active': record['day_active']
+            })
+        self.db.save_schedule_template(self.current_employee_id, days)
+            
     def toggle_day_status(self, row, active_status):
         """Günün aktif/pasif durumunu değiştir"""
         # Günün durumunu güncelle
@@ -531,7 +563,7 @@ class TimeTrackingForm(QWidget):
             for col in range(1, 5):
                 time_edit = self.days_table.cellWidget(row, col)
                 if time_edit:
-                    time_edit.setStyleSheet(time_edit.styleSheet().replace("color: transparent;", ""))
+                    time_edit.setStyleSheet(self.TIME_EDIT_STYLE)
             # Aktif günler için gün ismini bold yap
             font_day = day_item.font()
             font_day.setBold(True)
@@ -548,11 +580,7 @@ class TimeTrackingForm(QWidget):
             for col in range(1, 5):
                 time_edit = self.days_table.cellWidget(row, col)
                 if time_edit:
-                    time_edit.setStyleSheet(time_edit.styleSheet() + """
-                        QTimeEdit {
-                            color: transparent;
-                        }
-                    """)
+                    time_edit.setStyleSheet(self.TIME_EDIT_HIDDEN_STYLE)
         
         # Normal Ç. ve Fazla Ç. hücrelerini de aktif/pasif durumuna göre güncelle
         for col in [5, 6]:
@@ -573,34 +601,27 @@ class TimeTrackingForm(QWidget):
             time_edit.setReadOnly(not active_status)
             time_edit.setEnabled(active_status)
         
-        # Değişiklikleri kaydet
-        self.auto_save_row(row)
+        # Değişikliği hemen kaydet (açık kullanıcı eylemi)
+        self.dirty_rows.add(row)
+        self.flush_dirty_rows()
         
         # Toplam saatleri güncelle
         self.calculate_total_hours()
-        self.data_changed.emit()
     
     def on_time_changed(self, row):
-        """Zaman değiştiğinde çağrılır"""
-        self.auto_save_row(row)
+        """Zaman değiştiğinde çağrılır: satırı kirli işaretler, kayıt kısa süre sonra toplu yapılır"""
+        self.dirty_rows.add(row)
+        self.auto_save_timer.start()
         self.calculate_total_hours()
-        
-        # Sinyali yayınla - haftalık sekmenin güncellenmesi için
-        self.time_changed_signal.emit()
-        self.data_changed.emit()
     
-    def auto_save_row(self, row):
-        """Belirli bir satırı otomatik kaydeder"""
-        if not self.current_employee_id:
-            return
-        
+    def row_record(self, row):
+        """Tablodaki bir satırı work_hours kaydına (dict) çevirir"""
         # Tarih bilgisini al
         date_item = self.days_table.item(row, 0)
         if not date_item:
-            return
+            return None
         
         current_day = date_item.data(Qt.UserRole)
-        date_str = current_day.toString("yyyy-MM-dd")
         
         # Durum bilgisini al
         is_active = self.day_active_status[row]
@@ -610,46 +631,38 @@ class TimeTrackingForm(QWidget):
         lunch_start_widget = self.days_table.cellWidget(row, 2)
         lunch_end_widget = self.days_table.cellWidget(row, 3)
         exit_widget = self.days_table.cellWidget(row, 4)
-        entry_time = entry_widget.time().toString("HH:mm") if entry_widget else "00:00"
-        lunch_start = lunch_start_widget.time().toString("HH:mm") if lunch_start_widget else "00:00"
-        lunch_end = lunch_end_widget.time().toString("HH:mm") if lunch_end_widget else "00:00"
-        exit_time = exit_widget.time().toString("HH:mm") if exit_widget else "00:00"
-        
-        # Veritabanına kaydet - day_active parametresini de ekle
-        self.db.save_work_hours(
-            self.current_employee_id, date_str, 
-            entry_time, lunch_start, lunch_end, exit_time, 
-            1 if is_active else 0,  # is_active parametresi
-            1 if is_active else 0   # day_active parametresi
-        )
-
-        # --- Sabit ek ödeme kontrolü ve ekleme ---
-        # Haftada en az bir aktif gün varsa ve o haftaya ait sabit ek ödeme yoksa otomatik ekle
-        week_start_date = self.current_week_start if hasattr(self, 'current_week_start') else None
-        if week_start_date:
-            cursor = self.db.conn.cursor()
-            cursor.execute('''
-                SELECT 1 FROM payments WHERE employee_id = ? AND week_start_date = ? AND is_permanent = 1
-            ''', (self.current_employee_id, week_start_date))
-            sabit_odeme_var = cursor.fetchone() is not None
-            if not sabit_odeme_var:
-                self.db.add_payment(
-                    self.current_employee_id,
-                    week_start_date,
-                    "bonus",  # veya "permanent"
-                    0.0,
-                    "Otomatik Sabit Ek Ödeme",
-                    1
-                )
-        self.data_changed.emit()
+        return {
+            'date': current_day.toString("yyyy-MM-dd"),
+            'entry_time': entry_widget.time().toString("HH:mm") if entry_widget else "00:00",
+            'lunch_start': lunch_start_widget.time().toString("HH:mm") if lunch_start_widget else "00:00",
+            'lunch_end': lunch_end_widget.time().toString("HH:mm") if lunch_end_widget else "00:00",
+            'exit_time': exit_widget.time().toString("HH:mm") if exit_widget else "00:00",
+            'is_active': 1 if is_active else 0,
+            'day_active': 1 if is_active else 0
+        }
     
-    def auto_save_all(self):
-        """Tüm satırları otomatik kaydeder"""
-        if not self.current_employee_id:
+    def flush_dirty_rows(self):
+        """Sadece düzenlenmiş satırları tek işlemde kaydeder; düzenleme yoksa hiçbir şey yazmaz"""
+        self.auto_save_timer.stop()
+        if not self.current_employee_id or not self.dirty_rows:
+            self.dirty_rows.clear()
             return
         
-        for row in range(7):
-            self.auto_save_row(row)
+        # İlk düzenlemede şablondan gelen aktif günler de yazılır (hafta kalıcı hale gelir)
+        records = []
+        for row in sorted(self.dirty_rows | self.template_rows):
+            if row < len(self.day_active_status):
+                record = self.row_record(row)
+                if record:
+                    records.append(record)
+        self.dirty_rows.clear()
+        self.template_rows.clear()
+        if not records:
+            return
+        
+        # Sabit ödemesi olmayan hafta 0 tutarlı sabit ödeme gibi hesaplanır: kayıt eklenmez
+        self.db.save_work_hours_bulk(self.current_employee_id, records)
+        self.data_changed.emit()
     
     def calculate_total_hours(self):
         """Toplam çalışma saatlerini hesaplar"""
@@ -660,247 +673,98 @@ class TimeTrackingForm(QWidget):
         if not hasattr(self, 'day_active_status') or not self.day_active_status:
             return
         
-        total_hours = 0
-        active_days = 0
-        food_days = 0  # 5 saat üstü gün sayısı
-        
-        # Her gün için çalışma saatlerini hesapla
-        daily_overtime_list = []
-        for row in range(min(7, len(self.day_active_status))):
-            # Gün aktif mi kontrol et
-            is_active = self.day_active_status[row]
-            if not is_active:
-                continue
-            
-            # Aktif gün sayısını artır
-            active_days += 1
-            
-            # Zaman bilgilerini al
-            entry_widget = self.days_table.cellWidget(row, 1)
-            lunch_start_widget = self.days_table.cellWidget(row, 2)
-            lunch_end_widget = self.days_table.cellWidget(row, 3)
-            exit_widget = self.days_table.cellWidget(row, 4)
-            date_item = self.days_table.item(row, 0)
-            current_day = None
-            if date_item:
-                current_day = date_item.data(Qt.UserRole)
-
-            # Eğer herhangi bir widget eksikse, bu günü atla
-            if not entry_widget or not lunch_start_widget or not lunch_end_widget or not exit_widget:
-                continue
-
-            # Zaman değerlerini al
-            entry_time = entry_widget.time()
-            lunch_start = lunch_start_widget.time()
-            lunch_end = lunch_end_widget.time()
-            exit_time = exit_widget.time()
-
-            # Sabah çalışma saatleri (saat cinsinden)
-            morning_hours = 0
-            if entry_time.hour() <= lunch_start.hour():  # Normal durum
-                morning_seconds = (lunch_start.hour() * 3600 + lunch_start.minute() * 60) - (entry_time.hour() * 3600 + entry_time.minute() * 60)
-                morning_hours = morning_seconds / 3600.0 if morning_seconds > 0 else 0
-
-            # Öğleden sonra çalışma saatleri (saat cinsinden)
-            afternoon_hours = 0
-            if lunch_end.hour() <= exit_time.hour():  # Normal durum
-                overtime_start_minutes_actual = 18 * 60 + 45
-                day_end_minutes = exit_time.hour() * 60 + exit_time.minute()
-                # Normal çalışma bitişi: 18:45 veya çıkış saati hangisi erkense
-                normal_end_minutes = min(day_end_minutes, overtime_start_minutes_actual)
-                afternoon_seconds = (normal_end_minutes * 60) - (lunch_end.hour() * 3600 + lunch_end.minute() * 60)
-                afternoon_hours = afternoon_seconds / 3600.0 if afternoon_seconds > 0 else 0
-
-            # Toplam çalışma saatleri (saat cinsinden)
-            day_hours = morning_hours + afternoon_hours
-
-            # Negatif değerleri düzelt (zaman çakışmaları veya hatalı giriş)
-            if day_hours < 0:
-                day_hours = 0
-
-            # 5 saatten fazla çalışıldıysa yemek hakkı kazandır
-            daily_food_count = 0
-            if day_hours > 5:
-                daily_food_count += 1
-
-            # Eğer çıkış saati 20:00'dan sonra ise, bir yemek hakkı daha ekle
-            if (exit_time.hour() > 20) or (exit_time.hour() == 20 and exit_time.minute() > 0):
-                daily_food_count += 1
-
-            # Günlük yemek parası, ilgili günün satırına yazılsın
-            if is_active:
-                daily_food_amount = daily_food_count * 10  # employee_info[3]
-                food_item = QTableWidgetItem(self.format_currency(daily_food_amount))
-                food_item.setTextAlignment(Qt.AlignCenter)
-                self.days_table.setItem(row, 7, food_item)
-
-            # Haftalık toplam için de sayacı artır
-            food_days += daily_food_count
-
-            # Gün bilgisi ve hafta içi/sonu kontrolü
-            weekday = None
-            if current_day:
-                try:
-                    weekday = current_day.dayOfWeek() - 1  # Pazartesi=0, Cumartesi=5, Pazar=6
-                except Exception:
-                    weekday = None
-
-            # Fazla mesai ve normal saat hesaplamaları
-            overtime_hours = 0
-            normal_hours = 0
-            if weekday in [5, 6]:
-                # Cumartesi/Pazar: tümü fazla mesai
-                overtime_hours = day_hours
-                normal_hours = 0
-            else:
-                # Hafta içi
-                overtime_start_minutes_actual = 18 * 60 + 45
-                day_start_minutes = entry_time.hour() * 60 + entry_time.minute()
-                day_end_minutes = exit_time.hour() * 60 + exit_time.minute()
-                # Normal çalışma bitişi: 18:45 veya çıkış saati hangisi erkense
-                normal_end_minutes = min(day_end_minutes, overtime_start_minutes_actual)
-                # Sabah çalışma: Giriş -> Öğle Başlangıç
-                morning_seconds = (lunch_start.hour() * 3600 + lunch_start.minute() * 60) - (entry_time.hour() * 3600 + entry_time.minute() * 60)
-                morning_hours = morning_seconds / 3600.0 if morning_seconds > 0 else 0
-                # Akşam çalışma: Öğle Bitiş -> Normal Çalışma Bitişi
-                afternoon_seconds = (normal_end_minutes * 60) - (lunch_end.hour() * 3600 + lunch_end.minute() * 60)
-                afternoon_hours = afternoon_seconds / 3600.0 if afternoon_seconds > 0 else 0
-                normal_hours = morning_hours + afternoon_hours
-                # Fazla mesai: 18:45 sonrası
-                if day_end_minutes > overtime_start_minutes_actual:
-                    overtime_minutes = day_end_minutes - overtime_start_minutes_actual
-                    overtime_hours = overtime_minutes / 60.0
-                else:
-                    overtime_hours = 0
-
-            # Negatif değerleri sıfırla
-            if normal_hours < 0:
-                normal_hours = 0
-            if overtime_hours < 0:
-                overtime_hours = 0
-
-            # Günlük saatleri tabloya yaz
-            normal_int = int(normal_hours)
-            normal_min = int(round((normal_hours - normal_int) * 60))
-            if normal_min == 60:
-                normal_int += 1
-                normal_min = 0
-            if not is_active or (normal_int == 0 and normal_min == 0):
-                normal_item = QTableWidgetItem("")
-            else:
-                normal_item = QTableWidgetItem(f"{normal_int}:{normal_min:02d}")
-                font = normal_item.font()
-                font.setBold(True)
-                normal_item.setFont(font)
-            normal_item.setTextAlignment(Qt.AlignCenter)
-            self.days_table.setItem(row, 5, normal_item)
-
-            overtime_int = int(overtime_hours)
-            overtime_min = int(round((overtime_hours - overtime_int) * 60))
-            if overtime_min == 60:
-                overtime_int += 1
-                overtime_min = 0
-            if not is_active or (overtime_int == 0 and overtime_min == 0):
-                overtime_item = QTableWidgetItem("")
-            else:
-                overtime_item = QTableWidgetItem(f"{overtime_int}:{overtime_min:02d}")
-                font_ot = overtime_item.font()
-                font_ot.setBold(True)
-                overtime_item.setFont(font_ot)
-            overtime_item.setTextAlignment(Qt.AlignCenter)
-            self.days_table.setItem(row, 6, overtime_item)
-
-            # Toplamlar için biriktir
-            total_hours += normal_hours
-            if 'total_overtime_hours' not in locals():
-                total_overtime_hours = 0
-            total_overtime_hours += overtime_hours
-
-            # Günlük fazla mesai saatini tabloya yaz
-            # overtime_val = overtime_hours
-            # overtime_int = int(overtime_val)
-            # overtime_min = int((overtime_val - overtime_int) * 60)
-            # overtime_item = QTableWidgetItem(f"{overtime_int}:{overtime_min:02d}")
-            # overtime_item.setTextAlignment(Qt.AlignCenter)
-            # self.days_table.setItem(row, 6, overtime_item)
-
-            # Normal saatleri tabloya yaz
-            # normal_val = normal_hours
-            # normal_int = int(normal_val)
-            # normal_min = int((normal_val - normal_int) * 60)
-            # normal_item = QTableWidgetItem(f"{normal_int}:{normal_min:02d}")
-            # normal_item.setTextAlignment(Qt.AlignCenter)
-            # self.days_table.setItem(row, 5, normal_item)
-
-        # Toplam saati saat ve dakika olarak ayır
-        total_hours_int = int(total_hours)
-        total_minutes = int(round((total_hours - total_hours_int) * 60))
-        if total_minutes == 60:
-            total_hours_int += 1
-            total_minutes = 0
-        self.summary_labels['hours']['value'].setText(f"{total_hours_int}:{total_minutes:02d}")
-
-        overtime_total = total_overtime_hours if 'total_overtime_hours' in locals() else 0
-        overtime_hours_int = int(overtime_total)
-        overtime_minutes = int(round((overtime_total - overtime_hours_int) * 60))
-        if overtime_minutes == 60:
-            overtime_hours_int += 1
-            overtime_minutes = 0
-        self.summary_labels['overtime_hours']['value'].setText(f"{overtime_hours_int}:{overtime_minutes:02d}")
-
         # Çalışan bilgilerini al
         employee_info = self.db.get_employee(self.current_employee_id)
         if not employee_info:
             return
 
-        weekly_salary = employee_info[2] if employee_info else 0  # Haftalık ücret
-        hourly_rate = weekly_salary / 50  # Saatlik ücret
-        overtime_rate = hourly_rate * 1.5  # Fazla mesai ücreti
-
-        # Haftalık ücret hesapla (normal çalışma saati x saatlik ücret)
-        earned_salary = total_hours * hourly_rate
-        # Fazla mesai ücreti ekle
-        if 'total_overtime_hours' in locals():
-            earned_salary += total_overtime_hours * overtime_rate
+        hourly_rate = employee_info[2] / 50  # get_employee haftalık ücret döndürür
+        daily_food = employee_info[3]
+        daily_transport = employee_info[4]
 
-        # Yol ve yemek ödemeleri (günlük 5 saatten fazla olan günler için yemek)
-        food_allowance = food_days * employee_info[3]  # daily_food
-        transport_allowance = active_days * employee_info[4]  # daily_transport
-        total_allowances = food_allowance + transport_allowance
+        # Tablodaki saatlerden günlük kayıtları dakika cinsinden oluştur
+        records = []
+        rows = []
+        for row in range(min(7, len(self.day_active_status))):
+            widgets = [self.days_table.cellWidget(row, col) for col in range(1, 5)]
+            date_item = self.days_table.item(row, 0)
+            # Eğer herhangi bir widget eksikse, bu günü atla
+            if not all(widgets) or not date_item:
+                continue
+            times = [widget.time() for widget in widgets]
+            current_day = date_item.data(Qt.UserRole)
+            records.append({
+                'date': current_day.toString("yyyy-MM-dd") if current_day else None,
+                'entry_time': times[0].hour() * 60 + times[0].minute(),
+                'lunch_start': times[1].hour() * 60 + times[1].minute(),
+                'lunch_end': times[2].hour() * 60 + times[2].minute(),
+                'exit_time': times[3].hour() * 60 + times[3].minute(),
+                'day_active': 1 if self.day_active_status[row] else 0
+            })
+            rows.append(row)
 
         # Eklenti değeri, kesintiyi girdiğimiz yerdeki eklenti değerinden gelsin
         week_start_str = self.current_date.toString('yyyy-MM-dd') if hasattr(self.current_date, 'toString') else str(self.current_date)
         # Haftada hiç çalışma yoksa sabit ek ödeme eklenmesin
-        calisma_var = (total_hours > 0 or (hasattr(self, 'day_active_status') and any(self.day_active_status)))
-        total_additions = self.db.get_employee_additions(self.current_employee_id, week_start_str, include_permanent_if_no_work=calisma_var) if self.current_employee_id else 0
+        calisma_var = any(self.day_active_status)
+        total_additions = self.db.get_employee_additions(self.current_employee_id, week_start_str, include_permanent_if_no_work=calisma_var)
 
-        # Etiketleri güncelle - toplam saati saat:dakika formatında göster
-        # self.summary_labels['hours']['value'].setText(f"{total_hours_int}:{total_minutes:02d}")
-        # overtime_hours_int = int(total_overtime_hours) if 'total_overtime_hours' in locals() else 0
-        # overtime_minutes = int(((total_overtime_hours if 'total_overtime_hours' in locals() else 0) - overtime_hours_int) * 60)
-        # self.summary_labels['overtime_hours']['value'].setText(f"{overtime_hours_int}:{overtime_minutes:02d}")
+        result = payroll.calculate_week(
+            records, hourly_rate, daily_food, daily_transport,
+            week_additions=total_additions
+        )
 
-        normal_salary = total_hours * hourly_rate
-        overtime_salary = (total_overtime_hours if 'total_overtime_hours' in locals() else 0) * overtime_rate
-        self.summary_labels['normal_salary']['value'].setText(self.format_currency(normal_salary))
-        self.summary_labels['overtime_salary']['value'].setText(self.format_currency(overtime_salary))
+        def minutes_to_text(minutes):
+            return f"{minutes // 60}:{minutes % 60:02d}"
 
-        self.summary_labels['food']['value'].setText(self.format_currency(food_allowance))
-        self.summary_labels['transport']['value'].setText(self.format_currency(transport_allowance))
-        self.summary_labels['addition']['value'].setText(self.format_currency(total_additions))
+        # Günlük saatleri ve yemek ücretini tabloya yaz (sadece aktif günler)
+        for row, day in zip(rows, result['days']):
+            if not day['counted']:
+                continue
+
+            food_item = QTableWidgetItem(self.format_currency(day['food_count'] * daily_food))
+            food_item.setTextAlignment(Qt.AlignCenter)
+            self.days_table.setItem(row, 7, food_item)
+
+            for col, minutes in ((5, day['normal_minutes']), (6, day['overtime_minutes'])):
+                if minutes == 0:
+                    item = QTableWidgetItem("")
+                else:
+                    item = QTableWidgetItem(minutes_to_text(minutes))
+                    font = item.font()
+                    font.setBold(True)
+                    item.setFont(font)
+                item.setTextAlignment(Qt.AlignCenter)
+                self.days_table.setItem(row, col, item)
+
+        # Etiketleri güncelle - toplam saati saat:dakika formatında göster
+        self.summary_labels['hours']['value'].setText(minutes_to_text(result['normal_minutes']))
+        self.summary_labels['overtime_hours']['value'].setText(minutes_to_text(result['overtime_minutes']))
+        self.summary_labels['normal_salary']['value'].setText(self.format_currency(result['normal_pay']))
+        self.summary_labels['overtime_salary']['value'].setText(self.format_currency(result['overtime_pay']))
+        self.summary_labels['food']['value'].setText(self.format_currency(result['food_allowance']))
+        self.summary_labels['transport']['value'].setText(self.format_currency(result['transport_allowance']))
+        self.summary_labels['addition']['value'].setText(self.format_currency(result['total_additions']))
         self.summary_labels['deduction']['value'].setText("0,00 TL")
 
         # Net ödenek hesapla (ücret + ödenekler)
-        total_weekly_salary = normal_salary + overtime_salary + total_allowances + total_additions
-        self.summary_labels['net']['value'].setText(self.format_currency(total_weekly_salary))
+        self.summary_labels['net']['value'].setText(self.format_currency(result['total']))
     
-    def set_employee(self, employee_id, employee_name):
-        """Çalışan bilgisini ayarlar ve günleri yükler"""
+    def set_employee(self, employee_id, employee_name, week_str=None):
+        """Çalışan bilgisini ayarlar ve günleri bir kez yükler
+        
+        week_str verilirse o hafta, verilmezse içinde bulunulan hafta gösterilir.
+        """
+        # Önceki çalışanın kaydedilmemiş düzenlemelerini yaz
+        self.flush_dirty_rows()
         self.current_employee_id = employee_id
         
         # Günleri yükle
-        self.load_week_days()
-        self.load_saved_records()
+        if week_str:
+            self.current_date = QDate.fromString(week_str, "yyyy-MM-dd")
+            self.load_week_days()
+        else:
+            self.load_saved_records()
         
         # Çalışan adını özet panelinin üstüne yaz
         self.employee_name_label_summary.setText(employee_name)
@@ -924,15 +788,14 @@ class TimeTrackingForm(QWidget):
         week_start = today.addDays(-days_to_monday)
         self.current_date = week_start
         
-        # Günleri yükle
+        # Günleri yükle (toplamlar da hesaplanır)
         self.load_week_days()
-        
-        # Toplam saatleri hesapla
-        self.calculate_total_hours()
     
     def set_week(self, week_str):
         """Haftayı dışarıdan ayarla ve tabloyu güncelle"""
         from PyQt5.QtCore import QDate
+        # Önceki haftanın kaydedilmemiş düzenlemelerini yaz
+        self.flush_dirty_rows()
         self.current_date = QDate.fromString(week_str, "yyyy-MM-dd")
         self.load_week_days()
     
@@ -943,26 +806,11 @@ class TimeTrackingForm(QWidget):
         for key in self.summary_labels:
             self.summary_labels[key]['value'].setText("0,00 TL")
 
-    def disconnect_all_signals(self):
-        for row in range(self.days_table.rowCount()):
-            for col in range(1, 5):  # Giriş, Öğle Başlangıç, Öğle Bitiş, Çıkış
-                time_edit = self.days_table.cellWidget(row, col)
-                if time_edit:
-                    try:
-                        time_edit.timeChanged.disconnect()
-                    except Exception:
-                        pass
-
     def eventFilter(self, obj, event):
         from PyQt5.QtCore import QEvent
-        if event.type() == QEvent.WindowActivate:
-            # Pencere aktif oldu, timer'ı başlat
-            if not self.auto_save_timer.isActive():
-                self.auto_save_timer.start(10000)
-        elif event.type() == QEvent.WindowDeactivate:
-            # Pencere pasif oldu, timer'ı durdur
-            if self.auto_save_timer.isActive():
-                self.auto_save_timer.stop()
+        if event.type() == QEvent.WindowDeactivate:
+            # Pencere pasif oldu, bekleyen düzenlemeleri hemen kaydet
+            self.flush_dirty_rows()
         return super().eventFilter(obj, event)
 
 # Bu blok sadece bu dosya doğrudan çalıştırıldığında çalışır
@@ -1,15 +1,211 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-    QTableWidget, QTableWidgetItem, QHeaderView, QComboBox, QSizePolicy,
+    QTableWidget, QTableWidgetItem, QTableView, QHeaderView, QComboBox, QSizePolicy,
     QMessageBox, QDialog, QDialogButtonBox, QFormLayout, QListWidget,
-    QPushButton, QScrollArea, QFrame, QGridLayout
+    QPushButton, QScrollArea, QFrame, QGridLayout, QApplication
+)
+from PyQt5.QtCore import (
+    Qt, QDate, QObject, QRunnable, QThreadPool, pyqtSignal, QAbstractTableModel,
+    QModelIndex, QVariant
 )
-from PyQt5.QtCore import Qt, QDate, QTime
 from PyQt5.QtGui import QColor, QBrush, QFont
 from datetime import datetime, timedelta
 
 from models.database import EmployeeDB
-from utils.helpers import format_currency, calculate_daily_normal_and_overtime
+from utils.helpers import format_currency
+from utils import payroll
+
+
+def build_employee_row(result):
+    """Bordro sonucunu tablo satırına çevirir, gösterilmeyecekse None döndürür"""
+    emp = result['employee']
+    # Eğer o haftada hiç çalışma kaydı yoksa ek sabit ödemeler de eklenmesin
+    if not result['has_work']:
+        return None
+    if result['total'] == 0:
+        return None
+    return {
+        'id': emp['id'],
+        'name': emp['name'],
+        'is_active': emp['is_active'],
+        'total_seconds': result['total_minutes'] * 60,
+        'total_hours_str': payroll.format_minutes(result['total_minutes']),
+        'normal_hours_str': payroll.format_minutes(result['normal_minutes']),
+        'overtime_hours_str': payroll.format_minutes(result['overtime_minutes']),
+        'normal_pay': result['normal_pay'],
+        'overtime_pay': result['overtime_pay'],
+        'weekly_salary': emp['weekly_salary'],
+        'weekly_salary_earned': result['earned'],
+        'food_allowance': result['food_allowance'],
+        'transport_allowance': result['transport_allowance'],
+        'total_additions': result['total_additions'],
+        'total_deductions': result['total_deductions'],
+        'total_weekly_salary': result['total']
+    }
+
+
+class ReportSignals(QObject):
+    """Rapor işçisinden ana iş parçacığına sonuç taşıyan sinyaller"""
+    finished = pyqtSignal(int, object)  # nesil, sonuç
+    failed = pyqtSignal(int, str)  # nesil, hata mesajı
+
+
+class ReportWorker(QRunnable):
+    """
+    Haftalık raporu arka planda hesaplar. Sonuç düz bir dict'tir:
+    {'week': hafta, 'employee_ids': None (tüm rapor) veya küme, 'rows': satırlar,
+     'closed': hafta kapatılmış mı, 'drifted': kapanıştan sonra kayıtlar değişmiş mi}
+    Kapatılmış haftalar yeniden hesaplanmaz, kapanıştaki anlık görüntüden gösterilir.
+    Daha yeni bir istek başladıysa (nesil değiştiyse) sonuç gönderilmez.
+    """
+
+    def __init__(self, db, signals, generation, current_generation, week_str, employee_ids=None):
+        super().__init__()
+        self.db = db
+        self.signals = signals
+        self.generation = generation
+        self.current_generation = current_generation
+        self.week_str = week_str
+        self.employee_ids = employee_ids
+
+    def is_cancelled(self):
+        return self.generation != self.current_generation()
+
+    def run(self):
+        if self.is_cancelled():
+            return
+        try:
+            # Havuzdan ödünç bağlantı: ana iş parçacığındaki otomatik kaydı beklemez.
+            # Haftalık toplamlar weekly_rollup tablosundan tek indeksli okumayla gelir
+            with self.db.connection():
+                # Özet sadece tam yüklemede yeniden hesaplanır (uygulama dışı değişiklikler);
+                # kısmi yenileme uygulamadaki yazmadan gelir, kayma işareti zaten günceldir
+                closed = self.db.get_closed_week(self.week_str, verify=self.employee_ids is None)
+                if closed is None:
+                    rollups = self.db.get_week_rollups(self.week_str, employee_ids=self.employee_ids)
+            if self.is_cancelled():
+                return
+            if closed is not None:
+                results = [
+                    result for result in closed['results']
+                    if self.employee_ids is None or result['employee']['id'] in self.employee_ids
+                ]
+            else:
+                results = payroll.calculate_rollups(rollups)
+            rows = []
+            for result in results:
+                row = build_employee_row(result)
+                if row is not None:
+                    rows.append(row)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        if self.is_cancelled():
+            return
+        self.signals.finished.emit(self.generation, {
+            'week': self.week_str,
+            'employee_ids': self.employee_ids,
+            'rows': rows,
+            'closed': closed is not None,
+            'drifted': closed is not None and closed['drifted']
+        })
+
+
+class WeeklyReportModel(QAbstractTableModel):
+    """
+    Haftalık rapor tablosunun modeli. Hücre metinleri satır gelince bir kez
+    hesaplanır; yazı tipleri ve hizalamalar paylaşılır. set_rows yeni satırları
+    mevcutlarla karşılaştırır ve sadece değişen hücreler için dataChanged yayınlar.
+    """
+    HEADERS = [
+        "Çalışan", "Haftalık Ücret", "Normal Ç. Saati", "Normal Ç. Ücreti", "Fazla Ç. Saati",
+        "Fazla Ç. Ücreti", "Yemek", "Yol", "Ek Ödemeler", "Kesintiler", "Toplam"
+    ]
+    RIGHT = int(Qt.AlignRight | Qt.AlignVCenter)
+    CENTER = int(Qt.AlignCenter)
+    LEFT = int(Qt.AlignLeft | Qt.AlignVCenter)
+    # Sütun hizalamaları
+    ALIGNMENTS = [LEFT, RIGHT, CENTER, RIGHT, CENTER, RIGHT, RIGHT, RIGHT, RIGHT, RIGHT, RIGHT]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []  # Satır dict'leri (build_employee_row çıktısı)
+        self._texts = []  # Satır başına hücre metinleri
+        bold_font = QFont()
+        bold_font.setBold(True)
+        total_font = QFont()
+        total_font.setBold(True)
+        total_font.setPointSize(14)
+        # Sütun yazı tipleri (None: tablonun yazı tipi)
+        self._fonts = [None, None, None, bold_font, None, bold_font, None, None, None, None, total_font]
+
+    @staticmethod
+    def row_texts(emp):
+        """Satırın hücrelerinde gösterilecek metinler"""
+        return [
+            emp['name'],
+            format_currency(emp['weekly_salary'] * 50),
+            emp['normal_hours_str'],
+            format_currency(emp['normal_pay']),
+            emp['overtime_hours_str'],
+            format_currency(emp['overtime_pay']),
+            format_currency(emp['food_allowance']),
+            format_currency(emp['transport_allowance']),
+            format_currency(emp['total_additions']),
+            format_currency(emp['total_deductions']),
+            # Toplam 10'a yuvarlanarak gösterilir
+            format_currency(round(emp['total_weekly_salary'] / 10) * 10)
+        ]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        if role == Qt.DisplayRole:
+            return self._texts[index.row()][index.column()]
+        if role == Qt.TextAlignmentRole:
+            return self.ALIGNMENTS[index.column()]
+        if role == Qt.FontRole:
+            font = self._fonts[index.column()]
+            return font if font is not None else QVariant()
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return QVariant()
+
+    def text(self, row, column):
+        """Hücrenin gösterilen metni (yoksa boş string)"""
+        if 0 <= row < len(self._texts) and 0 <= column < len(self.HEADERS):
+            return self._texts[row][column]
+        return ""
+
+    def set_rows(self, rows):
+        """
+        Satırları günceller. Satır sırası (çalışanlar) aynıysa sadece değişen
+        hücreler için dataChanged yayınlanır, değilse model sıfırlanır.
+        """
+        texts = [self.row_texts(emp) for emp in rows]
+        if [emp['id'] for emp in rows] != [emp['id'] for emp in self.rows]:
+            self.beginResetModel()
+            self.rows = list(rows)
+            self._texts = texts
+            self.endResetModel()
+            return
+        self.rows = list(rows)
+        old_texts, self._texts = self._texts, texts
+        for row, (old, new) in enumerate(zip(old_texts, texts)):
+            changed = [column for column, (a, b) in enumerate(zip(old, new)) if a != b]
+            if changed:
+                self.dataChanged.emit(self.index(row, changed[0]), self.index(row, changed[-1]),
+                                      [Qt.DisplayRole])
+
 
 class WeeklyReportForm(QWidget):
     """Haftalık Rapor sekmesi: Seçili haftaya göre tüm aktif çalışanların hakedişlerini tablo olarak gösterir."""
@@ -19,23 +215,25 @@ class WeeklyReportForm(QWidget):
         self.current_week = QDate.currentDate()
         self.fixed_row_height = 40  # Sabit satır yüksekliği
         self._summary_warning_shown = False  # Instance-level flag
+        self.employee_rows = []  # Tabloda gösterilen satırlar (sıralı)
+        # Rapor hesaplaması arka planda yapılır; her yeni istek nesli artırır,
+        # eski nesillerin sonuçları atılır
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(2)
+        self.report_signals = ReportSignals(self)
+        self.report_signals.finished.connect(self.on_report_ready)
+        self.report_signals.failed.connect(self.on_report_failed)
+        self._generation = 0
+        self._pending_request = None  # None, 'full' veya yenilenecek çalışan kümesi
+        self.week_closed = False  # Gösterilen hafta kapatılmış mı (son rapor sonucuna göre)
         self.initUI()
         self.load_weeks()
         self.load_report()
-        # --- Otomatik güncelleme: DB değişince raporu güncelle ---
-        self.db.data_changed.connect(self.load_report)
+        # --- Otomatik güncelleme: birleştirilmiş değişikliklerde sadece etkilenen satırları yenile ---
+        self.db.changes.changes_ready.connect(self.on_changes)
         # Çift tıklama sinyali ekle
-        self.table.cellDoubleClicked.connect(self.show_employee_week_details)
-        # --- Otomatik güncelleme: Süre sekmesindeki değişikliği dinle ---
-        from views.time_tracking_form import TimeTrackingForm
-        self.time_tracking_form_ref = None
-        try:
-            # Eğer ana ekranda TimeTrackingForm örneği varsa sinyale bağlan
-            self.time_tracking_form_ref = self.parent().findChild(TimeTrackingForm)
-            if self.time_tracking_form_ref:
-                self.time_tracking_form_ref.data_changed.connect(self.load_report)
-        except Exception:
-            pass
+        self.table.doubleClicked.connect(
+            lambda index: self.show_employee_week_details(index.row(), index.column()))
 
     def initUI(self):
         layout = QVBoxLayout(self)
@@ -58,6 +256,12 @@ class WeeklyReportForm(QWidget):
         self.print_preview_to_printer_btn = QPushButton("Yazdır")
         self.print_preview_to_printer_btn.clicked.connect(self.print_preview_to_printer)
         controls.addWidget(self.print_preview_to_printer_btn, alignment=Qt.AlignLeft | Qt.AlignVCenter)
+        # Haftayı kapat/aç butonu ve hafta durumu
+        self.close_week_btn = QPushButton("Haftayı Kapat")
+        self.close_week_btn.clicked.connect(self.toggle_week_closed)
+        controls.addWidget(self.close_week_btn, alignment=Qt.AlignLeft | Qt.AlignVCenter)
+        self.week_status_label = QLabel()
+        controls.addWidget(self.week_status_label, alignment=Qt.AlignLeft | Qt.AlignVCenter)
         # Toplam tutar etiketi (sağda büyük font)
         self.total_label = QLabel()
         self.total_label.setStyleSheet("font-size: 24px; font-weight: bold; color: #2d3436; padding-left: 30px; padding-right: 6px;")
@@ -65,18 +269,22 @@ class WeeklyReportForm(QWidget):
         controls.addWidget(self.total_label, alignment=Qt.AlignRight | Qt.AlignVCenter)
         layout.addLayout(controls)
 
-        # Tablo
-        self.table = QTableWidget()
-        self.table.setColumnCount(11)
-        self.table.setHorizontalHeaderLabels([
-            "Çalışan", "Haftalık Ücret", "Normal Ç. Saati", "Normal Ç. Ücreti", "Fazla Ç. Saati", "Fazla Ç. Ücreti", "Yemek", "Yol", "Ek Ödemeler", "Kesintiler", "Toplam"
-        ])
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        # Tablo (model/görünüm: hücreler satır değiştikçe yeniden oluşturulmaz)
+        self.report_model = WeeklyReportModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.report_model)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
         self.table.setAlternatingRowColors(True)
         self.table.verticalHeader().setVisible(False)
+        # Sabit satır yüksekliği ve Kişiler sekmesi ile aynı yazı tipi
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.fixed_row_height)
+        self.table.setFont(QFont("Arial", 12))
         # Tablo başlık renkleri (lacivert)
         header = self.table.horizontalHeader()
         header.setStyleSheet("QHeaderView::section { background-color: #153866; color: white; font-weight: bold; }")
+        # Tabloyu ekrana yay ve sütun genişliklerini eşit yap
+        header.setSectionResizeMode(QHeaderView.Stretch)
         self.table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         layout.addWidget(self.table)
         self.setLayout(layout)
@@ -90,7 +298,8 @@ class WeeklyReportForm(QWidget):
         selected_idx = 0
         if hasattr(self.db, 'get_available_weeks'):
             weeks = self.db.get_available_weeks()
-            weeks = sorted(set(weeks), reverse=True)
+            # İçinde bulunulan hafta henüz kaydı olmasa da listelensin
+            weeks = sorted(set(weeks) | {current_week_str}, reverse=True)
             for i, w in enumerate(weeks):
                 try:
                     start_dt = QDate.fromString(w, "yyyy-MM-dd")
@@ -109,226 +318,182 @@ class WeeklyReportForm(QWidget):
     def on_week_changed(self, idx):
         self.load_report()
 
+    def on_changes(self, changes):
+        """Biriken veritabanı değişikliklerini (ChangeSet) tek seferde uygular"""
+        if changes.full:
+            self.load_report()
+            return
+        week_str = self.week_combo.currentData()
+        if not week_str:
+            return
+        employee_ids = changes.employee_ids_for_week(week_str)
+        if employee_ids:
+            self.refresh_employees(employee_ids)
+
+    def sort_employee_rows(self):
+        # Haftalık ücrete göre azalan sırala (eşitlerde aktifler önce, sonra isim)
+        self.employee_rows.sort(key=lambda x: (-x['weekly_salary'], -(x['is_active'] or 0), x['name']))
+
+    def refresh_employee(self, employee_id):
+        """Sadece bir çalışanın satırını veritabanından yeniden hesaplar"""
+        self.refresh_employees([employee_id])
+
+    def refresh_employees(self, employee_ids):
+        """Verilen çalışanların satırlarını arka planda yeniden hesaplatır"""
+        employee_ids = set(employee_ids)
+        if self._pending_request == 'full':
+            # Süren tam yükleme değişiklikten önce okumuş olabilir: yeniden başlat
+            self.load_report()
+            return
+        if self._pending_request:
+            # Süren kısmi yenilemenin yerine ikisini birden kapsayan yeni istek
+            employee_ids |= self._pending_request
+        self.start_report(employee_ids)
+
     def load_report(self):
-        try:
-            self.db.data_changed.disconnect(self.load_report)
-        except Exception:
-            pass
-        if getattr(self, '_is_updating', False):
+        """Seçili haftanın raporunu arka planda baştan hesaplatır"""
+        self.start_report(None)
+
+    def start_report(self, employee_ids):
+        """Yeni rapor isteği başlatır; süren istekler geçersiz olur"""
+        self._generation += 1
+        week_str = self.week_combo.currentData()
+        if not week_str:
+            self._pending_request = None
+            return
+        self._pending_request = 'full' if employee_ids is None else employee_ids
+        worker = ReportWorker(self.db, self.report_signals, self._generation,
+                              lambda: self._generation, week_str, employee_ids)
+        self.thread_pool.start(worker)
+
+    def wait_for_report(self, msecs=-1):
+        """Süren rapor hesaplamasını bekleyip sonucu uygular (dışa aktarma vb. için)"""
+        self.thread_pool.waitForDone(msecs)
+        QApplication.processEvents()
+
+    def on_report_ready(self, generation, result):
+        """Arka planda hesaplanan rapor sonucunu tabloya uygular"""
+        if generation != self._generation or result['week'] != self.week_combo.currentData():
+            return
+        self._pending_request = None
+        self.update_week_status(result['closed'], result['drifted'])
+        if result['employee_ids'] is None:
+            self.apply_report(result['rows'])
+        else:
+            self.apply_employee_rows(result['employee_ids'], result['rows'])
+
+    def update_week_status(self, closed, drifted):
+        """Haftanın kapalı/açık durumunu buton ve etikete yansıtır"""
+        self.week_closed = closed
+        self.close_week_btn.setText("Haftayı Aç" if closed else "Haftayı Kapat")
+        if closed and drifted:
+            self.week_status_label.setText("Kapalı hafta - kapanıştan sonra kayıtlar değişti!")
+            self.week_status_label.setStyleSheet("color: #d63031; font-weight: bold;")
+        elif closed:
+            self.week_status_label.setText("Kapalı hafta")
+            self.week_status_label.setStyleSheet("color: #636e72; font-weight: bold;")
+        else:
+            self.week_status_label.setText("")
+
+    def toggle_week_closed(self):
+        """Seçili haftayı kapatır (hesapları dondurur) veya yeniden açar"""
+        week_str = self.week_combo.currentData()
+        if not week_str:
+            return
+        if self.week_closed:
+            question = "Hafta yeniden açılsın mı? Rapor tekrar güncel kayıtlardan hesaplanacak."
+        else:
+            question = "Hafta kapatılsın mı? Rapor bundan sonra bugünkü hesaplardan gösterilecek."
+        if QMessageBox.question(self, "Onay", question, QMessageBox.Yes | QMessageBox.No) != QMessageBox.Yes:
             return
-        self._is_updating = True
         try:
-            # Uyarı kutusu tekrarını engellemek için: her çağrı başında flag'i False yap
-            self._summary_warning_shown = False
-            week_str = self.week_combo.currentData()
-            if not week_str:
-                return
-            # --- ÇALIŞANLARI YÜKLE ---
-            # Hem aktif çalışanları hem de o hafta giriş kaydı olan pasif çalışanları dahil et
-            active_employees = self.db.get_active_employees()
-            employees_with_entry = self.db.get_employees_with_entries_for_week(week_str)
-            # ID bazında birleşim (aktifler + o hafta giriş yapan pasifler)
-            active_ids = {emp['id'] for emp in active_employees}
-            all_employees = active_employees.copy()
-            for emp in employees_with_entry:
-                if emp['id'] not in active_ids:
-                    all_employees.append(emp)
-            employee_rows = []
-            toplam_odenecek = 0
-            for emp in all_employees:
-                employee_id = emp['id'] if isinstance(emp, dict) else emp[0]
-                employee_name = emp['name'] if isinstance(emp, dict) else emp[1]
-                week_records = self.db.get_week_work_hours(employee_id, week_str)
-                # Eğer o haftada hiç çalışma kaydı yoksa ek sabit ödemeler de eklenmesin
-                if not week_records or all(
-                    (not rec.get('entry_time') or not rec.get('exit_time')) or not rec.get('day_active', 1)
-                    for rec in week_records
-                ):
-                    continue
-                total_seconds = 0
-                normal_seconds = 0
-                overtime_seconds = 0
-                active_days = 0
-                food_count = 0
-                for rec in week_records:
-                    if rec.get('day_active', 1):
-                        giris = rec['entry_time']
-                        cikis = rec['exit_time']
-                        ogle_bas = rec.get('lunch_start')
-                        ogle_bit = rec.get('lunch_end')
-                        current_day = rec.get('date')
-                        if giris and cikis and ogle_bas and ogle_bit:
-                            t1 = QTime.fromString(giris, "HH:mm")
-                            t2 = QTime.fromString(ogle_bas, "HH:mm")
-                            t3 = QTime.fromString(ogle_bit, "HH:mm")
-                            t4 = QTime.fromString(cikis, "HH:mm")
-                            qdate = QDate.fromString(current_day, "yyyy-MM-dd") if isinstance(current_day, str) else current_day
-                            norm, over = calculate_daily_normal_and_overtime(t1, t2, t3, t4, qdate)
-                            normal_seconds += int(norm * 3600)
-                            overtime_seconds += int(over * 3600)
-                            total_seconds += int((norm + over) * 3600)
-                            active_days += 1
-                            # YEMEK PARASI HESAPLAMA
-                            daily_food = 0
-                            if (norm + over) > 5:
-                                daily_food += 1
-                            if (t4.hour() > 20) or (t4.hour() == 20 and t4.minute() > 0):
-                                daily_food += 1
-                            food_count += daily_food
-                def seconds_to_hhmm(seconds):
-                    h = seconds // 3600
-                    m = (seconds % 3600) // 60
-                    return f"{h:02d}:{m:02d}"
-                normal_hours_str = seconds_to_hhmm(normal_seconds)
-                overtime_hours_str = seconds_to_hhmm(overtime_seconds)
-                total_hours_str = seconds_to_hhmm(total_seconds)
-                weekly_salary = emp['weekly_salary'] if isinstance(emp, dict) else emp[2]
-                # Saatlik ücreti doğrudan kullan (veritabanında haftalık/50 olarak saklandığı için)
-                hourly_rate = emp['weekly_salary']  # Artık bu saatlik ücret
-                normal_pay = (normal_seconds / 3600) * hourly_rate
-                overtime_pay = (overtime_seconds / 3600) * hourly_rate * 1.5
-                weekly_salary_earned = normal_pay + overtime_pay
-                food_allowance = food_count * (emp['daily_food'] if isinstance(emp, dict) else emp[3])
-                transport_allowance = active_days * (emp['daily_transport'] if isinstance(emp, dict) else emp[4])
-                calisma_var = any(rec.get('day_active', 1) and rec.get('entry_time') and rec.get('exit_time') for rec in week_records)
-                total_additions = self.db.get_employee_additions(employee_id, week_str, include_permanent_if_no_work=calisma_var)
-                payments = self.db.get_weekly_payments(employee_id, week_str)
-                total_deductions = 0
-                for payment in payments:
-                    payment_type_lower = payment[1].lower() if payment[1] else ""
-                    if payment_type_lower in ["kesinti", "ceza", "borç", "borc", "avans", "deduction"]:
-                        total_deductions += payment[2]
-                total_weekly_salary = weekly_salary_earned + food_allowance + transport_allowance + total_additions - total_deductions
-                if total_weekly_salary == 0:
-                    continue
-                employee_rows.append({
-                    'name': employee_name,
-                    'total_seconds': total_seconds,
-                    'total_hours_str': total_hours_str,
-                    'normal_hours_str': normal_hours_str,
-                    'overtime_hours_str': overtime_hours_str,
-                    'normal_pay': normal_pay,
-                    'overtime_pay': overtime_pay,
-                    'weekly_salary': weekly_salary,
-                    'weekly_salary_earned': weekly_salary_earned,
-                    'food_allowance': food_allowance,
-                    'transport_allowance': transport_allowance,
-                    'total_additions': total_additions,
-                    'total_deductions': total_deductions,
-                    'total_weekly_salary': total_weekly_salary
-                })
-            # Haftalık ücrete göre azalan sırala
-            employee_rows.sort(key=lambda x: x['weekly_salary'] * 50, reverse=True)
-            # Haftalık özet formundaki toplamlarla karşılaştırmak için summary verilerini çek
-            try:
-                from views.weekly_summary_form import WeeklySummaryForm
-                summary_form = None
-                for widget in self.parent().findChildren(WeeklySummaryForm):
-                    summary_form = widget
-                    break
-                summary_mismatch = False
-                if summary_form:
-                    summary_table = summary_form.summary_table
-                    for row, emp in enumerate(employee_rows):
-                        # Summary formunda aynı isimli çalışanı bul
-                        found = False
-                        for srow in range(summary_table.rowCount()):
-                            if summary_table.item(srow, 0) and summary_table.item(srow, 0).text() == emp['name']:
-                                summary_total = summary_table.item(srow, 7).text().replace("₺", "").replace(",", ".").strip()
-                                try:
-                                    summary_total_val = float(summary_total)
-                                    if abs(summary_total_val - toplam) > 0.01:
-                                        summary_mismatch = True
-                                        break
-                                except Exception:
-                                    pass
-                                found = True
-                                break
-                        if not found:
-                            summary_mismatch = True
+            if self.week_closed:
+                self.db.reopen_week(week_str)
+            else:
+                self.db.close_week(week_str)
+        except Exception as e:
+            QMessageBox.warning(self, "Hata", f"Hafta durumu değiştirilemedi:\n{e}")
+
+    def on_report_failed(self, generation, message):
+        if generation == self._generation:
+            self._pending_request = None
+            self.week_status_label.setText(f"Rapor hesaplanamadı: {message}")
+            self.week_status_label.setStyleSheet("color: #d63031; font-weight: bold;")
+
+    def apply_employee_rows(self, employee_ids, rows):
+        """Sadece verilen çalışanların yeniden hesaplanan satırlarını uygular"""
+        new_rows = {row['id']: row for row in rows}
+        employee_rows = []
+        for emp in self.employee_rows:
+            if emp['id'] in employee_ids:
+                # Güncellenen satır (artık gösterilmiyorsa çıkarılır)
+                if emp['id'] in new_rows:
+                    employee_rows.append(new_rows.pop(emp['id']))
+            else:
+                employee_rows.append(emp)
+        # Tabloda olmayan çalışanlar eklendi
+        employee_rows.extend(new_rows.values())
+        self.employee_rows = employee_rows
+        self.sort_employee_rows()
+        # Model sadece değişen hücreleri yeniden çizer
+        self.render_table()
+
+    def apply_report(self, employee_rows):
+        """Arka planda hesaplanan tüm rapor satırlarını tabloya uygular"""
+        # Uyarı kutusu tekrarını engellemek için: her yüklemede flag'i False yap
+        self._summary_warning_shown = False
+        self.employee_rows = employee_rows
+        self.sort_employee_rows()
+        # Haftalık özet formundaki toplamlarla karşılaştırmak için summary verilerini çek
+        try:
+            from views.weekly_summary_form import WeeklySummaryForm
+            summary_form = None
+            for widget in self.parent().findChildren(WeeklySummaryForm):
+                summary_form = widget
+                break
+            summary_mismatch = False
+            if summary_form:
+                summary_table = summary_form.summary_table
+                for row, emp in enumerate(employee_rows):
+                    # Summary formunda aynı isimli çalışanı bul
+                    found = False
+                    for srow in range(summary_table.rowCount()):
+                        if summary_table.item(srow, 0) and summary_table.item(srow, 0).text() == emp['name']:
+                            summary_total = summary_table.item(srow, 7).text().replace("₺", "").replace(",", ".").strip()
+                            try:
+                                summary_total_val = float(summary_total)
+                                if abs(summary_total_val - toplam) > 0.01:
+                                    summary_mismatch = True
+                                    break
+                            except Exception:
+                                pass
+                            found = True
                             break
-                if summary_mismatch:
-                    if not self._summary_warning_shown:
-                        self._summary_warning_shown = True
-                        QMessageBox.warning(self, "Uyarı", "Haftalık özet ile haftalık raporun toplam sütunu uyuşmuyor! Lütfen kontrol edin.")
-            except Exception:
-                pass
-
-            self.table.setRowCount(0)
-            for row, emp in enumerate(employee_rows):
-                self.table.insertRow(row)
-                self.table.setItem(row, 0, QTableWidgetItem(emp['name']))
-                # Haftalık Ücret (sağa yaslı)
-                haftalik_ucret_item = QTableWidgetItem(format_currency(emp['weekly_salary'] * 50))
-                haftalik_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, 1, haftalik_ucret_item)
-                # Normal Ç. Saati (ortala)
-                normal_saat_item = QTableWidgetItem(emp['normal_hours_str'])
-                normal_saat_item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(row, 2, normal_saat_item)
-                # Normal Ç. Ücreti (bold)
-                normal_ucret_item = QTableWidgetItem(format_currency(emp['normal_pay']))
-                normal_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                font_normal = QFont()
-                font_normal.setBold(True)
-                normal_ucret_item.setFont(font_normal)
-                self.table.setItem(row, 3, normal_ucret_item)
-                # Fazla Ç. Saati (ortala)
-                fazla_saat_item = QTableWidgetItem(emp['overtime_hours_str'])
-                fazla_saat_item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(row, 4, fazla_saat_item)
-                # Fazla Ç. Ücreti (bold)
-                fazla_ucret_item = QTableWidgetItem(format_currency(emp['overtime_pay']))
-                fazla_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                font_fazla = QFont()
-                font_fazla.setBold(True)
-                fazla_ucret_item.setFont(font_fazla)
-                self.table.setItem(row, 5, fazla_ucret_item)
-                # Yemek (sağa yaslı)
-                food_item = QTableWidgetItem(format_currency(emp['food_allowance']))
-                food_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, 6, food_item)
-                # Yol (sağa yaslı)
-                transport_item = QTableWidgetItem(format_currency(emp['transport_allowance']))
-                transport_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, 7, transport_item)
-                # Ek Ödemeler (sağa yaslı)
-                additions_item = QTableWidgetItem(format_currency(emp['total_additions']))
-                additions_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, 8, additions_item)
-                # Kesintiler (sağa yaslı)
-                deductions_item = QTableWidgetItem(format_currency(emp['total_deductions']))
-                deductions_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, 9, deductions_item)
-                # Toplam (sağa yaslı, bold)
-                total_item = QTableWidgetItem(format_currency(round(emp['total_weekly_salary'] / 10) * 10))
-                total_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                font = QFont()
-                font.setBold(True)
-                font.setPointSize(14)
-                total_item.setFont(font)
-                self.table.setItem(row, 10, total_item)
-                toplam_odenecek += round(emp['total_weekly_salary'] / 10) * 10
-            self.total_label.setText(format_currency(toplam_odenecek))
-            # Tablo font ve satır yüksekliği Kişiler sekmesi ile aynı olsun
-            table_font = QFont("Arial", 12)
-            self.table.setFont(table_font)
-            for row in range(self.table.rowCount()):
-                self.table.setRowHeight(row, 34)
-            # Tabloyu ekrana yay ve sütun genişliklerini eşit yap
-            header = self.table.horizontalHeader()
-            header.setSectionResizeMode(QHeaderView.Stretch)
-            for i in range(self.table.columnCount()):
-                header.setSectionResizeMode(i, QHeaderView.Stretch)
-            # Satır yüksekliğini her zaman sabit tut
-            for row in range(self.table.rowCount()):
-                self.table.setRowHeight(row, self.fixed_row_height)
-
-            # Toplam tutarı sağda büyük fontla göster (sadece tutar)
-        finally:
-            self._is_updating = False
+                    if not found:
+                        summary_mismatch = True
+                        break
+            if summary_mismatch:
+                if not self._summary_warning_shown:
+                    self._summary_warning_shown = True
+                    QMessageBox.warning(self, "Uyarı", "Haftalık özet ile haftalık raporun toplam sütunu uyuşmuyor! Lütfen kontrol edin.")
+        except Exception:
+            pass
+
+        self.render_table()
+
+    def update_total_label(self):
+        # Toplam tutarı sağda büyük fontla göster (sadece tutar)
+        toplam_odenecek = sum(round(emp['total_weekly_salary'] / 10) * 10 for emp in self.employee_rows)
+        self.total_label.setText(format_currency(toplam_odenecek))
+
+    def render_table(self):
+        """Bellekteki satırları modele aktarır"""
+        self.report_model.set_rows(self.employee_rows)
+        self.update_total_label()
 
     def export_to_pdf(self):
+        # Tablo, süren hesaplamanın sonucuyla güncel olsun
+        self.wait_for_report()
         from PyQt5.QtPrintSupport import QPrinter
         from PyQt5.QtWidgets import QFileDialog, QMessageBox
         from PyQt5.QtGui import QPainter, QFont, QColor
@@ -355,18 +520,18 @@ class WeeklyReportForm(QWidget):
         font_val = QFont("Arial", 8, QFont.Bold)
         font_total = QFont("Arial", 9, QFont.Bold)
         employees = []
-        for row in range(self.table.rowCount()):
+        for row in range(self.report_model.rowCount()):
             emp = {}
-            emp['name'] = self.table.item(row, 0).text()
-            emp['normal_hour'] = self.table.item(row, 2).text()
-            emp['overtime_hour'] = self.table.item(row, 4).text()
-            emp['normal_pay'] = self.table.item(row, 3).text()
-            emp['overtime_pay'] = self.table.item(row, 5).text()
-            emp['food'] = self.table.item(row, 6).text()
-            emp['transport'] = self.table.item(row, 7).text()
-            emp['addition'] = self.table.item(row, 8).text()
-            emp['deduction'] = self.table.item(row, 9).text()
-            emp['total'] = self.table.item(row, 10).text()
+            emp['name'] = self.report_model.text(row, 0)
+            emp['normal_hour'] = self.report_model.text(row, 2)
+            emp['overtime_hour'] = self.report_model.text(row, 4)
+            emp['normal_pay'] = self.report_model.text(row, 3)
+            emp['overtime_pay'] = self.report_model.text(row, 5)
+            emp['food'] = self.report_model.text(row, 6)
+            emp['transport'] = self.report_model.text(row, 7)
+            emp['addition'] = self.report_model.text(row, 8)
+            emp['deduction'] = self.report_model.text(row, 9)
+            emp['total'] = self.report_model.text(row, 10)
             employees.append(emp)
         for idx, emp in enumerate(employees):
             col = idx % col_count
@@ -431,6 +596,8 @@ class WeeklyReportForm(QWidget):
         QMessageBox.information(self, "Başarılı", f"PDF olarak kaydedildi:\n{file_path}")
 
     def preview_summary_boxes(self):
+        # Tablo, süren hesaplamanın sonucuyla güncel olsun
+        self.wait_for_report()
         from PyQt5.QtWidgets import QDialog, QScrollArea, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGridLayout
         from PyQt5.QtGui import QFont
         from PyQt5.QtCore import Qt
@@ -448,18 +615,18 @@ class WeeklyReportForm(QWidget):
         font_val = QFont("Arial", 9, QFont.Bold)
         font_total = QFont("Arial", 10, QFont.Bold)
         employees = []
-        for row in range(self.table.rowCount()):
+        for row in range(self.report_model.rowCount()):
             emp = {}
-            emp['name'] = self.table.item(row, 0).text()
-            emp['normal_hour'] = self.table.item(row, 2).text()
-            emp['overtime_hour'] = self.table.item(row, 4).text()
-            emp['normal_pay'] = self.table.item(row, 3).text()
-            emp['overtime_pay'] = self.table.item(row, 5).text()
-            emp['food'] = self.table.item(row, 6).text()
-            emp['transport'] = self.table.item(row, 7).text()
-            emp['addition'] = self.table.item(row, 8).text()
-            emp['deduction'] = self.table.item(row, 9).text()
-            emp['total'] = self.table.item(row, 10).text()
+            emp['name'] = self.report_model.text(row, 0)
+            emp['normal_hour'] = self.report_model.text(row, 2)
+            emp['overtime_hour'] = self.report_model.text(row, 4)
+            emp['normal_pay'] = self.report_model.text(row, 3)
+            emp['overtime_pay'] = self.report_model.text(row, 5)
+            emp['food'] = self.report_model.text(row, 6)
+            emp['transport'] = self.report_model.text(row, 7)
+            emp['addition'] = self.report_model.text(row, 8)
+            emp['deduction'] = self.report_model.text(row, 9)
+            emp['total'] = self.report_model.text(row, 10)
             employees.append(emp)
         for idx, emp in enumerate(employees):
             if idx % col_count == 0:
@@ -522,6 +689,8 @@ class WeeklyReportForm(QWidget):
         dialog.exec_()
 
     def print_preview_to_printer(self):
+        # Tablo, süren hesaplamanın sonucuyla güncel olsun
+        self.wait_for_report()
         from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
         from PyQt5.QtWidgets import QDialog, QScrollArea
         from PyQt5.QtGui import QPainter
@@ -541,18 +710,18 @@ class WeeklyReportForm(QWidget):
         font_val = QFont("Arial", 9, QFont.Bold)
         font_total = QFont("Arial", 10, QFont.Bold)
         employees = []
-        for row in range(self.table.rowCount()):
+        for row in range(self.report_model.rowCount()):
             emp = {}
-            emp['name'] = self.table.item(row, 0).text()
-            emp['normal_hour'] = self.table.item(row, 2).text()
-            emp['overtime_hour'] = self.table.item(row, 4).text()
-            emp['normal_pay'] = self.table.item(row, 3).text()
-            emp['overtime_pay'] = self.table.item(row, 5).text()
-            emp['food'] = self.table.item(row, 6).text()
-            emp['transport'] = self.table.item(row, 7).text()
-            emp['addition'] = self.table.item(row, 8).text()
-            emp['deduction'] = self.table.item(row, 9).text()
-            emp['total'] = self.table.item(row, 10).text()
+            emp['name'] = self.report_model.text(row, 0)
+            emp['normal_hour'] = self.report_model.text(row, 2)
+            emp['overtime_hour'] = self.report_model.text(row, 4)
+            emp['normal_pay'] = self.report_model.text(row, 3)
+            emp['overtime_pay'] = self.report_model.text(row, 5)
+            emp['food'] = self.report_model.text(row, 6)
+            emp['transport'] = self.report_model.text(row, 7)
+            emp['addition'] = self.report_model.text(row, 8)
+            emp['deduction'] = self.report_model.text(row, 9)
+            emp['total'] = self.report_model.text(row, 10)
             employees.append(emp)
         for idx, emp in enumerate(employees):
             if idx % col_count == 0:
@@ -645,7 +814,7 @@ class WeeklyReportForm(QWidget):
             dt2 = datetime.strptime(bitis, f)
             return (dt2 - dt1).total_seconds() / 3600
 
-        employee_name = self.table.item(row, 0).text()
+        employee_name = self.report_model.text(row, 0)
         week_index = self.week_combo.currentIndex()
         week_start = self.week_combo.itemData(week_index)
         # Çalışan adından ID bul
@@ -732,9 +901,7 @@ class WeeklyReportForm(QWidget):
             # self.table: ana haftalık tablo
             # row: popup'u açan satır
             if hasattr(self, 'table') and row is not None:
-                toplam_item = self.table.item(row, self.table.columnCount()-1)
-                if toplam_item:
-                    toplam_deger = toplam_item.text()
+                toplam_deger = self.report_model.text(row, self.report_model.columnCount() - 1)
         except Exception:
             toplam_deger = ""
         toplam_label = QLabel(f"{toplam_deger}")
@@ -751,8 +918,8 @@ class WeeklyReportForm(QWidget):
         column_map = {}
         try:
             if hasattr(self, 'table'):
-                for i in range(self.table.columnCount()):
-                    header = self.table.horizontalHeaderItem(i).text().strip().lower()
+                for i in range(self.report_model.columnCount()):
+                    header = self.report_model.HEADERS[i].strip().lower()
                     column_map[header] = i
         except Exception:
             pass
@@ -765,10 +932,10 @@ class WeeklyReportForm(QWidget):
         summary_values = ["", "", "", ""]
         try:
             if hasattr(self, 'table') and row is not None:
-                food = self.table.item(row, idx_food).text() if self.table.item(row, idx_food) else ""
-                transport = self.table.item(row, idx_transport).text() if self.table.item(row, idx_transport) else ""
-                eklenti = self.table.item(row, idx_ek).text() if self.table.item(row, idx_ek) else ""
-                kesinti = self.table.item(row, idx_kesinti).text() if self.table.item(row, idx_kesinti) else ""
+                food = self.report_model.text(row, idx_food)
+                transport = self.report_model.text(row, idx_transport)
+                eklenti = self.report_model.text(row, idx_ek)
+                kesinti = self.report_model.text(row, idx_kesinti)
                 summary_values = [food, transport, eklenti, kesinti]
         except Exception:
             pass
@@ -4,12 +4,13 @@ from PyQt5.QtWidgets import (
     QFrame, QSizePolicy, QPushButton, QComboBox,
     QMessageBox, QFileDialog
 )
-from PyQt5.QtCore import Qt, QTime, QDate
+from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QColor, QBrush, QFont, QPainter
 from PyQt5.QtPrintSupport import QPrinter
 
 from models.database import EmployeeDB
-from utils.helpers import format_currency, calculate_daily_normal_and_overtime
+from utils.helpers import format_currency
+from utils import payroll
 from datetime import datetime, timedelta
 
 class WeeklySummaryForm(QWidget):
@@ -22,7 +23,8 @@ class WeeklySummaryForm(QWidget):
         self.current_week_start = self.get_week_start_date(self.current_date)
         self.employee_data = []  # Çalışan verilerini saklamak için
         
-        self.db.data_changed.connect(self.reload_summary)
+        # Birleştirilmiş değişikliklerde sadece gösterilen hafta etkileniyorsa yenile
+        self.db.changes.changes_ready.connect(self.on_changes)
         
         self.initUI()
         self.load_available_weeks()
@@ -177,22 +179,9 @@ class WeeklySummaryForm(QWidget):
         self.week_combo.blockSignals(True)
         self.week_combo.clear()
         # Haftaları veritabanından çek
-        if hasattr(self.db, 'get_available_weeks'):
-            weeks = self.db.get_available_weeks()
-            # Sadece o haftada aktif çalışanlardan en az birinin çalışma kaydı varsa göster
-            filtered_weeks = []
-            for w in weeks:
-                aktif_var = False
-                employees = self.db.get_active_employees()
-                for emp in employees:
-                    employee_id = emp['id'] if isinstance(emp, dict) else emp[0]
-                    week_records = self.db.get_week_work_hours(employee_id, w)
-                    if week_records and any([rec.get('day_active', 1) for rec in week_records]):
-                        aktif_var = True
-                        break
-                if aktif_var:
-                    filtered_weeks.append(w)
-            weeks = filtered_weeks
+        if hasattr(self.db, 'get_active_weeks'):
+            # Sadece o haftada aktif çalışanlardan en az birinin aktif çalışma günü varsa göster
+            weeks = self.db.get_active_weeks()
         else:
             # Eski sistemle uyumluluk için haftalık özetlerden çek
             saved_summaries = self.db.get_available_weekly_summaries()
@@ -246,17 +235,8 @@ class WeeklySummaryForm(QWidget):
         
     def load_and_calculate_employees(self):
         """O haftada veri girişi olan çalışanları yükler ve tabloya ekler (her bir çalışanın haftalık ayrıntılı özeti)"""
-        print("[DEBUG] load_and_calculate_employees fonksiyonu çağrıldı")
-        try:
-            with open('debug_log.txt', 'a', encoding='utf-8') as f:
-                f.write("[DEBUG] load_and_calculate_employees fonksiyonu çağrıldı\n")
-        except Exception:
-            pass
-        # Hangi haftanın sorgulandığını debug için yazdır
         week_start_str = self.format_date_for_db(self.current_week_start)
-        print(f"[DEBUG] Haftalık özet için sorgulanan hafta başlangıcı: {week_start_str}")
         self.employee_data = []
-        total_weekly_sum = 0
         self.summary_table.clearContents()
         self.summary_table.setRowCount(0)
         self.summary_table.setColumnCount(13)
@@ -275,151 +255,138 @@ class WeeklySummaryForm(QWidget):
             "Toplam",
             "Saatlik Ücret"
         ])
-        employees = self.db.get_employees_with_entries_for_week(week_start_str)
-        print(f"[DEBUG] Haftada veri girişi olan çalışanlar: {employees}")
-        row = 0
-        def float_to_time_str(hours):
-            # Saat:dakika formatı
-            h = int(hours)
-            m = int(round((hours - h) * 60))
-            if m == 60:
-                h += 1
-                m = 0
-            return f"{h:02d}:{m:02d}"
-        for emp in employees:
-            print(f"[DEBUG] Çalışan: {emp['name']}")
-            try:
-                with open('debug_log.txt', 'a', encoding='utf-8') as f:
-                    f.write(f"[DEBUG] Çalışan: {emp['name']}\n")
-            except Exception:
-                pass
-            employee_id = emp['id']
-            employee_name = emp['name']
-            week_records = self.db.get_week_work_hours(employee_id, week_start_str)
-            if not week_records:
-                continue
-            total_hours = 0
-            normal_hours = 0
-            overtime_hours = 0
-            active_days = 0
-            food_days = 0
-            for rec in week_records:
-                if rec.get('day_active', 1):
-                    giris = rec['entry_time']
-                    cikis = rec['exit_time']
-                    ogle_bas = rec.get('lunch_start')
-                    ogle_bit = rec.get('lunch_end')
-                    current_day = rec.get('date')
-                    if giris and cikis and ogle_bas and ogle_bit:
-                        try:
-                            from PyQt5.QtCore import QTime, QDate
-                            t1 = QTime.fromString(giris, "HH:mm")
-                            t2 = QTime.fromString(ogle_bas, "HH:mm")
-                            t3 = QTime.fromString(ogle_bit, "HH:mm")
-                            t4 = QTime.fromString(cikis, "HH:mm")
-                            qdate = QDate.fromString(current_day, "yyyy-MM-dd") if isinstance(current_day, str) else current_day
-                            from utils.helpers import calculate_daily_normal_and_overtime
-                            norm, over = calculate_daily_normal_and_overtime(t1, t2, t3, t4, qdate)
-                            # Konsola yazmanın yanında dosyaya da logla
-                            try:
-                                with open('debug_log.txt', 'a', encoding='utf-8') as f:
-                                    f.write(f"[DEBUG] GÜN: {current_day} | GİRİŞ: {giris} | ÇIKIŞ: {cikis} | NORM: {norm} | OVER: {over}\n")
-                            except Exception as e:
-                                pass
-                            print(f"[DEBUG] GÜN: {current_day} | GİRİŞ: {giris} | ÇIKIŞ: {cikis} | NORM: {norm} | OVER: {over}")
-                            normal_hours += norm
-                            overtime_hours += over
-                            total_hours += norm + over
-                            active_days += 1
-                            if (norm + over) >= 5:
-                                food_days += 1
-                        except Exception:
-                            pass
-            weekly_salary_base = emp['weekly_salary']
-            hourly_rate = weekly_salary_base / 50
-            normal_pay = normal_hours * hourly_rate
-            overtime_pay = overtime_hours * hourly_rate * 1.5
-            weekly_salary_earned = normal_pay + overtime_pay
-            food_allowance = food_days * emp['daily_food']
-            transport_allowance = active_days * emp['daily_transport']
-            calisma_var = (normal_hours + overtime_hours) > 0
-            total_additions = self.db.get_employee_additions(employee_id, week_start_str, include_permanent_if_no_work=calisma_var)
-            payments = self.db.get_weekly_payments(employee_id, week_start_str)
-            total_deductions = 0
-            for payment in payments:
-                payment_type_lower = payment[1].lower() if payment[1] else ""
-                if payment_type_lower in ["kesinti", "ceza", "borç", "borc", "avans", "deduction"]:
-                    total_deductions += payment[2]
-            total_weekly_salary = weekly_salary_earned + food_allowance + transport_allowance + total_additions - total_deductions
-            self.employee_data.append({
-                'id': employee_id,
-                'name': employee_name,
-                'total_hours': total_hours,
-                'normal_hours': normal_hours,
-                'overtime_hours': overtime_hours,
-                'normal_pay': normal_pay,
-                'overtime_pay': overtime_pay,
-                'weekly_salary': weekly_salary_earned,
-                'food_allowance': food_allowance,
-                'transport_allowance': transport_allowance,
-                'total_additions': total_additions,
-                'total_deductions': total_deductions,
-                'total_weekly_salary': total_weekly_salary,
-                'weekly_salary_base': weekly_salary_base,
-                'hourly_rate': hourly_rate
-            })
+        # Kapatılmış hafta kapanıştaki anlık görüntüden gösterilir
+        closed = self.db.get_closed_week(week_start_str, verify=True)
+        week_text = f"Haftalık Özet: {self.format_week_date_range(self.current_week_start)}"
+        if closed is not None:
+            results = closed['results']
+            week_text += " (Kapalı - kapanıştan sonra kayıtlar değişti!)" if closed['drifted'] else " (Kapalı)"
+        else:
+            # O haftada veri girişi olan çalışanların haftalık toplamları (weekly_rollup)
+            rollups = self.db.get_week_rollups(week_start_str)
+            results = payroll.calculate_rollups(rollups)
+        self.week_label.setText(week_text)
+        for row, result in enumerate(results):
             self.summary_table.insertRow(row)
-            self.summary_table.setItem(row, 0, QTableWidgetItem(employee_name))
-            haftalik_ucret_item = QTableWidgetItem(format_currency(weekly_salary_base))
-            haftalik_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.summary_table.setItem(row, 1, haftalik_ucret_item)
-            toplam_saat_item = QTableWidgetItem(float_to_time_str(total_hours))
-            toplam_saat_item.setTextAlignment(Qt.AlignCenter)
-            self.summary_table.setItem(row, 2, toplam_saat_item)
-            normal_saat_item = QTableWidgetItem(float_to_time_str(normal_hours))
-            normal_saat_item.setTextAlignment(Qt.AlignCenter)
-            self.summary_table.setItem(row, 3, normal_saat_item)
-            normal_ucret_item = QTableWidgetItem(format_currency(normal_pay))
-            normal_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.summary_table.setItem(row, 4, normal_ucret_item)
-            fazla_saat_item = QTableWidgetItem(float_to_time_str(overtime_hours))
-            fazla_saat_item.setTextAlignment(Qt.AlignCenter)
-            self.summary_table.setItem(row, 5, fazla_saat_item)
-            fazla_ucret_item = QTableWidgetItem(format_currency(overtime_pay))
-            fazla_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.summary_table.setItem(row, 6, fazla_ucret_item)
-            food_item = QTableWidgetItem(format_currency(food_allowance))
-            food_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.summary_table.setItem(row, 7, food_item)
-            transport_item = QTableWidgetItem(format_currency(transport_allowance))
-            transport_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.summary_table.setItem(row, 8, transport_item)
-            additions_item = QTableWidgetItem(format_currency(total_additions))
-            additions_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.summary_table.setItem(row, 9, additions_item)
-            deductions_item = QTableWidgetItem(format_currency(total_deductions))
-            deductions_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.summary_table.setItem(row, 10, deductions_item)
-            rounded_total_weekly_salary = round(total_weekly_salary / 10) * 10
-            total_item = QTableWidgetItem(format_currency(rounded_total_weekly_salary))
-            total_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            total_item.setBackground(QBrush(QColor("#e8f0fe")))
-            total_item.setForeground(QBrush(QColor("#4a86e8")))
-            font = QFont()
-            font.setBold(True)
-            font.setPointSize(10)
-            total_item.setFont(font)
-            self.summary_table.setItem(row, 11, total_item)
-            saatlik_ucret_item = QTableWidgetItem(format_currency(hourly_rate))
-            saatlik_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.summary_table.setItem(row, 12, saatlik_ucret_item)
-            total_weekly_sum += rounded_total_weekly_salary
-            row += 1
-        rounded_total_weekly_sum = round(total_weekly_sum / 10) * 10
-        self.total_amount.setText(format_currency(rounded_total_weekly_sum))
+            self.set_employee_row(row, result)
+        self.update_total_amount()
         self.adjust_table_size()
         return
     
+    def set_employee_row(self, row, result):
+        """Tablonun verilen satırını çalışanın hesap sonucuyla doldurur (employee_data da güncellenir)"""
+        emp = result['employee']
+        employee_id = emp['id']
+        employee_name = emp['name']
+        total_hours = result['total_minutes'] / 60
+        normal_hours = result['normal_minutes'] / 60
+        overtime_hours = result['overtime_minutes'] / 60
+        # Veritabanındaki weekly_salary sütunu saatlik ücreti tutar
+        hourly_rate = emp['weekly_salary']
+        weekly_salary_base = hourly_rate * 50
+        normal_pay = result['normal_pay']
+        overtime_pay = result['overtime_pay']
+        weekly_salary_earned = result['earned']
+        food_allowance = result['food_allowance']
+        transport_allowance = result['transport_allowance']
+        total_additions = result['total_additions']
+        total_deductions = result['total_deductions']
+        total_weekly_salary = result['total']
+        data = {
+            'id': employee_id,
+            'name': employee_name,
+            'total_hours': total_hours,
+            'normal_hours': normal_hours,
+            'overtime_hours': overtime_hours,
+            'normal_pay': normal_pay,
+            'overtime_pay': overtime_pay,
+            'weekly_salary': weekly_salary_earned,
+            'food_allowance': food_allowance,
+            'transport_allowance': transport_allowance,
+            'total_additions': total_additions,
+            'total_deductions': total_deductions,
+            'total_weekly_salary': total_weekly_salary,
+            'weekly_salary_base': weekly_salary_base,
+            'hourly_rate': hourly_rate
+        }
+        if row < len(self.employee_data):
+            self.employee_data[row] = data
+        else:
+            self.employee_data.append(data)
+        self.summary_table.setItem(row, 0, QTableWidgetItem(employee_name))
+        haftalik_ucret_item = QTableWidgetItem(format_currency(weekly_salary_base))
+        haftalik_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.summary_table.setItem(row, 1, haftalik_ucret_item)
+        toplam_saat_item = QTableWidgetItem(payroll.format_minutes(result['total_minutes']))
+        toplam_saat_item.setTextAlignment(Qt.AlignCenter)
+        self.summary_table.setItem(row, 2, toplam_saat_item)
+        normal_saat_item = QTableWidgetItem(payroll.format_minutes(result['normal_minutes']))
+        normal_saat_item.setTextAlignment(Qt.AlignCenter)
+        self.summary_table.setItem(row, 3, normal_saat_item)
+        normal_ucret_item = QTableWidgetItem(format_currency(normal_pay))
+        normal_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.summary_table.setItem(row, 4, normal_ucret_item)
+        fazla_saat_item = QTableWidgetItem(payroll.format_minutes(result['overtime_minutes']))
+        fazla_saat_item.setTextAlignment(Qt.AlignCenter)
+        self.summary_table.setItem(row, 5, fazla_saat_item)
+        fazla_ucret_item = QTableWidgetItem(format_currency(overtime_pay))
+        fazla_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.summary_table.setItem(row, 6, fazla_ucret_item)
+        food_item = QTableWidgetItem(format_currency(food_allowance))
+        food_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.summary_table.setItem(row, 7, food_item)
+        transport_item = QTableWidgetItem(format_currency(transport_allowance))
+        transport_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.summary_table.setItem(row, 8, transport_item)
+        additions_item = QTableWidgetItem(format_currency(total_additions))
+        additions_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.summary_table.setItem(row, 9, additions_item)
+        deductions_item = QTableWidgetItem(format_currency(total_deductions))
+        deductions_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.summary_table.setItem(row, 10, deductions_item)
+        rounded_total_weekly_salary = round(total_weekly_salary / 10) * 10
+        total_item = QTableWidgetItem(format_currency(rounded_total_weekly_salary))
+        total_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        total_item.setBackground(QBrush(QColor("#e8f0fe")))
+        total_item.setForeground(QBrush(QColor("#4a86e8")))
+        font = QFont()
+        font.setBold(True)
+        font.setPointSize(10)
+        total_item.setFont(font)
+        self.summary_table.setItem(row, 11, total_item)
+        saatlik_ucret_item = QTableWidgetItem(format_currency(hourly_rate))
+        saatlik_ucret_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.summary_table.setItem(row, 12, saatlik_ucret_item)
+
+    def update_total_amount(self):
+        """Toplam ödenecek tutarı satırların yuvarlanmış toplamlarından hesaplar"""
+        total_weekly_sum = sum(round(data['total_weekly_salary'] / 10) * 10 for data in self.employee_data)
+        rounded_total_weekly_sum = round(total_weekly_sum / 10) * 10
+        self.total_amount.setText(format_currency(rounded_total_weekly_sum))
+
+    def refresh_employees(self, employee_ids):
+        """Sadece verilen çalışanların satırlarını yeniden hesaplar (tablo baştan kurulmaz)"""
+        week_start_str = self.format_date_for_db(self.current_week_start)
+        closed = self.db.get_closed_week(week_start_str)
+        if closed is not None:
+            # Kapalı hafta anlık görüntüden gösterilir: sadece kayma uyarısı değişebilir
+            week_text = f"Haftalık Özet: {self.format_week_date_range(self.current_week_start)}"
+            week_text += " (Kapalı - kapanıştan sonra kayıtlar değişti!)" if closed['drifted'] else " (Kapalı)"
+            self.week_label.setText(week_text)
+            return
+        results = {
+            result['employee']['id']: result
+            for result in payroll.calculate_rollups(self.db.get_week_rollups(week_start_str, employee_ids=employee_ids))
+        }
+        rows = {data['id']: row for row, data in enumerate(self.employee_data)}
+        if set(results) != set(rows) & set(employee_ids):
+            # Haftaya çalışan eklendi/çıkarıldı: sıralama değişir, tablo yeniden kurulur
+            self.load_and_calculate_employees()
+            return
+        for employee_id, result in results.items():
+            self.set_employee_row(rows[employee_id], result)
+        self.update_total_amount()
+
     def load_weekly_data(self):
         """Haftalık verileri yükler"""
         self.load_and_calculate_employees()
@@ -476,6 +443,20 @@ class WeeklySummaryForm(QWidget):
         self.load_weekly_data()
         self.load_and_calculate_employees()
 
+    def on_changes(self, changes):
+        """Biriken veritabanı değişikliklerini (ChangeSet) tek seferde uygular"""
+        if changes.full:
+            self.reload_summary()
+            return
+        if changes.employees or any(self.week_combo.findData(self.format_date_for_db(date)) < 0 for date in changes.dates()):
+            # Yeni hafta oluştu ya da çalışan eklendi/silindi: hafta listesi güncellenir
+            # (load_available_weeks seçili haftayı da baştan yükler)
+            self.load_available_weeks()
+            return
+        employee_ids = changes.employee_ids_for_week(self.current_week_start.strftime("%Y-%m-%d"))
+        if employee_ids:
+            self.refresh_employees(employee_ids)
+
     def export_to_pdf(self):
         from PyQt5.QtPrintSupport import QPrinter
         from PyQt5.QtWidgets import QFileDialog, QMessageBox